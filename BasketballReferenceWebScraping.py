@@ -1,7 +1,3 @@
-# needed libraries
-from urllib.request import urlopen
-from bs4 import BeautifulSoup
-import pandas as pd
 ## Importing Necessary Modules
 import requests # to get image from the web
 import shutil # to save it locally
@@ -9,6 +5,11 @@ import shutil # to save it locally
 
 
 '''
+# needed libraries (only for the scraping code below)
+from urllib.request import urlopen
+from bs4 import BeautifulSoup
+import pandas as pd
+
 url = "https://www.basketball-reference.com/leagues/NBA_2023_per_game.html#per_game_stats"
 
 playerURL = "https://www.basketball-reference.com/players/a/antetgi01.html"
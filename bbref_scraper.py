@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Scrape Basketball-Reference season tables (per-game, advanced, totals)
+Only the requested <table> is sliced out of each page and parsed with a couple of
+compiled regexes, then every column is converted to a typed NumPy array in one go.
+Pages are crawled concurrently under a strict shared rate limit and kept in an
+on-disk page cache, which doubles as the fixture directory for offline runs.
+
+Seasons follow run-historical-all-years.sh: START/END are API season years
+(1996 = 1996-97) and rows are stored with season = year + 1, like the database.
+
+Usage:
+    python bbref_scraper.py                         # 1996-2024, all three tables
+    python bbref_scraper.py 2020 2024 --tables per_game advanced
+    python bbref_scraper.py 2023 2023 --offline --cache-dir saved_pages/
+"""
+
+import os
+import re
+import csv
+import sys
+import time
+import html
+import argparse
+from datetime import date
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from rate_limit import TokenBucket, backoff_delay
+from metrics import add_metrics_arguments, metrics_from_args, record_retry, stage
+
+BBREF_BASE = 'https://www.basketball-reference.com'
+SEASON_URL = BBREF_BASE + '/leagues/NBA_{year}_{table}.html'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html',
+}
+
+# Table ids as they appear in the page; advanced was renamed in the 2024 redesign
+TABLES = {
+    'per_game': ('per_game_stats',),
+    'advanced': ('advanced', 'advanced_stats'),
+    'totals': ('totals_stats',),
+}
+
+DEFAULT_START = 1996
+DEFAULT_END = 2024
+DEFAULT_WORKERS = 2
+# Basketball-Reference blocks clients above ~20 requests/minute
+DEFAULT_RPS = 0.3
+MAX_RETRIES = 3
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_CACHE_DIR = '.bbref_cache'
+# The in-progress season is re-fetched after this long; finished seasons never are
+CURRENT_SEASON_MAX_AGE = 24 * 60 * 60
+
+# Older and newer markup use different data-stat names for the same column
+COLUMN_ALIASES = {
+    'name_display': 'player',
+    'team_name_abbr': 'team',
+    'team_id': 'team',
+}
+TEXT_COLUMNS = {'player', 'player_slug', 'team', 'pos', 'awards'}
+# Rank is presentation only, and the spacer columns older pages use are always empty
+SKIP_COLUMNS = {'ranker', 'DUMMY', 'x'}
+
+TBODY_RE = re.compile(r'<tbody[^>]*>(.*?)</tbody>', re.DOTALL)
+ROW_RE = re.compile(r'<tr([^>]*)>(.*?)</tr>', re.DOTALL)
+CELL_RE = re.compile(r'<t[hd]([^>]*?)data-stat="([^"]+)"([^>]*)>(.*?)</t[hd]>', re.DOTALL)
+SLUG_RE = re.compile(r'data-append-csv="([^"]+)"')
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def page_year(season):
+    """Basketball-Reference names seasons by their ending year: API 2024 (2024-25) -> 2025."""
+    return season + 1
+
+
+def slice_table(page, table):
+    """
+    Cut the HTML of one stats table out of a page without parsing the rest
+
+    Also finds tables Basketball-Reference ships inside HTML comments.
+
+    Returns:
+        The table's HTML, or None if the page doesn't contain it
+    """
+    for table_id in TABLES.get(table, (table,)):
+        start = page.find(f'id="{table_id}"')
+        if start == -1:
+            continue
+        start = page.rfind('<table', 0, start)
+        end = page.find('</table>', start)
+        if start != -1 and end != -1:
+            return page[start:end + len('</table>')]
+    return None
+
+
+def parse_rows(table_html):
+    """
+    Extract body rows as {data-stat: text} dicts, skipping repeated header rows
+
+    The player cell's data-append-csv attribute is kept as 'player_slug'.
+    """
+    body = TBODY_RE.search(table_html)
+    rows = []
+    for row_attrs, row_html in ROW_RE.findall(body.group(1) if body else table_html):
+        if 'thead' in row_attrs:
+            continue
+        row = {}
+        for before, stat, after, inner in CELL_RE.findall(row_html):
+            stat = COLUMN_ALIASES.get(stat, stat)
+            if stat in SKIP_COLUMNS:
+                continue
+            if '<' in inner:
+                inner = TAG_RE.sub('', inner)
+            row[stat] = html.unescape(inner).strip()
+            if stat == 'player':
+                slug = SLUG_RE.search(before + after) or SLUG_RE.search(inner)
+                if slug:
+                    row['player_slug'] = slug.group(1)
+        if row.get('player'):
+            rows.append(row)
+    return rows
+
+
+def typed_column(name, values):
+    """
+    Convert a column of cell strings to a NumPy array
+
+    Text columns stay object arrays; all-integer columns become int32 (empty cells
+    force float); everything else is float64 with NaN for blanks.
+    """
+    # NumPy is imported where it's used so `tools.py scrape --help` doesn't load it
+    import numpy as np
+    if name in TEXT_COLUMNS:
+        return np.array(values, dtype=object)
+    raw = np.array(values, dtype=str)
+    blank = raw == ''
+    try:
+        numbers = np.where(blank, 'nan', raw).astype(np.float64)
+    except ValueError:
+        return np.array(values, dtype=object)
+    if not blank.any() and not np.char.count(raw, '.').any():
+        return numbers.astype(np.int32)
+    return numbers
+
+
+class SeasonTable:
+    """One scraped table for one season, stored column-wise as NumPy arrays."""
+
+    def __init__(self, season, table, columns):
+        self.season = season
+        self.table = table
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    @classmethod
+    def from_html(cls, page, season, table):
+        """Parse a saved or freshly fetched page. Raises ValueError if the table is missing."""
+        table_html = slice_table(page, table)
+        if table_html is None:
+            raise ValueError(f"No {table} table in page for {season}")
+        import numpy as np
+        rows = parse_rows(table_html)
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        columns = {'season': np.full(len(rows), season, dtype=np.int32)}
+        for name in names:
+            columns[name] = typed_column(name, [row.get(name, '') for row in rows])
+        return cls(season, table, columns)
+
+    def one_row_per_player(self):
+        """
+        Keep one row per player: the season total for traded players (which
+        Basketball-Reference lists before the per-team rows), otherwise their only row
+        """
+        import numpy as np
+        slugs = self.columns.get('player_slug', self.columns['player'])
+        _, first = np.unique(slugs, return_index=True)
+        keep = np.sort(first)
+        return SeasonTable(self.season, self.table, {k: v[keep] for k, v in self.columns.items()})
+
+    def to_dataframe(self):
+        # Imported lazily so scraping to CSV doesn't need pandas installed
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
+def cache_path(cache_dir, season, table):
+    return os.path.join(cache_dir, f"NBA_{page_year(season)}_{table}.html")
+
+
+def is_fresh(path, season):
+    """Cached pages for finished seasons never expire; the current season's do."""
+    if not os.path.exists(path):
+        return False
+    if page_year(season) < date.today().year or (page_year(season) == date.today().year
+                                                 and date.today().month > 6):
+        return True
+    return time.time() - os.path.getmtime(path) < CURRENT_SEASON_MAX_AGE
+
+
+def fetch_page(session, season, table, cache_dir, limiter, offline=False, max_retries=MAX_RETRIES):
+    """
+    Return the page HTML for one season/table, from the page cache when possible
+
+    Args:
+        session: requests.Session
+        season: API season year
+        table: Key of TABLES
+        cache_dir: Page cache / fixture directory
+        limiter: Shared TokenBucket pacing every request to the site
+        offline: Only read the cache; a missing page raises FileNotFoundError
+        max_retries: Retries for 429/5xx/network errors, with jittered backoff
+
+    Returns:
+        (html, from_cache)
+    """
+    path = cache_path(cache_dir, season, table)
+    if offline or is_fresh(path, season):
+        with open(path, encoding='utf-8') as f:
+            return f.read(), True
+
+    url = SEASON_URL.format(year=page_year(season), table=table)
+    for attempt in range(1, max_retries + 2):
+        limiter.acquire()
+        try:
+            response = session.get(url, headers=HEADERS, timeout=30)
+            if response.status_code not in RETRYABLE_STATUS:
+                response.raise_for_status()
+                break
+            error = f"HTTP {response.status_code}"
+            retry_after = response.headers.get('Retry-After', '')
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error, retry_after = str(e), ''
+        if attempt > max_retries:
+            raise requests.exceptions.RetryError(f"{url}: {error} after {max_retries} retries")
+        delay = float(retry_after) if retry_after.isdigit() else backoff_delay(attempt, base=5.0, cap=120.0)
+        record_retry('basketball-reference.com', attempt, reason=error)
+        print(f"⚠️  {url}: {error} - retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+    page = response.content.decode('utf-8', errors='replace')
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    os.replace(tmp_path, path)
+    return page, False
+
+
+def scrape_seasons(start=DEFAULT_START, end=DEFAULT_END, tables=tuple(TABLES), workers=DEFAULT_WORKERS,
+                   rps=DEFAULT_RPS, cache_dir=DEFAULT_CACHE_DIR, offline=False, session=None):
+    """
+    Crawl and parse every (season, table) page in the range
+
+    Args:
+        start: First API season year
+        end: Last API season year (inclusive)
+        tables: Table names to scrape (keys of TABLES)
+        workers: Concurrent fetch/parse threads
+        rps: Requests per second shared by all workers (cache hits are free)
+        cache_dir: Page cache / fixture directory
+        offline: Parse cached pages only
+        session: Optional requests.Session
+
+    Returns:
+        ({table: [SeasonTable, ...] sorted by season}, [(season, table, error), ...])
+    """
+    session = session or requests.Session()
+    limiter = TokenBucket(rps, capacity=1, name='basketball-reference.com')
+    jobs = [(season, table) for season in range(start, end + 1) for table in tables]
+
+    def worker(job):
+        season, table = job
+        page, from_cache = fetch_page(session, season, table, cache_dir, limiter, offline=offline)
+        with stage('parse'):
+            return SeasonTable.from_html(page, page_year(season), table), from_cache
+
+    print(f"🏀 Scraping {len(jobs)} Basketball-Reference pages ({start}-{end}: {', '.join(tables)}) "
+          f"with {workers} workers at {rps} req/s{' (offline)' if offline else ''}...")
+    results = {table: [] for table in tables}
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(worker, job): job for job in jobs}
+        for i, future in enumerate(as_completed(futures), 1):
+            season, table = futures[future]
+            try:
+                parsed, from_cache = future.result()
+            except (requests.exceptions.RequestException, OSError, ValueError) as e:
+                failed.append((season, table, str(e)))
+                print(f"  [{i}/{len(jobs)}] ❌ {season} {table}: {e}")
+                continue
+            results[table].append(parsed)
+            print(f"  [{i}/{len(jobs)}] ✅ {season} {table}: {len(parsed)} rows"
+                  + (" (cached)" if from_cache else ""))
+
+    for table in results:
+        results[table].sort(key=lambda t: t.season)
+    return results, failed
+
+
+def write_tables_csv(season_tables, output_path):
+    """Write SeasonTables (one table type, many seasons) to a single CSV with the union of columns."""
+    names = list(dict.fromkeys(name for t in season_tables for name in t.columns))
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for t in season_tables:
+            columns = [t.columns[name].tolist() if name in t.columns else [''] * len(t) for name in names]
+            for row in zip(*columns):
+                writer.writerow(['' if isinstance(v, float) and v != v else v for v in row])
+    print(f"📝 Wrote {sum(len(t) for t in season_tables)} rows to {output_path}")
+
+
+def link_crosswalk_slugs(season_tables, crosswalk_path):
+    """
+    Record Basketball-Reference slugs in the player crosswalk, attaching each to the
+    single crosswalk player with the same normalized name when there is exactly one
+    """
+    from player_crosswalk import PlayerCrosswalk
+
+    seen = {}
+    for t in season_tables:
+        for slug, name in zip(t.columns.get('player_slug', ()), t.columns['player']):
+            seen.setdefault(slug, name)
+
+    records = []
+    with PlayerCrosswalk(crosswalk_path) as crosswalk:
+        for slug, name in seen.items():
+            if crosswalk.by_bbref(slug):
+                continue
+            candidates = [row for row in crosswalk.by_name(name) if row['bbref_slug'] is None]
+            nba_id = candidates[0]['nba_id'] if len(candidates) == 1 else None
+            records.append({'bbref_slug': slug, 'nba_id': nba_id, 'name': name})
+        counts = crosswalk.upsert_many(records)
+    linked = sum(1 for r in records if r['nba_id'] is not None)
+    print(f"📇 Crosswalk: {len(records)} new slugs ({linked} linked to NBA IDs, {counts['inserted']} new rows)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Basketball-Reference season stat tables")
+    parser.add_argument('start', nargs='?', type=int, default=DEFAULT_START,
+                        help=f"First API season year, e.g. 1996 for 1996-97 (default: {DEFAULT_START})")
+    parser.add_argument('end', nargs='?', type=int, default=DEFAULT_END,
+                        help=f"Last API season year (default: {DEFAULT_END})")
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent page fetches (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--rps', type=float, default=DEFAULT_RPS,
+                        help=f"Requests per second shared by all workers (default: {DEFAULT_RPS})")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"On-disk page cache, also used as the fixture directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--offline', action='store_true',
+                        help="Parse cached/saved pages only and never touch the network")
+    parser.add_argument('--output-dir', default='.',
+                        help="Where bbref_<table>.csv files are written (default: current directory)")
+    parser.add_argument('--all-rows', action='store_true',
+                        help="Keep traded players' per-team rows instead of only their season totals")
+    parser.add_argument('--crosswalk', nargs='?', const='player_crosswalk.sqlite', default=None, metavar='PATH',
+                        help="Record scraped bbref slugs in the player crosswalk")
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics_from_args(args, job='bbref_scraper')
+
+    results, failed = scrape_seasons(args.start, args.end, tables=args.tables, workers=args.workers,
+                                     rps=args.rps, cache_dir=args.cache_dir, offline=args.offline)
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    for table, season_tables in results.items():
+        if not season_tables:
+            continue
+        if not args.all_rows:
+            season_tables = [t.one_row_per_player() for t in season_tables]
+        with stage('write'):
+            write_tables_csv(season_tables, os.path.join(args.output_dir, f"bbref_{table}.csv"))
+        if args.crosswalk:
+            link_crosswalk_slugs(season_tables, args.crosswalk)
+
+    if failed:
+        print(f"\n❌ {len(failed)} page(s) failed: "
+              + ', '.join(f"{season} {table}" for season, table, _ in failed))
+        sys.exit(1)
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup-time regression check for tools.py
+Runs each case under `python -X importtime` and fails if a heavy dependency is
+imported on a path that shouldn't need it, or if the median wall time goes over
+budget. Cases run in a fresh interpreter, so the figures include interpreter start.
+Each subcommand's `--help` loads only that script: it may import requests, which the
+scripts build their sessions from, but nothing the tool only needs once it runs.
+
+Usage:
+    python benchmarks/check_startup.py
+    python benchmarks/check_startup.py --repeat 10 --budget-ms 150 --command-budget-ms 300
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS = os.path.join(REPO_ROOT, 'tools.py')
+
+# Top-level packages none of the help/usage paths may import
+HEAVY_MODULES = ('requests', 'urllib3', 'nba_api', 'numpy', 'pandas', 'bs4', 'dotenv', 'PIL', 'psycopg2')
+
+# name -> tools.py arguments; every case must exit before any subcommand is loaded
+CASES = {
+    'help': ['--help'],
+    'no-command': [],
+    'unknown-command': ['not-a-command'],
+}
+
+# name -> tools.py arguments; each case loads one script and exits from its parser
+COMMAND_CASES = {
+    'ids --help': ['ids', '--help'],
+    'headshots --help': ['headshots', '--help'],
+    'birthdates --help': ['birthdates', '--help'],
+    'scrape --help': ['scrape', '--help'],
+    'refresh --help': ['refresh', '--help'],
+}
+# Every script imports requests at module level
+COMMAND_ALLOWED = {'requests', 'urllib3'}
+
+DEFAULT_BUDGET_MS = 250
+DEFAULT_COMMAND_BUDGET_MS = 400
+
+
+def imported_modules(importtime_output):
+    """Top-level module names from `-X importtime` stderr."""
+    names = set()
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        name = line.rsplit('|', 1)[-1].strip()
+        names.add(name.split('.')[0])
+    return names
+
+
+def run_case(argv):
+    """Run tools.py once. Returns (wall_seconds, imported top-level modules)."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', TOOLS] + argv, cwd=REPO_ROOT,
+                          capture_output=True, text=True)
+    return time.perf_counter() - started, imported_modules(proc.stderr)
+
+
+def check(repeat=5, budget_ms=DEFAULT_BUDGET_MS, command_budget_ms=DEFAULT_COMMAND_BUDGET_MS):
+    """Run every case and print a report. Returns the list of failure messages."""
+    failures = []
+    print(f"  {'Case':<18} {'Median ms':>10} {'Max ms':>8}  Heavy imports")
+    print("  " + "-" * 60)
+    groups = [(CASES, set(), budget_ms), (COMMAND_CASES, COMMAND_ALLOWED, command_budget_ms)]
+    for cases, allowed, budget in groups:
+        for name, argv in cases.items():
+            walls, heavy = [], set()
+            for _ in range(max(1, repeat)):
+                wall, modules = run_case(argv)
+                walls.append(wall * 1000)
+                heavy |= modules & set(HEAVY_MODULES)
+            median = statistics.median(walls)
+            print(f"  {name:<18} {median:>10.1f} {max(walls):>8.1f}  {', '.join(sorted(heavy)) or '-'}")
+            if heavy - allowed:
+                failures.append(f"{name}: imported {', '.join(sorted(heavy - allowed))}")
+            if median > budget:
+                failures.append(f"{name}: median {median:.0f}ms is over the {budget}ms budget")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that tools.py starts fast and imports nothing heavy")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per case; the median is checked (default: 5)")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Median wall-time budget per case, in ms (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument('--command-budget-ms', type=float, default=DEFAULT_COMMAND_BUDGET_MS,
+                        help=f"Budget for the subcommand --help cases, in ms (default: {DEFAULT_COMMAND_BUDGET_MS})")
+    args = parser.parse_args()
+
+    print(f"🚀 Checking tools.py startup ({args.repeat}x per case)")
+    failures = check(repeat=args.repeat, budget_ms=args.budget_ms, command_budget_ms=args.command_budget_ms)
+    if failures:
+        print("\n❌ Startup check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the fetch/download scripts
+Each scenario runs a real script as a subprocess against the local stub server
+(benchmarks/stub_server.py) and records wall-clock time, requests/sec, bytes served
+and the child's peak RSS. Results are appended to benchmarks/results.jsonl with the
+git revision, and each run is compared against the latest result from another revision.
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # every scenario
+    python benchmarks/run_benchmarks.py headshots-540 --repeat 3
+    python benchmarks/run_benchmarks.py --list
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+from stub_server import REPO_ROOT, StubConfig, StubServer, StubState, load_players, DEFAULT_PLAYERS_CSV
+
+RESULTS_PATH = os.path.join(REPO_ROOT, 'benchmarks', 'results.jsonl')
+HEADSHOT_PATH = '/headshots/nba/latest/1040x760/{person_id}.png'
+
+
+def script(name):
+    return os.path.join(REPO_ROOT, name)
+
+
+# argv/prepare entries may use {base} (stub URL) and {csv} (fixture player CSV);
+# `prepare` runs first, unmeasured, in the same working directory
+SCENARIOS = {
+    'player-ids': {
+        'description': "Single-season commonallplayers fetch",
+        'argv': [script('fetch_nba_player_ids.py'), '2024-25', 'ids.csv'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'player-ids-backfill': {
+        'description': "29-season registry backfill, 5% injected 503s",
+        'argv': [script('fetch_nba_player_ids.py'), '--backfill', '1996', '2024', '--workers', '8', '--rps', '50'],
+        'server': StubConfig(latency_ms=50, error_rate=0.05),
+    },
+    'birthdates-bulk': {
+        'description': "BallDontLie paging + 30 team rosters + per-player fallbacks",
+        'argv': [script('fetch-player-birthdates.py'), '--workers', '8', '--rps', '50'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'birthdates-per-player': {
+        'description': "One CommonPlayerInfo call per player, 429 on every 50th",
+        'argv': [script('fetch-player-birthdates.py'), '--source', 'per-player', '--workers', '8', '--rps', '50'],
+        'server': StubConfig(latency_ms=50, throttle_every=50),
+    },
+    'historical-averages': {
+        'description': "29 league-wide season-average requests, staged to CSV (no database)",
+        'argv': [script('historical_averages.py'), '1996', '2024', '--workers', '4', '--rps', '50',
+                 '--output', 'averages.csv'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'refresh': {
+        'description': "Pipelined roster fetch + 540 headshots + 30 team rosters, one process",
+        'argv': [script('refresh_pipeline.py'), '2024-25', 'ids.csv', '--output-directory', 'headshots',
+                 '--headshot-workers', '16', '--max-rps', '0', '--birthdate-workers', '8', '--birthdate-rps', '50'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'headshots-540': {
+        'description': "Download every fixture headshot at 50ms RTT",
+        'argv': [script('download_player_headshots.py'), '{csv}', 'headshots', '--workers', '16', '--max-rps', '0'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'headshots-540-sync': {
+        'description': "Conditional re-sync of an up-to-date headshot directory (all 304s)",
+        'prepare': [script('download_player_headshots.py'), '{csv}', 'headshots', '--workers', '16',
+                    '--max-rps', '0', '--sync'],
+        'argv': [script('download_player_headshots.py'), '{csv}', 'headshots', '--workers', '16',
+                 '--max-rps', '0', '--sync'],
+        'server': StubConfig(latency_ms=50),
+    },
+    'headshots-540-faults': {
+        'description': "Headshot download with 5% 503s and a 429 every 40 requests",
+        'argv': [script('download_player_headshots.py'), '{csv}', 'headshots', '--workers', '16', '--max-rps', '0'],
+        'server': StubConfig(latency_ms=50, throttle_every=40, error_rate=0.05),
+    },
+}
+
+
+def scenario_env(base_url):
+    """Point every script at the stub server."""
+    return dict(
+        os.environ,
+        NBA_API_URL=f"{base_url}/stats/commonallplayers",
+        NBA_STATS_BASE=f"{base_url}/stats/{{endpoint}}",
+        BALLDONTLIE_BASE=f"{base_url}/v1",
+        BALLDONTLIE_KEY='benchmark',
+        NBA_HEADSHOT_URL=f"{base_url}{HEADSHOT_PATH}",
+        NBA_LEAGUE_DASH_URL=f"{base_url}/stats/leaguedashplayerstats",
+        PYTHONUNBUFFERED='1',
+    )
+
+
+def run_child(argv, cwd, env, log_path):
+    """Run a script to completion. Returns (exit_code, wall_seconds, peak_rss_bytes)."""
+    with open(log_path, 'ab') as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen([sys.executable] + argv, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+    return proc.returncode, wall, peak
+
+
+def run_scenario(name, scenario, server, csv_filename, keep_dir=False):
+    """Run one scenario in a scratch directory and return its measurements."""
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    log_path = os.path.join(workdir, 'output.log')
+    env = scenario_env(server.base_url)
+    fill = lambda argv: [arg.format(base=server.base_url, csv=csv_filename) for arg in argv]
+    try:
+        server.state.configure(scenario['server'])
+        if scenario.get('prepare'):
+            run_child(fill(scenario['prepare']), workdir, env, log_path)
+            server.state.configure(scenario['server'])
+
+        code, wall, peak = run_child(fill(scenario['argv']), workdir, env, log_path)
+        traffic = server.state.snapshot()
+        if code != 0:
+            with open(log_path, encoding='utf-8', errors='replace') as f:
+                tail = f.read()[-2000:]
+            print(f"  ⚠️  {name} exited with {code}; last output:\n{tail}")
+        return {
+            'scenario': name,
+            'exit_code': code,
+            'wall_s': round(wall, 3),
+            'requests': traffic['requests'],
+            'req_per_s': round(traffic['requests'] / wall, 1) if wall else 0.0,
+            'bytes': traffic['bytes_sent'],
+            'statuses': traffic['statuses'],
+            'peak_rss_mb': round(peak / (1024 * 1024), 1),
+            'server': scenario['server'].to_dict(),
+        }
+    finally:
+        if keep_dir:
+            print(f"  📁 {name} output kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, scenario, revision):
+    """Latest stored result for `scenario` from a different revision, or None."""
+    for record in reversed(history):
+        if record['scenario'] == scenario and record.get('revision') != revision:
+            return record
+    return None
+
+
+def print_report(results, history, revision):
+    print(f"\n  {'Scenario':<24} {'Wall s':>8} {'Req/s':>8} {'Requests':>9} {'MB':>8} {'Peak RSS':>9}  vs previous")
+    print("  " + "-" * 88)
+    for r in results:
+        prev = previous_result(history, r['scenario'], revision)
+        delta = ''
+        if prev and prev.get('wall_s'):
+            change = (r['wall_s'] - prev['wall_s']) / prev['wall_s'] * 100
+            delta = f"{change:+.1f}% wall ({prev['revision']})"
+        status = '' if r['exit_code'] == 0 else f"  exit {r['exit_code']}"
+        print(f"  {r['scenario']:<24} {r['wall_s']:>8.2f} {r['req_per_s']:>8.1f} {r['requests']:>9} "
+              f"{r['bytes'] / 1e6:>8.2f} {r['peak_rss_mb']:>7.1f}MB  {delta}{status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fetch/download scripts against a local stub server")
+    parser.add_argument('scenarios', nargs='*', help="Scenarios to run (default: all)")
+    parser.add_argument('--list', action='store_true', help="List scenarios and exit")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per scenario; the median wall time is kept")
+    parser.add_argument('--players-csv', default=DEFAULT_PLAYERS_CSV, help="Fixture players (default: nba_player_ids.csv)")
+    parser.add_argument('--results', default=RESULTS_PATH, help=f"Results history (default: {RESULTS_PATH})")
+    parser.add_argument('--no-save', action='store_true', help="Don't append results to the history file")
+    parser.add_argument('--keep', action='store_true', help="Keep each scenario's scratch directory")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"  {name:<24} {scenario['description']}")
+        sys.exit(0)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)} (see --list)")
+
+    names = args.scenarios or list(SCENARIOS)
+    revision = git_revision()
+    csv_filename = os.path.abspath(args.players_csv)
+    state = StubState(load_players(csv_filename))
+
+    print(f"🏁 Running {len(names)} benchmark scenario(s) at {revision} ({args.repeat}x each)")
+    results = []
+    with StubServer(state) as server:
+        for name in names:
+            print(f"  ⏱️  {name}: {SCENARIOS[name]['description']}")
+            runs = [run_scenario(name, SCENARIOS[name], server, csv_filename, keep_dir=args.keep)
+                    for _ in range(max(1, args.repeat))]
+            median = statistics.median(r['wall_s'] for r in runs)
+            result = min(runs, key=lambda r: abs(r['wall_s'] - median))
+            result.update(revision=revision, repeat=len(runs),
+                          timestamp=datetime.now().isoformat(timespec='seconds'),
+                          python=platform.python_version())
+            results.append(result)
+
+    history = load_results(args.results)
+    print_report(results, history, revision)
+
+    if not args.no_save:
+        with open(args.results, 'a', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, sort_keys=True) + '\n')
+        print(f"\n📝 Appended {len(results)} result(s) to {args.results}")
+
+    sys.exit(1 if any(r['exit_code'] != 0 for r in results) else 0)
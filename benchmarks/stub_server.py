@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for stats.nba.com, the BallDontLie API and the headshot CDN
+Serves deterministic fixtures built from nba_player_ids.csv (or replays responses
+recorded in an http_cache.py SQLite file) with configurable latency, periodic 429s
+and random 5xx errors, and counts requests and bytes for the benchmark runner.
+
+Routes:
+    /stats/commonallplayers      season rowSet (each player active from a fixed first season)
+    /stats/commonteamroster      roster with BIRTH_DATE (every 10th player left off, to exercise fallbacks)
+    /stats/commonplayerinfo      BIRTHDATE for one PlayerID
+    /stats/leaguedashplayerstats per-game averages for every player active in the Season
+    /v1/players/active           BallDontLie cursor pages
+    /headshots/nba/latest/1040x760/<id>.png
+                                 deterministic image bytes with an ETag (304 on If-None-Match)
+
+Usage:
+    python benchmarks/stub_server.py --port 8766 --latency-ms 50 --throttle-every 20
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PLAYERS_CSV = os.path.join(REPO_ROOT, 'nba_player_ids.csv')
+
+FIRST_TEAM_ID = 1610612737  # NBA team IDs are the 30 consecutive values from here
+TEAM_COUNT = 30
+FIRST_SEASON = 1996
+DEFAULT_IMAGE_BYTES = 24 * 1024
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Faults only hit the NBA endpoints; BallDontLie paging has no retry path worth measuring
+FAULT_PREFIXES = ('/stats/', '/headshots/')
+
+
+class StubConfig:
+    """Fault and latency settings; the runner swaps these between scenarios."""
+
+    def __init__(self, latency_ms=0.0, throttle_every=0, error_rate=0.0, image_bytes=DEFAULT_IMAGE_BYTES, seed=0):
+        """
+        Args:
+            latency_ms: Delay added before every response (simulated round trip)
+            throttle_every: Answer every Nth faultable request with 429 (0 = never)
+            error_rate: Probability of a 503 on faultable requests
+            image_bytes: Size of each synthesized headshot
+            seed: Seed for the error-injection RNG so runs are repeatable
+        """
+        self.latency_ms = latency_ms
+        self.throttle_every = throttle_every
+        self.error_rate = error_rate
+        self.image_bytes = image_bytes
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def load_players(csv_filename=DEFAULT_PLAYERS_CSV):
+    """Fixture players as dicts with bdl_id, nba_id, first/last name and team slot."""
+    players = []
+    with open(csv_filename, newline='', encoding='utf-8') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            first, _, last = row['Name'].partition(' ')
+            players.append({
+                'bdl_id': i + 1,
+                'nba_id': int(row['PersonID']),
+                'name': row['Name'],
+                'first_name': first,
+                'last_name': last,
+                'team_id': FIRST_TEAM_ID + i % TEAM_COUNT,
+                'first_season': FIRST_SEASON + i % 29,
+                'birthdate': f"{1980 + i % 25}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            })
+    return players
+
+
+def load_replay(cache_path):
+    """Map 'path?sorted-query' -> (status, headers, body) from an http_cache.py database."""
+    replay = {}
+    conn = sqlite3.connect(cache_path)
+    for key, status, headers, body in conn.execute('SELECT key, status, headers, body FROM responses'):
+        url = key.split(' ', 1)[1]
+        parts = urlsplit(url)
+        replay[f"{parts.path}?{parts.query}"] = (status, json.loads(headers), body)
+    conn.close()
+    return replay
+
+
+def result_set(name, headers, rows):
+    return {'resultSets': [{'name': name, 'headers': headers, 'rowSet': rows}]}
+
+
+class StubState:
+    """Fixtures, current config and thread-safe traffic counters shared by all handler threads."""
+
+    def __init__(self, players, config=None, replay=None):
+        self.players = players
+        self.by_nba = {p['nba_id']: p for p in players}
+        self.replay = replay or {}
+        self._lock = threading.Lock()
+        self.configure(config or StubConfig())
+
+    def configure(self, config):
+        with self._lock:
+            self.config = config
+            self._rng = random.Random(config.seed)
+            self._faultable = 0
+            self.requests = 0
+            self.bytes_sent = 0
+            self.statuses = Counter()
+
+    def snapshot(self):
+        with self._lock:
+            return {'requests': self.requests, 'bytes_sent': self.bytes_sent,
+                    'statuses': {str(k): v for k, v in sorted(self.statuses.items())}}
+
+    def pick_fault(self, path):
+        """Return 429, 503 or None for this request, advancing the deterministic fault schedule."""
+        if not path.startswith(FAULT_PREFIXES):
+            return None
+        with self._lock:
+            self._faultable += 1
+            if self.config.throttle_every and self._faultable % self.config.throttle_every == 0:
+                return 429
+            if self.config.error_rate and self._rng.random() < self.config.error_rate:
+                return 503
+        return None
+
+    def record(self, status, size):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+            self.statuses[status] += 1
+
+    def image(self, player):
+        """Deterministic headshot bytes; every 20th player gets the shared placeholder."""
+        seed = b'placeholder' if player['bdl_id'] % 20 == 0 else str(player['nba_id']).encode()
+        block = hashlib.sha256(seed).digest()
+        size = self.config.image_bytes
+        return PNG_SIGNATURE + (block * (size // len(block) + 1))[:max(0, size - len(PNG_SIGNATURE))]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status, body, content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.record(status, len(body))
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+        config = self.state.config
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000.0)
+
+        fault = self.state.pick_fault(parts.path)
+        if fault == 429:
+            return self.send_body(429, b'{"message": "Too Many Requests"}', headers={'Retry-After': '1'})
+        if fault:
+            return self.send_body(fault, b'Service Unavailable', content_type='text/plain')
+
+        replayed = self.state.replay.get(f"{parts.path}?{urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))}")
+        if replayed:
+            status, headers, body = replayed
+            return self.send_body(status, body, content_type=headers.get('Content-Type', 'application/json'))
+
+        route = parts.path.rstrip('/').rsplit('/', 1)[-1]
+        if parts.path.startswith('/stats/'):
+            handler = getattr(self, f"stats_{route}", None)
+            if handler:
+                return handler(query)
+        elif parts.path.startswith('/v1/players'):
+            return self.players_page(query)
+        elif parts.path.startswith('/headshots/') and route.endswith('.png'):
+            return self.headshot(route[:-len('.png')])
+        return self.send_body(404, {'message': 'not found'})
+
+    def stats_commonallplayers(self, query):
+        year = int(query.get('Season', '2024-25')[:4])
+        rows = [[p['nba_id'], f"{p['last_name']}, {p['first_name']}", p['name'], p['team_id'], 'City', 'Team']
+                for p in self.state.players if p['first_season'] <= year]
+        headers = ['PERSON_ID', 'DISPLAY_LAST_COMMA_FIRST', 'DISPLAY_FIRST_LAST', 'TEAM_ID', 'TEAM_CITY', 'TEAM_NAME']
+        self.send_body(200, result_set('CommonAllPlayers', headers, rows))
+
+    def stats_commonteamroster(self, query):
+        team_id = int(query.get('TeamID', 0))
+        season = query.get('Season', '2024-25')
+        rows = []
+        for p in self.state.players:
+            if p['team_id'] != team_id or p['bdl_id'] % 10 == 0:
+                continue
+            born = time.strptime(p['birthdate'], '%Y-%m-%d')
+            rows.append([team_id, season[:4], '00', p['name'], p['name'].lower().replace(' ', '-'),
+                         time.strftime('%b %d, %Y', born).upper(), p['nba_id']])
+        headers = ['TeamID', 'SEASON', 'LeagueID', 'PLAYER', 'PLAYER_SLUG', 'BIRTH_DATE', 'PLAYER_ID']
+        self.send_body(200, result_set('CommonTeamRoster', headers, rows))
+
+    def stats_leaguedashplayerstats(self, query):
+        year = int(query.get('Season', '2024-25')[:4])
+        rows = []
+        for p in self.state.players:
+            if p['first_season'] > year:
+                continue
+            seed = p['nba_id'] + year
+            games = 20 + seed % 63
+            fga = 4.0 + seed % 17
+            fgm = round(fga * (0.38 + seed % 15 / 100), 1)
+            rows.append([p['nba_id'], p['name'], float(19 + (year - p['first_season']) % 20), games,
+                         round(10 + seed % 28 + 0.5, 1), round(2 * fgm + 2.0, 1), float(seed % 9),
+                         float(2 + seed % 11), float(seed % 3), float(seed % 2), float(seed % 4),
+                         fgm, fga, round(fgm / fga, 3), 1.0, 3.0, 0.333, 2.0, 2.5, 0.8])
+        headers = ['PLAYER_ID', 'PLAYER_NAME', 'AGE', 'GP', 'MIN', 'PTS', 'AST', 'REB', 'STL', 'BLK', 'TOV',
+                   'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT']
+        self.send_body(200, result_set('LeagueDashPlayerStats', headers, rows))
+
+    def stats_commonplayerinfo(self, query):
+        player = self.state.by_nba.get(int(query.get('PlayerID', 0)))
+        rows = [[player['nba_id'], player['name'], f"{player['birthdate']}T00:00:00"]] if player else []
+        self.send_body(200, result_set('CommonPlayerInfo', ['PERSON_ID', 'DISPLAY_FIRST_LAST', 'BIRTHDATE'], rows))
+
+    def players_page(self, query):
+        per_page = int(query.get('per_page', 25))
+        cursor = int(query.get('cursor', 0) or 0)
+        page = self.state.players[cursor:cursor + per_page]
+        data = [{'id': p['bdl_id'], 'first_name': p['first_name'], 'last_name': p['last_name']} for p in page]
+        next_cursor = cursor + per_page if cursor + per_page < len(self.state.players) else None
+        self.send_body(200, {'data': data, 'meta': {'next_cursor': next_cursor, 'per_page': per_page}})
+
+    def headshot(self, person_id):
+        player = self.state.by_nba.get(int(person_id)) if person_id.isdigit() else None
+        if player is None:
+            return self.send_body(404, b'Not Found', content_type='text/plain')
+        body = self.state.image(player)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.send_body(304, b'', content_type='image/png', headers={'ETag': etag})
+        self.send_body(200, body, content_type='image/png', headers={'ETag': etag})
+
+
+class StubServer:
+    """Runs the stand-in on a background thread; `base_url` is set once started."""
+
+    def __init__(self, state, host='127.0.0.1', port=0):
+        handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+        self.state = state
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve NBA/BallDontLie/CDN fixtures locally")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--players-csv', default=DEFAULT_PLAYERS_CSV)
+    parser.add_argument('--replay-cache', metavar='PATH', default=None,
+                        help="Replay responses recorded by http_cache.py before falling back to fixtures")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--throttle-every', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--image-bytes', type=int, default=DEFAULT_IMAGE_BYTES)
+    args = parser.parse_args()
+
+    state = StubState(load_players(args.players_csv),
+                      StubConfig(args.latency_ms, args.throttle_every, args.error_rate, args.image_bytes),
+                      replay=load_replay(args.replay_cache) if args.replay_cache else None)
+    server = StubServer(state, port=args.port)
+    print(f"🧪 Stub server on {server.base_url} ({len(state.players)} players)")
+    print(f"   NBA_API_URL={server.base_url}/stats/commonallplayers")
+    print(f"   NBA_STATS_BASE={server.base_url}/stats/{{endpoint}}")
+    print(f"   BALLDONTLIE_BASE={server.base_url}/v1")
+    print(f"   NBA_HEADSHOT_URL={server.base_url}/headshots/nba/latest/1040x760/{{person_id}}.png")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{json.dumps(state.snapshot())}")
+        sys.exit(0)
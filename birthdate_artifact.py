@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Compact player birthdate artifact
+Stores birthdates as two parallel int32 columns - BallDontLie player IDs (sorted)
+and birthdates as days since 1970-01-01 - instead of a generated object literal,
+so loading is a single read and lookups are a binary search.
+
+Two encodings of the same columns:
+    player-birthdates.bin            b'PBD1', uint32 count, count x int32 IDs,
+                                     count x int32 epoch days (all little-endian)
+    player-birthdates.compact.json   {"ids": [...], "days": [...]}
+
+The TypeScript side imports the JSON form through a generated lookup shim
+(src/etl/constants/player-birthdates-compact.ts). The hand-editable source of truth
+stays src/etl/constants/player-birthdates.ts: `sync` regenerates the compact JSON
+from it, and `check` fails when the two disagree.
+
+Usage:
+    table = BirthdateTable.load('player-birthdates.bin')
+    table.get(115)                                   # -> '1988-03-14'
+
+CLI:
+    python birthdate_artifact.py build player-birthdates.json
+    python birthdate_artifact.py build player-birthdates.json --ts-shim src/etl/constants/player-birthdates-compact.ts
+    python birthdate_artifact.py lookup 115
+    python birthdate_artifact.py sync                # after editing player-birthdates.ts by hand
+    python birthdate_artifact.py check               # exit 1 if the compact JSON is stale
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+MAGIC = b'PBD1'
+HEADER = struct.Struct('<4sI')
+EPOCH = date(1970, 1, 1)
+
+OUTPUT_BIN_FILE = 'player-birthdates.bin'
+OUTPUT_COMPACT_JSON_FILE = 'player-birthdates.compact.json'
+CONSTANTS_DIR = os.path.join('src', 'etl', 'constants')
+CONSTANTS_COMPACT_JSON_FILE = os.path.join(CONSTANTS_DIR, 'player-birthdates.compact.json')
+CONSTANTS_SHIM_FILE = os.path.join(CONSTANTS_DIR, 'player-birthdates-compact.ts')
+CONSTANTS_TS_FILE = os.path.join(CONSTANTS_DIR, 'player-birthdates.ts')
+
+CONSTANTS_ENTRY_RE = re.compile(r"^\s*(\d+)\s*:\s*'([^']+)'", re.MULTILINE)
+
+TS_SHIM_TEMPLATE = """\
+/**
+ * Player Birthdates (compact)
+ *
+ * Generated by birthdate_artifact.py - do not edit by hand.
+ * Birthdates are stored as two parallel columns in {json_name}:
+ * sorted player API IDs and birthdates as days since 1970-01-01 (UTC).
+ * Lookups are a binary search over typed arrays and allocate nothing.
+ */
+
+import data from './{json_name}' with {{ type: 'json' }};
+
+const IDS = Int32Array.from(data.ids);
+const DAYS = Int32Array.from(data.days);
+const MS_PER_DAY = 86_400_000;
+
+/**
+ * Birthdate of a player as days since 1970-01-01, or undefined if unknown
+ */
+export function getPlayerBirthdateDay(apiId: number): number | undefined {{
+  let lo = 0;
+  let hi = IDS.length - 1;
+  while (lo <= hi) {{
+    const mid = (lo + hi) >>> 1;
+    const id = IDS[mid]!;
+    if (id < apiId) {{
+      lo = mid + 1;
+    }} else if (id > apiId) {{
+      hi = mid - 1;
+    }} else {{
+      return DAYS[mid];
+    }}
+  }}
+  return undefined;
+}}
+
+/**
+ * Format an epoch day as YYYY-MM-DD
+ */
+export function formatBirthdateDay(day: number): string {{
+  return new Date(day * MS_PER_DAY).toISOString().slice(0, 10);
+}}
+
+/**
+ * Get birthdate (YYYY-MM-DD) for a player by their API ID
+ */
+export function getPlayerBirthdate(apiId: number): string | undefined {{
+  const day = getPlayerBirthdateDay(apiId);
+  return day === undefined ? undefined : formatBirthdateDay(day);
+}}
+
+/**
+ * Age in whole years on `onDate` (default: today) for a birthdate given as an epoch day
+ */
+export function ageOnDay(birthDay: number, onDate: Date = new Date()): number {{
+  const birth = new Date(birthDay * MS_PER_DAY);
+  let age = onDate.getFullYear() - birth.getUTCFullYear();
+  const monthDiff = onDate.getMonth() - birth.getUTCMonth();
+
+  // Adjust age if birthday hasn't occurred this year
+  if (monthDiff < 0 || (monthDiff === 0 && onDate.getDate() < birth.getUTCDate())) {{
+    age--;
+  }}
+
+  return age;
+}}
+
+export const PLAYER_BIRTHDATE_COUNT = IDS.length;
+"""
+
+
+def to_epoch_day(birthdate: str) -> int:
+    """Convert 'YYYY-MM-DD' (optionally with a time part) to days since 1970-01-01."""
+    return (date.fromisoformat(birthdate[:10]) - EPOCH).days
+
+
+def from_epoch_day(day: int) -> str:
+    """Convert days since 1970-01-01 back to 'YYYY-MM-DD'."""
+    return (EPOCH + timedelta(days=day)).isoformat()
+
+
+def pack_columns(birthdates: Dict[int, str]):
+    """
+    Build the sorted ID and epoch-day columns.
+
+    Args:
+        birthdates: Mapping of player API ID to 'YYYY-MM-DD' birthdate
+
+    Returns:
+        (ids, days) as array('i'), sorted by ID
+    """
+    ids = array('i', sorted(int(api_id) for api_id in birthdates))
+    by_id = {int(api_id): value for api_id, value in birthdates.items()}
+    days = array('i', (to_epoch_day(by_id[api_id]) for api_id in ids))
+    return ids, days
+
+
+def read_constants(path: str = CONSTANTS_TS_FILE) -> Dict[int, str]:
+    """Parse the PLAYER_BIRTHDATES entries of a TypeScript constants file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {int(api_id): birthdate[:10] for api_id, birthdate in CONSTANTS_ENTRY_RE.findall(f.read())}
+
+
+def read_source(path: str) -> Dict[int, str]:
+    """Birthdates from a TypeScript constants file or a {api_id: birthdate} JSON file."""
+    if path.endswith('.ts'):
+        return read_constants(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(expected: Dict[int, str], table: 'BirthdateTable'):
+    """
+    Diff a birthdate table against the constants it should have been built from
+
+    Returns:
+        (missing, extra, different): IDs only in `expected`, IDs only in `table`,
+        and {api_id: (expected, actual)} for IDs whose birthdates disagree
+    """
+    actual = table.to_dict()
+    missing = sorted(expected.keys() - actual.keys())
+    extra = sorted(actual.keys() - expected.keys())
+    different = {api_id: (expected[api_id], actual[api_id]) for api_id in sorted(expected.keys() & actual.keys())
+                 if expected[api_id] != actual[api_id]}
+    return missing, extra, different
+
+
+def _atomic_write(path: str, data: bytes):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_binary(birthdates: Dict[int, str], path: str = OUTPUT_BIN_FILE) -> int:
+    """Write the flat binary form. Returns the number of bytes written."""
+    ids, days = pack_columns(birthdates)
+    if sys.byteorder != 'little':
+        ids.byteswap()
+        days.byteswap()
+    data = HEADER.pack(MAGIC, len(ids)) + ids.tobytes() + days.tobytes()
+    _atomic_write(path, data)
+    return len(data)
+
+
+def write_json_arrays(birthdates: Dict[int, str], path: str = OUTPUT_COMPACT_JSON_FILE) -> int:
+    """Write the JSON-array form. Returns the number of bytes written."""
+    ids, days = pack_columns(birthdates)
+    data = json.dumps({'ids': ids.tolist(), 'days': days.tolist()}, separators=(',', ':')) + '\n'
+    _atomic_write(path, data.encode('utf-8'))
+    return len(data)
+
+
+def write_ts_shim(path: str = CONSTANTS_SHIM_FILE, json_path: str = CONSTANTS_COMPACT_JSON_FILE):
+    """Write the TypeScript lookup shim that imports `json_path` (must sit in the same directory)."""
+    if os.path.dirname(os.path.abspath(path)) != os.path.dirname(os.path.abspath(json_path)):
+        raise ValueError(f"{json_path} must be in the same directory as {path}")
+    shim = TS_SHIM_TEMPLATE.format(json_name=os.path.basename(json_path))
+    _atomic_write(path, shim.encode('utf-8'))
+
+
+def write_artifacts(birthdates: Dict[int, str], bin_path: Optional[str] = OUTPUT_BIN_FILE,
+                    json_path: str = OUTPUT_COMPACT_JSON_FILE, ts_shim_path: Optional[str] = None):
+    """Write the JSON-array form, the binary form unless `bin_path` is None, and the TypeScript shim when `ts_shim_path` is given."""
+    written = []
+    if bin_path:
+        written.append(f"{bin_path} ({write_binary(birthdates, bin_path):,} bytes)")
+    written.append(f"{json_path} ({write_json_arrays(birthdates, json_path):,} bytes)")
+    print(f"🗜️  Wrote compact birthdates for {len(birthdates)} players: {', '.join(written)}")
+    if ts_shim_path:
+        write_ts_shim(ts_shim_path, json_path)
+        print(f"📝 Wrote lookup shim to {ts_shim_path}")
+
+
+class BirthdateTable:
+    """Read-only view over either artifact form; lookups bisect the sorted ID column."""
+
+    def __init__(self, ids: array, days: array):
+        self.ids = ids
+        self.days = days
+
+    @classmethod
+    def load(cls, path: str = OUTPUT_BIN_FILE) -> 'BirthdateTable':
+        """Load the binary or JSON-array form, or a plain {api_id: birthdate} JSON file."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] == MAGIC:
+            return cls.from_bytes(data)
+        payload = json.loads(data)
+        if 'ids' not in payload:
+            return cls(*pack_columns(payload))
+        ids, days = array('i', payload['ids']), array('i', payload['days'])
+        if len(ids) != len(days):
+            raise ValueError(f"{path}: {len(ids)} IDs but {len(days)} birthdates")
+        return cls(ids, days)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BirthdateTable':
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"not a birthdate artifact (magic {magic!r})")
+        expected = HEADER.size + 8 * count
+        if len(data) != expected:
+            raise ValueError(f"truncated birthdate artifact: {len(data)} bytes, expected {expected}")
+        ids, days = array('i'), array('i')
+        ids.frombytes(data[HEADER.size:HEADER.size + 4 * count])
+        days.frombytes(data[HEADER.size + 4 * count:])
+        if sys.byteorder != 'little':
+            ids.byteswap()
+            days.byteswap()
+        return cls(ids, days)
+
+    def _index(self, api_id: int) -> int:
+        i = bisect_left(self.ids, api_id)
+        return i if i < len(self.ids) and self.ids[i] == api_id else -1
+
+    def epoch_day(self, api_id: int) -> Optional[int]:
+        """Birthdate as days since 1970-01-01, or None if unknown."""
+        i = self._index(api_id)
+        return self.days[i] if i >= 0 else None
+
+    def get(self, api_id: int) -> Optional[str]:
+        """Birthdate as 'YYYY-MM-DD', or None if unknown."""
+        day = self.epoch_day(api_id)
+        return from_epoch_day(day) if day is not None else None
+
+    def to_dict(self) -> Dict[int, str]:
+        return {api_id: from_epoch_day(day) for api_id, day in zip(self.ids, self.days)}
+
+    def __contains__(self, api_id) -> bool:
+        return self._index(api_id) >= 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and inspect the compact player birthdate artifact")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build the artifact from a {api_id: birthdate} JSON or .ts constants file")
+    build.add_argument('source', nargs='?', default='player-birthdates.json')
+    build.add_argument('--bin', default=OUTPUT_BIN_FILE, help=f"Binary output (default: {OUTPUT_BIN_FILE})")
+    build.add_argument('--json', default=OUTPUT_COMPACT_JSON_FILE,
+                       help=f"JSON-array output (default: {OUTPUT_COMPACT_JSON_FILE})")
+    build.add_argument('--ts-shim', default=None, metavar='PATH',
+                       help="Also write the TypeScript lookup shim (must be next to --json)")
+
+    sync = commands.add_parser('sync', help="Regenerate the compact JSON and shim the ETL reads from the .ts constants")
+    check = commands.add_parser('check', help="Fail if the compact JSON the ETL reads disagrees with the .ts constants")
+    for command in (sync, check):
+        command.add_argument('--constants', default=CONSTANTS_TS_FILE,
+                             help=f"Source of truth (default: {CONSTANTS_TS_FILE})")
+        command.add_argument('--json', default=CONSTANTS_COMPACT_JSON_FILE,
+                             help=f"Compact JSON the ETL imports (default: {CONSTANTS_COMPACT_JSON_FILE})")
+
+    lookup = commands.add_parser('lookup', help="Look up player birthdates in an artifact")
+    lookup.add_argument('api_ids', type=int, nargs='+')
+    lookup.add_argument('--artifact', default=OUTPUT_BIN_FILE, help="Binary or JSON-array artifact")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        write_artifacts(read_source(args.source), args.bin, args.json, args.ts_shim)
+    elif args.command == 'sync':
+        write_artifacts(read_constants(args.constants), bin_path=None, json_path=args.json,
+                        ts_shim_path=os.path.join(os.path.dirname(args.json), os.path.basename(CONSTANTS_SHIM_FILE)))
+    elif args.command == 'check':
+        if not os.path.exists(args.json):
+            print(f"❌ {args.json} is missing - run: python birthdate_artifact.py sync")
+            sys.exit(1)
+        missing, extra, different = compare(read_constants(args.constants), BirthdateTable.load(args.json))
+        if not (missing or extra or different):
+            print(f"✅ {args.json} matches {args.constants}")
+            sys.exit(0)
+        print(f"❌ {args.json} is out of date with {args.constants}: {len(missing)} missing, "
+              f"{len(extra)} extra, {len(different)} different")
+        for api_id in missing[:10]:
+            print(f"  ➖ {api_id}")
+        for api_id in extra[:10]:
+            print(f"  ➕ {api_id}")
+        for api_id, (expected, actual) in list(different.items())[:10]:
+            print(f"  ✏️  {api_id}: {actual} (constants say {expected})")
+        print("Run: python birthdate_artifact.py sync")
+        sys.exit(1)
+    elif args.command == 'lookup':
+        table = BirthdateTable.load(args.artifact)
+        for api_id in args.api_ids:
+            print(f"  {api_id}: {table.get(api_id) or 'unknown'}")
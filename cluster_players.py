@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Age-bucketed player clustering (NumPy engine)
+Python counterpart of `npm run etl:clustering` (src/etl/jobs/clustering.ts): the same
+features, filters, per-age cluster counts and max-cluster-size splitting, but the
+feature matrix is loaded in bulk into contiguous NumPy arrays, normalized in one
+vectorized pass per bucket, and the 22 age buckets are clustered in parallel across
+a process pool.
+
+Features (src/etl/clustering.ts): points, assists, rebounds, fg_pct, three_pct,
+ft_pct. Rows missing points/assists/rebounds are dropped; missing percentages
+count as 0. Each clustering call min-max normalizes its own input, as the TS job does.
+
+Usage:
+    python cluster_players.py --write-db                       # DATABASE_URL, replaces player_clusters
+    python cluster_players.py --input historical.csv --output clusters.csv
+    python cluster_players.py --input historical.parquet --compare player_clusters.csv
+"""
+
+import os
+import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FEATURES = ('points', 'assists', 'rebounds', 'fg_pct', 'three_pct', 'ft_pct')
+REQUIRED_FEATURES = ('points', 'assists', 'rebounds')
+MIN_AGE, MAX_AGE = 19, 40
+
+DEFAULT_MIN_GAMES = 20
+DEFAULT_MIN_MINUTES = 15
+DEFAULT_MAX_CLUSTER_SIZE = 12
+DEFAULT_CURRENT_SEASON = 2026
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_WORKERS = os.cpu_count() or 4
+
+OUTPUT_COLUMNS = ('age', 'cluster_number', 'player_id', 'season', 'player_name',
+                  'historical_season_average_id', 'season_average_id')
+
+# Current-season rows come first so they win over a historical row for the same player-season
+HISTORICAL_QUERY = """
+    SELECT h.id, NULL::integer, h.player_id, h.season, h.player_name, h.age, {features}
+    FROM historical_season_averages h
+    WHERE h.age BETWEEN %(min_age)s AND %(max_age)s
+      AND h.games_played >= %(min_games)s AND h.minutes >= %(min_minutes)s
+"""
+CURRENT_QUERY = """
+    SELECT NULL::integer, s.id, s.player_id, %(current_season)s, p.full_name, s.age, {features}
+    FROM season_averages s JOIN players p ON p.id = s.player_id
+    WHERE s.season = %(db_season)s
+      AND s.age BETWEEN %(min_age)s AND %(max_age)s
+      AND s.games_played >= %(min_games)s AND s.minutes >= %(min_minutes)s
+"""
+
+
+def cluster_count(age: int) -> int:
+    """Initial k for an age bucket (getClusterCount in src/etl/jobs/clustering.ts)."""
+    if 19 <= age <= 20:
+        return 10
+    if 21 <= age <= 35:
+        return 20
+    if 36 <= age <= 40:
+        return 10
+    raise ValueError(f"Invalid age: {age}. Must be between {MIN_AGE} and {MAX_AGE}.")
+
+
+class PlayerSeasons:
+    """Column-oriented player-season rows with a contiguous (n, 6) float64 feature matrix."""
+
+    def __init__(self, columns):
+        self.historical_id = np.asarray(columns['historical_season_average_id'], dtype=np.int64)
+        self.season_average_id = np.asarray(columns['season_average_id'], dtype=np.int64)
+        self.player_id = np.asarray(columns['player_id'], dtype=np.int64)
+        self.season = np.asarray(columns['season'], dtype=np.int64)
+        self.age = np.asarray(columns['age'], dtype=np.int64)
+        self.player_name = np.asarray(columns['player_name'], dtype=object)
+        self.features = np.ascontiguousarray(columns['features'], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.player_id)
+
+    def take(self, mask) -> 'PlayerSeasons':
+        return PlayerSeasons({
+            'historical_season_average_id': self.historical_id[mask],
+            'season_average_id': self.season_average_id[mask],
+            'player_id': self.player_id[mask],
+            'season': self.season[mask],
+            'age': self.age[mask],
+            'player_name': self.player_name[mask],
+            'features': self.features[mask],
+        })
+
+    def valid(self) -> 'PlayerSeasons':
+        """
+        Apply the TS feature rules: drop rows missing a counting stat or age, zero missing
+        percentages, and keep the first row per (player_id, season) so current-season rows win.
+        """
+        required = [FEATURES.index(name) for name in REQUIRED_FEATURES]
+        keep = ~np.isnan(self.features[:, required]).any(axis=1) & (self.age >= 0)
+        rows = self.take(keep)
+        np.nan_to_num(rows.features, copy=False, nan=0.0)
+        _, first = np.unique(np.stack([rows.player_id, rows.season], axis=1), axis=0, return_index=True)
+        return rows.take(np.sort(first))
+
+
+def _number_column(values, dtype=np.float64, missing=np.nan):
+    """Convert strings/None (CSV or DB values) to a numeric array, with `missing` for blanks."""
+    return np.array([missing if v is None or v == '' else v for v in values], dtype=dtype)
+
+
+def frame_from_columns(columns, min_games=DEFAULT_MIN_GAMES, min_minutes=DEFAULT_MIN_MINUTES) -> PlayerSeasons:
+    """Build PlayerSeasons from a {column: values} export and apply the job's filters."""
+    n = len(columns['player_id'])
+    hsa = columns.get('historical_season_average_id', columns.get('id', [None] * n))
+    games = _number_column(columns.get('games_played', [None] * n))
+    minutes = _number_column(columns.get('minutes', [None] * n))
+    age = _number_column(columns['age'])
+    keep = (games >= min_games) & (minutes >= min_minutes) & (age >= MIN_AGE) & (age <= MAX_AGE)
+
+    rows = PlayerSeasons({
+        'historical_season_average_id': _number_column(hsa, np.int64, -1),
+        'season_average_id': _number_column(columns.get('season_average_id', [None] * n), np.int64, -1),
+        'player_id': _number_column(columns['player_id'], np.int64, -1),
+        'season': _number_column(columns['season'], np.int64, -1),
+        'age': np.nan_to_num(age, nan=-1).astype(np.int64),
+        'player_name': list(columns.get('player_name', [''] * n)),
+        'features': np.column_stack([_number_column(columns[name]) for name in FEATURES]) if n else np.empty((0, 6)),
+    })
+    return rows.take(keep).valid()
+
+
+def load_from_file(path, min_games=DEFAULT_MIN_GAMES, min_minutes=DEFAULT_MIN_MINUTES) -> PlayerSeasons:
+    """Load a CSV or Parquet export of historical_season_averages (snake_case columns)."""
+    if path.endswith('.parquet'):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas (and pyarrow) are required to read Parquet: pip install pandas pyarrow") from None
+        frame = pd.read_parquet(path)
+        columns = {name: frame[name].astype(object).where(frame[name].notna(), None).tolist() for name in frame.columns}
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            columns = {name: [] for name in reader.fieldnames or []}
+            for row in reader:
+                for name in columns:
+                    columns[name].append(row[name])
+    missing = [name for name in ('player_id', 'season', 'age') + FEATURES if name not in columns]
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(missing)}")
+    return frame_from_columns(columns, min_games, min_minutes)
+
+
+def load_from_database(conn, min_games=DEFAULT_MIN_GAMES, min_minutes=DEFAULT_MIN_MINUTES,
+                       current_season=DEFAULT_CURRENT_SEASON) -> PlayerSeasons:
+    """
+    Load current-season and historical averages the same way the TS job does: current
+    rows (season_averages at current_season - 1, stored as current_season) take precedence.
+    """
+    params = {'min_age': MIN_AGE, 'max_age': MAX_AGE, 'min_games': min_games, 'min_minutes': min_minutes,
+              'current_season': current_season, 'db_season': current_season - 1}
+    rows = []
+    with conn.cursor() as cur:
+        for table_alias, query in (('s', CURRENT_QUERY), ('h', HISTORICAL_QUERY)):
+            features = ', '.join(f"{table_alias}.{name}" for name in FEATURES)
+            cur.execute(query.format(features=features), params)
+            rows.extend(cur.fetchall())
+
+    names = ('historical_season_average_id', 'season_average_id', 'player_id', 'season', 'player_name', 'age')
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(names + FEATURES)}
+    return PlayerSeasons({
+        **{name: _number_column(columns[name], np.int64, -1) for name in names if name != 'player_name'},
+        'player_name': columns['player_name'],
+        'features': np.column_stack([_number_column(columns[name]) for name in FEATURES]) if rows else np.empty((0, 6)),
+    }).valid()
+
+
+def normalize(features: np.ndarray) -> np.ndarray:
+    """Min-max normalize each column to [0, 1]; constant columns become 0.5 (normalizeFeatures)."""
+    mins = features.min(axis=0)
+    ranges = features.max(axis=0) - mins
+    safe = np.where(ranges == 0, 1.0, ranges)
+    return np.where(ranges == 0, 0.5, (features - mins) / safe)
+
+
+def _squared_distances(points, centers):
+    distances = (np.einsum('ij,ij->i', points, points)[:, np.newaxis]
+                 - 2.0 * points @ centers.T
+                 + np.einsum('ij,ij->i', centers, centers)[np.newaxis, :])
+    # The expanded form can dip just below zero from rounding
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def _kmeans_plus_plus(points, k, rng):
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.integers(len(points))]
+    closest = _squared_distances(points, centers[:1]).ravel()
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centers[i] = points[index]
+        closest = np.minimum(closest, _squared_distances(points, centers[i:i + 1]).ravel())
+    return centers
+
+
+def kmeans(points, k, rng, max_iterations=DEFAULT_MAX_ITERATIONS, batch_size=None) -> np.ndarray:
+    """
+    k-means with k-means++ seeding. Lloyd iterations by default; with `batch_size`,
+    mini-batch updates (per-center learning rates) followed by one full assignment.
+
+    Returns:
+        int array of cluster indices, one per point
+    """
+    centers = _kmeans_plus_plus(points, k, rng)
+    if batch_size and batch_size < len(points):
+        counts = np.zeros(k)
+        for _ in range(max_iterations):
+            batch = points[rng.choice(len(points), size=batch_size, replace=False)]
+            labels = _squared_distances(batch, centers).argmin(axis=1)
+            for cluster in np.unique(labels):
+                members = batch[labels == cluster]
+                counts[cluster] += len(members)
+                rate = len(members) / counts[cluster]
+                centers[cluster] += rate * (members.mean(axis=0) - centers[cluster])
+        return _squared_distances(points, centers).argmin(axis=1)
+
+    labels = None
+    for _ in range(max_iterations):
+        new_labels = _squared_distances(points, centers).argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        sizes = np.bincount(labels, minlength=k)
+        occupied = sizes > 0
+        centers[occupied] = sums[occupied] / sizes[occupied, np.newaxis]
+    return labels
+
+
+def cluster_players(features, k, rng, max_iterations=DEFAULT_MAX_ITERATIONS, batch_size=None) -> np.ndarray:
+    """clusterPlayers: normalize this subset, then k-means; fewer points than k get one cluster each."""
+    if len(features) < k:
+        return np.arange(len(features))
+    return kmeans(normalize(features), k, rng, max_iterations, batch_size)
+
+
+def split_cluster(features, max_cluster_size, rng, batch_size=None) -> np.ndarray:
+    """splitCluster: recursive 2-means until every sub-cluster has at most `max_cluster_size` players."""
+    if len(features) <= max_cluster_size:
+        return np.zeros(len(features), dtype=np.int64)
+    labels = cluster_players(features, 2, rng, batch_size=batch_size)
+    if labels.min() == labels.max():
+        # Identical points can't be separated by distance; halve by position instead
+        labels = (np.arange(len(features)) >= len(features) // 2).astype(np.int64)
+
+    assignments = np.empty(len(features), dtype=np.int64)
+    left, right = labels == 0, labels != 0
+    assignments[left] = split_cluster(features[left], max_cluster_size, rng, batch_size)
+    offset = assignments[left].max() + 1 if left.any() else 0
+    assignments[right] = split_cluster(features[right], max_cluster_size, rng, batch_size) + offset
+    return assignments
+
+
+def cluster_bucket(task) -> tuple:
+    """
+    processClustersWithSplitting for one age bucket (runs in a worker process).
+
+    Args:
+        task: (age, features, max_cluster_size, seed, max_iterations, batch_size)
+
+    Returns:
+        (age, cluster numbers aligned with `features`, seconds)
+    """
+    age, features, max_cluster_size, seed, max_iterations, batch_size = task
+    started = time.perf_counter()
+    rng = np.random.default_rng([seed, age])
+    initial = cluster_players(features, cluster_count(age), rng, max_iterations, batch_size)
+
+    final = np.empty(len(features), dtype=np.int64)
+    next_cluster = 0
+    # Initial clusters in order of first appearance, matching the TS Map iteration order
+    _, first_seen = np.unique(initial, return_index=True)
+    for cluster in initial[np.sort(first_seen)]:
+        members = np.flatnonzero(initial == cluster)
+        if len(members) > max_cluster_size:
+            local = split_cluster(features[members], max_cluster_size, rng, batch_size)
+            final[members] = next_cluster + local
+            next_cluster += local.max() + 1
+        else:
+            final[members] = next_cluster
+            next_cluster += 1
+    return age, final, time.perf_counter() - started
+
+
+def run_clustering(rows: PlayerSeasons, ages=range(MIN_AGE, MAX_AGE + 1), max_cluster_size=DEFAULT_MAX_CLUSTER_SIZE,
+                   workers=DEFAULT_WORKERS, seed=0, max_iterations=DEFAULT_MAX_ITERATIONS, batch_size=None):
+    """
+    Cluster every age bucket across a process pool.
+
+    Returns:
+        int64 cluster numbers aligned with `rows` (-1 for rows outside `ages`)
+    """
+    clusters = np.full(len(rows), -1, dtype=np.int64)
+    buckets = {age: np.flatnonzero(rows.age == age) for age in ages}
+    tasks = [(age, rows.features[index], max_cluster_size, seed, max_iterations, batch_size)
+             for age, index in buckets.items() if len(index)]
+    # Largest buckets first so the pool isn't left waiting on one big age at the end
+    tasks.sort(key=lambda task: -len(task[1]))
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        for age, assignments, seconds in pool.map(cluster_bucket, tasks):
+            clusters[buckets[age]] = assignments
+            print(f"  📊 Age {age}: {len(assignments)} player-seasons -> "
+                  f"{len(np.unique(assignments))} clusters (initial {cluster_count(age)}) in {seconds:.2f}s")
+    return clusters
+
+
+def assignment_rows(rows: PlayerSeasons, clusters):
+    """Yield player_clusters rows (OUTPUT_COLUMNS order) for every clustered player-season."""
+    nullable = lambda value: None if value < 0 else int(value)
+    for i in np.flatnonzero(clusters >= 0):
+        yield (int(rows.age[i]), int(clusters[i]), int(rows.player_id[i]), int(rows.season[i]),
+               rows.player_name[i], nullable(rows.historical_id[i]), nullable(rows.season_average_id[i]))
+
+
+def write_csv(rows: PlayerSeasons, clusters, output):
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_COLUMNS)
+        writer.writerows(assignment_rows(rows, clusters))
+    os.replace(tmp_path, output)
+
+
+def write_database(conn, rows: PlayerSeasons, clusters, ages) -> int:
+    """Replace player_clusters for `ages` in one transaction, bulk-inserting with COPY."""
+    from pg_bulk import copy_rows
+    with conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM player_clusters WHERE age = ANY(%s)", (list(ages),))
+        return copy_rows(cur, 'player_clusters', OUTPUT_COLUMNS, assignment_rows(rows, clusters))
+
+
+def adjusted_rand_index(labels_a, labels_b) -> float:
+    """Agreement between two clusterings of the same points (1.0 = identical partitions)."""
+    _, a = np.unique(labels_a, return_inverse=True)
+    _, b = np.unique(labels_b, return_inverse=True)
+    contingency = np.zeros((a.max() + 1, b.max() + 1), dtype=np.int64)
+    np.add.at(contingency, (a, b), 1)
+    pairs = lambda counts: (counts * (counts - 1) // 2).sum()
+    index = pairs(contingency)
+    rows_sum, cols_sum = pairs(contingency.sum(axis=1)), pairs(contingency.sum(axis=0))
+    expected = rows_sum * cols_sum / pairs(np.array([len(a)]))
+    maximum = (rows_sum + cols_sum) / 2
+    return 1.0 if maximum == expected else float((index - expected) / (maximum - expected))
+
+
+def compare_with(path, rows: PlayerSeasons, clusters):
+    """Print per-age agreement with an exported player_clusters table (e.g. from the TS job)."""
+    existing = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            existing[(int(record['age']), int(record['player_id']), int(record['season']))] = int(record['cluster_number'])
+
+    print(f"\n  {'Age':>4} {'Shared':>7} {'Only here':>10} {'Only there':>11} {'ARI':>7}")
+    for age in np.unique(rows.age[clusters >= 0]):
+        index = np.flatnonzero((rows.age == age) & (clusters >= 0))
+        keys = [(int(age), int(rows.player_id[i]), int(rows.season[i])) for i in index]
+        shared = [(clusters[i], existing[key]) for i, key in zip(index, keys) if key in existing]
+        theirs = sum(1 for key in existing if key[0] == age)
+        ari = adjusted_rand_index(*zip(*shared)) if len(shared) > 1 else float('nan')
+        print(f"  {age:>4} {len(shared):>7} {len(index) - len(shared):>10} {theirs - len(shared):>11} {ari:>7.3f}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Cluster player-seasons by age with NumPy k-means across a process pool")
+    parser.add_argument('--input', default=None, metavar='PATH',
+                        help="CSV/Parquet export of historical_season_averages (default: read from DATABASE_URL)")
+    parser.add_argument('--database-url', default=None, help="Postgres URL (default: $DATABASE_URL)")
+    parser.add_argument('--output', default=None, metavar='PATH', help="Write assignments as CSV")
+    parser.add_argument('--write-db', action='store_true', help="Replace player_clusters for the clustered ages")
+    parser.add_argument('--compare', default=None, metavar='PATH',
+                        help="Compare against an exported player_clusters CSV (per-age adjusted Rand index)")
+    parser.add_argument('--ages', type=int, nargs=2, default=(MIN_AGE, MAX_AGE), metavar=('FIRST', 'LAST'))
+    parser.add_argument('--min-games', type=int, default=DEFAULT_MIN_GAMES)
+    parser.add_argument('--min-minutes', type=float, default=DEFAULT_MIN_MINUTES)
+    parser.add_argument('--max-cluster-size', type=int, default=DEFAULT_MAX_CLUSTER_SIZE)
+    parser.add_argument('--current-season', type=int, default=DEFAULT_CURRENT_SEASON,
+                        help="Season current averages are stored as (DB reads season - 1)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Worker processes (age buckets in parallel)")
+    parser.add_argument('--mini-batch', type=int, default=None, metavar='SIZE',
+                        help="Use mini-batch k-means with this batch size instead of full Lloyd iterations")
+    parser.add_argument('--max-iterations', type=int, default=DEFAULT_MAX_ITERATIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    first_age, last_age = args.ages
+    if not (MIN_AGE <= first_age <= last_age <= MAX_AGE):
+        parser.error(f"--ages must be within {MIN_AGE}-{MAX_AGE}")
+    ages = range(first_age, last_age + 1)
+    if not (args.output or args.write_db or args.compare):
+        parser.error("nothing to do: pass --output, --write-db and/or --compare")
+
+    print("🔮 Player Clustering (NumPy)")
+    print("=" * 50)
+    started = time.perf_counter()
+
+    conn = None
+    if args.input is None or args.write_db:
+        from pg_bulk import connect
+        conn = connect(args.database_url)
+
+    if args.input:
+        rows = load_from_file(args.input, args.min_games, args.min_minutes)
+        print(f"📥 Loaded {len(rows)} player-seasons from {args.input}")
+    else:
+        rows = load_from_database(conn, args.min_games, args.min_minutes, args.current_season)
+        print(f"📥 Loaded {len(rows)} player-seasons from the database")
+    print(f"📋 Filters: min {args.min_games} games, min {args.min_minutes} min/game; "
+          f"max cluster size {args.max_cluster_size}; {args.workers} workers\n")
+
+    clusters = run_clustering(rows, ages, args.max_cluster_size, args.workers, args.seed,
+                              args.max_iterations, args.mini_batch)
+    clustered = int((clusters >= 0).sum())
+
+    if args.output:
+        write_csv(rows, clusters, args.output)
+        print(f"\n💾 Wrote {clustered} assignments to {args.output}")
+    if args.write_db:
+        inserted = write_database(conn, rows, clusters, ages)
+        print(f"\n💾 Replaced player_clusters for ages {first_age}-{last_age}: {inserted} rows")
+    if args.compare:
+        compare_with(args.compare, rows, clusters)
+    if conn is not None:
+        conn.close()
+
+    print(f"\n✅ Clustered {clustered} player-seasons in {time.perf_counter() - started:.2f}s")
@@ -8,36 +8,49 @@ import requests
 import shutil
 import csv
 import os
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
-def download_player_headshots(csv_filename='nba_player_ids.csv', output_dir='playerHeadshots'):
+from rate_limit import HostRateLimiter
+from http_cache import CachedSession, add_cache_arguments, cache_from_args
+from metrics import add_metrics_arguments, metrics_from_args, stage
+from roster_changes import DEFAULT_LOG_PATH as DEFAULT_CHANGES_PATH, RosterChangeFeed
+
+# NBA_HEADSHOT_URL points downloads at another CDN or a local stand-in (benchmarks/)
+HEADSHOT_URL = os.getenv('NBA_HEADSHOT_URL', "https://cdn.nba.com/headshots/nba/latest/1040x760/{person_id}.png")
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_RPS = 20.0
+MANIFEST_FILENAME = 'manifest.json'
+# Cursor name in the roster change feed (roster_changes.py)
+FEED_CONSUMER = 'headshots'
+
+
+def read_player_rows(csv_filename):
     """
-    Download player headshots from NBA.com CDN based on player IDs in CSV file
-    
+    Read (person_id, player_name) pairs from the player ID CSV file
+
     Args:
         csv_filename: Path to CSV file with columns: Name, PersonID (or similar)
-        output_dir: Directory to save downloaded images
+
+    Returns:
+        List of (person_id, player_name) tuples
     """
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    if not os.path.exists(csv_filename):
-        print(f"❌ Error: CSV file '{csv_filename}' not found")
-        return
-    
-    downloaded_count = 0
-    failed_count = 0
-    
+    rows = []
     with open(csv_filename, 'r', encoding='utf-8') as csvfile:
         readCSV = csv.reader(csvfile, delimiter=',')
-        
+
         # Skip header row if present
         headers = next(readCSV, None)
-        
+
         # Try to find PersonID column index
         person_id_idx = 1  # Default to second column
         name_idx = 0  # Default to first column
-        
+
         if headers:
             try:
                 person_id_idx = headers.index('PersonID')
@@ -46,65 +59,408 @@ def download_player_headshots(csv_filename='nba_player_ids.csv', output_dir='pla
                     person_id_idx = headers.index('personId')
                 except ValueError:
                     pass
-            
+
             try:
                 name_idx = headers.index('Name')
             except ValueError:
                 pass
-        
+
         for row in readCSV:
             if len(row) < 2:
                 continue
-                
+
             person_id = row[person_id_idx].strip()
             player_name = row[name_idx].strip() if len(row) > name_idx else person_id
-            
-            # Construct image URL
-            image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{person_id}.png"
-            image_filename = os.path.join(output_dir, f"{player_name.replace(' ', '_')}.jpg")
-            
-            # Skip if file already exists
-            if os.path.exists(image_filename):
-                print(f"⏭️  Skipping {player_name} (already exists)")
-                continue
-            
-            try:
-                # Download the image
-                r = requests.get(image_url, stream=True, timeout=10)
-                
-                # Check if the image was retrieved successfully
-                if r.status_code == 200:
-                    # Set decode_content value to True
-                    r.raw.decode_content = True
-                    
-                    # Save the image
-                    with open(image_filename, 'wb') as f:
-                        shutil.copyfileobj(r.raw, f)
-                    
-                    print(f"✅ Downloaded: {player_name}")
-                    downloaded_count += 1
-                else:
-                    print(f"❌ Failed to download {player_name} (Status: {r.status_code})")
-                    failed_count += 1
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"❌ Error downloading {player_name}: {e}")
-                failed_count += 1
-    
+            rows.append((person_id, player_name))
+
+    return rows
+
+
+def read_crosswalk_rows(crosswalk_path):
+    """
+    Read (person_id, player_name) pairs for every player with an NBA PersonID in the crosswalk
+
+    Args:
+        crosswalk_path: Path to a player_crosswalk.py SQLite file
+
+    Returns:
+        List of (person_id, player_name) tuples ordered by PersonID
+    """
+    from player_crosswalk import PlayerCrosswalk
+
+    with PlayerCrosswalk(crosswalk_path) as crosswalk:
+        return [(str(row['nba_id']), row['name'] or str(row['nba_id']))
+                for row in crosswalk.rows() if row['nba_id'] is not None]
+
+
+def create_session(pool_size=DEFAULT_WORKERS, cache=None):
+    """
+    Create a keep-alive requests Session whose connection pool fits `pool_size` workers
+
+    Args:
+        pool_size: Number of connections to keep open per host
+        cache: Optional HttpCache to serve repeat GETs from disk
+    """
+    session = CachedSession(cache) if cache else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def download_headshot(session, image_url, image_filename, limiter=None):
+    """
+    Download a single headshot to disk
+
+    Args:
+        session: Shared requests Session
+        image_url: CDN URL of the headshot
+        image_filename: Destination path
+        limiter: Optional HostRateLimiter applied before the request
+
+    Returns:
+        (ok, detail) where detail is the HTTP status code or the error message
+    """
+    if limiter:
+        limiter.acquire(image_url)
+
+    try:
+        # Download the image
+        with stage('fetch'):
+            r = session.get(image_url, stream=True, timeout=10)
+        with r:
+            # Check if the image was retrieved successfully
+            if r.status_code != 200:
+                return False, r.status_code
+
+            # Set decode_content value to True
+            r.raw.decode_content = True
+
+            # Save the image (the body is streamed, so this includes reading it off the socket)
+            with stage('stream_to_disk'), open(image_filename, 'wb') as f:
+                shutil.copyfileobj(r.raw, f)
+
+            return True, r.status_code
+    except requests.exceptions.RequestException as e:
+        return False, str(e)
+
+
+def load_manifest(manifest_path):
+    """
+    Load the sync manifest (PersonID -> etag, last_modified, size, sha256, file)
+
+    Args:
+        manifest_path: Path to the manifest JSON file
+
+    Returns:
+        Dict keyed by PersonID string (empty if the file does not exist)
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+
+def save_manifest(manifest, manifest_path):
+    """Write the sync manifest atomically so an interrupted run never leaves it truncated."""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def fetch_conditional(session, image_url, entry=None, limiter=None):
+    """
+    GET a headshot, sending the validators stored in its previous manifest/index entry
+
+    Args:
+        session: Shared requests Session
+        image_url: CDN URL of the headshot
+        entry: Previous entry with 'etag'/'last_modified' keys (or None to fetch unconditionally)
+        limiter: Optional HostRateLimiter applied before the request
+
+    Returns:
+        (state, detail, response) where state is 'fetched', 'unchanged' (304) or 'failed'
+    """
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    if limiter:
+        limiter.acquire(image_url)
+
+    try:
+        with stage('fetch'):
+            r = session.get(image_url, headers=headers, timeout=10)
+    except requests.exceptions.RequestException as e:
+        return 'failed', str(e), None
+
+    if r.status_code == 304:
+        return 'unchanged', r.status_code, r
+    if r.status_code != 200:
+        return 'failed', r.status_code, r
+    return 'fetched', r.status_code, r
+
+
+def sync_headshot(session, image_url, image_filename, entry=None, limiter=None):
+    """
+    Conditionally fetch a single headshot using the validators stored in its manifest entry
+
+    Args:
+        session: Shared requests Session
+        image_url: CDN URL of the headshot
+        image_filename: Destination path
+        entry: Previous manifest entry for this player (or None)
+        limiter: Optional HostRateLimiter applied before the request
+
+    Returns:
+        (state, detail, new_entry) where state is 'downloaded', 'unchanged' or 'failed'
+    """
+    # Only trust validators if the file they describe is still on disk
+    have_file = os.path.exists(image_filename)
+    state, detail, r = fetch_conditional(session, image_url, entry if have_file else None, limiter)
+    if state != 'fetched':
+        return state, detail, entry
+
+    body = r.content
+    new_entry = {
+        'etag': r.headers.get('ETag'),
+        'last_modified': r.headers.get('Last-Modified'),
+        'size': len(body),
+        'sha256': hashlib.sha256(body).hexdigest(),
+        'file': os.path.basename(image_filename),
+    }
+
+    # Server ignored the validators but the bytes are identical - refresh validators only
+    if entry and entry.get('sha256') == new_entry['sha256'] and have_file:
+        return 'unchanged', detail, new_entry
+
+    tmp_filename = f"{image_filename}.tmp"
+    with stage('disk_write'):
+        with open(tmp_filename, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_filename, image_filename)
+
+    return 'downloaded', detail, new_entry
+
+
+def store_headshot(session, image_url, store, person_id, player_name, limiter=None):
+    """
+    Conditionally fetch a single headshot into a content-addressed HeadshotStore
+
+    Returns:
+        (state, detail) where state is 'downloaded', 'deduplicated', 'placeholder',
+        'unchanged' or 'failed'
+    """
+    entry = store.entry(person_id) if store.has(person_id) else None
+    state, detail, r = fetch_conditional(session, image_url, entry, limiter)
+    if state != 'fetched':
+        return state, detail
+
+    body = r.content
+    with stage('disk_write'):
+        result = store.put(person_id, body, name=player_name,
+                           etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+    return ('downloaded' if result == 'stored' else result), detail
+
+
+def download_player_headshots(csv_filename='nba_player_ids.csv', output_dir='playerHeadshots',
+                              workers=DEFAULT_WORKERS, max_rps=DEFAULT_MAX_RPS, sync=False,
+                              store_dir=None, cache=None, crosswalk_path=None, only_ids=None):
+    """
+    Download player headshots from NBA.com CDN based on player IDs in CSV file
+
+    Args:
+        csv_filename: Path to CSV file with columns: Name, PersonID (or similar)
+        output_dir: Directory to save downloaded images
+        workers: Number of concurrent download threads (1 = serial)
+        max_rps: Per-host request-rate cap in requests per second (0 = unlimited)
+        sync: Re-validate existing images with If-None-Match/If-Modified-Since against
+              the manifest in output_dir instead of skipping them
+        store_dir: Write into a content-addressed HeadshotStore at this path instead of
+                   name-based files in output_dir (placeholders are recorded, not stored)
+        cache: Optional HttpCache shared with the other fetch scripts
+        crosswalk_path: Read players from this player crosswalk instead of the CSV
+        only_ids: Only process these PersonIDs (e.g. the roster change feed's changed players)
+
+    Returns:
+        Dict with downloaded, failed, skipped, unchanged, deduplicated and placeholder counts
+    """
+    # Create output directory if it doesn't exist (the store manages its own layout)
+    if not store_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    source = crosswalk_path or csv_filename
+    if not os.path.exists(source):
+        print(f"❌ Error: {'crosswalk' if crosswalk_path else 'CSV'} file '{source}' not found")
+        return
+
+    counts = {'downloaded': 0, 'failed': 0, 'skipped': 0, 'unchanged': 0,
+              'deduplicated': 0, 'placeholder': 0}
+    counts_lock = threading.Lock()
+
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    manifest = load_manifest(manifest_path) if sync else {}
+    store = None
+    if store_dir:
+        # Imported lazily; the store is only needed for content-addressed output
+        from headshot_store import HeadshotStore
+        store = HeadshotStore(store_dir)
+
+    pending = []
+    rows = read_crosswalk_rows(crosswalk_path) if crosswalk_path else read_player_rows(csv_filename)
+    if only_ids is not None:
+        rows = [(person_id, player_name) for person_id, player_name in rows if int(person_id) in only_ids]
+        print(f"🔄 {len(rows)} changed player(s) to refresh")
+    for person_id, player_name in rows:
+        # Construct image URL
+        image_url = HEADSHOT_URL.format(person_id=person_id)
+        image_filename = os.path.join(output_dir, f"{player_name.replace(' ', '_')}.jpg")
+
+        # Skip if file already exists (sync and store modes re-validate, changed players are refetched)
+        if not sync and not store and only_ids is None and os.path.exists(image_filename):
+            print(f"⏭️  Skipping {player_name} (already exists)")
+            counts['skipped'] += 1
+            continue
+
+        pending.append((person_id, player_name, image_url, image_filename))
+
+    workers = max(1, int(workers))
+    limiter = HostRateLimiter(max_rps) if max_rps else None
+
+    def worker(job):
+        person_id, player_name, image_url, image_filename = job
+        entry = None
+        if store:
+            state, detail = store_headshot(session, image_url, store, person_id, player_name, limiter)
+        elif sync:
+            state, detail, entry = sync_headshot(session, image_url, image_filename,
+                                                 manifest.get(person_id), limiter)
+        else:
+            ok, detail = download_headshot(session, image_url, image_filename, limiter)
+            state = 'downloaded' if ok else 'failed'
+        with counts_lock:
+            if entry:
+                manifest[person_id] = entry
+            if state == 'downloaded':
+                counts['downloaded'] += 1
+                print(f"✅ Downloaded: {player_name}")
+            elif state == 'deduplicated':
+                counts['deduplicated'] += 1
+                print(f"🔗 Deduplicated: {player_name} (identical image already stored)")
+            elif state == 'placeholder':
+                counts['placeholder'] += 1
+                print(f"👤 No headshot: {player_name} (placeholder image)")
+            elif state == 'unchanged':
+                counts['unchanged'] += 1
+            elif isinstance(detail, int):
+                counts['failed'] += 1
+                print(f"❌ Failed to download {player_name} (Status: {detail})")
+            else:
+                counts['failed'] += 1
+                print(f"❌ Error downloading {player_name}: {detail}")
+
+    with create_session(workers, cache) as session:
+        if workers == 1:
+            for job in pending:
+                worker(job)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Consume the iterator so worker exceptions are raised here
+                list(executor.map(worker, pending))
+
+    if sync:
+        save_manifest(manifest, manifest_path)
+    if store:
+        detected = store.detect_placeholders()
+        if detected:
+            print(f"👤 Detected {len(detected)} new placeholder image(s)")
+        store.save()
+
     print(f"\n📊 Summary:")
-    print(f"   ✅ Downloaded: {downloaded_count}")
-    print(f"   ❌ Failed: {failed_count}")
-    print(f"   📁 Output directory: {output_dir}")
+    print(f"   ✅ Downloaded: {counts['downloaded']}")
+    if sync or store:
+        print(f"   💤 Unchanged: {counts['unchanged']}")
+    if store:
+        stats = store.stats()
+        print(f"   🔗 Deduplicated: {counts['deduplicated']}")
+        print(f"   👤 No headshot: {stats['placeholders']}")
+        print(f"   📦 Unique blobs: {stats['blobs']} ({stats['blob_bytes']:,} bytes)")
+    print(f"   ❌ Failed: {counts['failed']}")
+    print(f"   📁 Output directory: {store_dir or output_dir}")
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download NBA player headshots from NBA.com CDN")
+    # Positional arguments keep the original `script.py [csv] [output_dir]` usage working
+    parser.add_argument('csv_file', nargs='?', default='nba_player_ids.csv')
+    parser.add_argument('output_directory', nargs='?', default='playerHeadshots')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent download threads (default: {DEFAULT_WORKERS}, 1 = serial)")
+    parser.add_argument('--max-rps', type=float, default=DEFAULT_MAX_RPS,
+                        help=f"Per-host request-rate cap (default: {DEFAULT_MAX_RPS}, 0 = unlimited)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Re-validate existing images via ETag/Last-Modified and only rewrite changed ones")
+    parser.add_argument('--transcode', action='store_true',
+                        help="Generate resized WebP/JPEG derivatives after downloading (requires Pillow)")
+    parser.add_argument('--store', metavar='DIR', default=None,
+                        help="Write into a content-addressed store keyed by PersonID instead of name-based files")
+    parser.add_argument('--bundle', metavar='PATH', default=None,
+                        help="Also pack all headshots into one memory-mappable bundle file")
+    parser.add_argument('--crosswalk', metavar='PATH', default=None,
+                        help="Read players from a player crosswalk database instead of the CSV")
+    parser.add_argument('--changes', nargs='?', const=DEFAULT_CHANGES_PATH, default=None, metavar='PATH',
+                        help=f"Only refresh players the roster change feed reports as changed since this "
+                             f"tool's last successful --changes run (default path: {DEFAULT_CHANGES_PATH})")
+    add_cache_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics_from_args(args, job='download_player_headshots')
 
-if __name__ == "__main__":
-    import sys
-    
-    # Allow CSV filename to be passed as command line argument
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else 'nba_player_ids.csv'
-    output_directory = sys.argv[2] if len(sys.argv) > 2 else 'playerHeadshots'
-    
     print(f"📥 Starting headshot download...")
-    print(f"   CSV file: {csv_file}")
-    print(f"   Output directory: {output_directory}\n")
-    
-    download_player_headshots(csv_file, output_directory)
+    print(f"   CSV file: {args.csv_file}")
+    print(f"   Output directory: {args.output_directory}")
+    print(f"   Workers: {args.workers} (max {args.max_rps} req/s per host)\n")
+
+    feed, only_ids = None, None
+    if args.changes:
+        feed = RosterChangeFeed(args.changes)
+        feed_run = feed.latest_run()
+        only_ids = feed.changed_ids(feed.cursor(FEED_CONSUMER))
+
+    with stage('download'):
+        counts = download_player_headshots(args.csv_file, args.output_directory,
+                                           workers=args.workers, max_rps=args.max_rps, sync=args.sync,
+                                           store_dir=args.store, cache=cache_from_args(args),
+                                           crosswalk_path=args.crosswalk, only_ids=only_ids)
+
+    if feed and counts and not counts['failed']:
+        # Failed players stay pending for the next --changes run
+        feed.advance(FEED_CONSUMER, feed_run)
+
+    if args.transcode:
+        # Imported lazily so plain downloads don't need Pillow installed
+        from transcode_headshots import transcode_headshots
+        print()
+        with stage('transcode'):
+            transcode_headshots(args.output_directory)
+
+    if args.bundle:
+        from headshot_bundle import build_bundle
+        print()
+        with stage('bundle'):
+            build_bundle(args.bundle, store_dir=args.store, csv_filename=args.csv_file,
+                         output_dir=args.output_directory)
+
+
+if __name__ == "__main__":
+    main()
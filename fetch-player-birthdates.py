@@ -16,240 +16,506 @@ Usage:
 import os
 import sys
 import json
+import re
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Optional
 from datetime import datetime
 
 try:
     import requests
-    from dotenv import load_dotenv
-    from nba_api.stats.static import players
-    from nba_api.stats.endpoints import commonplayerinfo
 except ImportError as e:
     print(f"❌ Missing required package: {e}")
     print("Please install with: pip install nba_api requests python-dotenv")
     sys.exit(1)
 
-# Load environment variables
-load_dotenv()
+from player_matcher import PlayerNameMatcher
+from rate_limit import AdaptiveTokenBucket, TokenBucket, backoff_delay
+from http_cache import CachedSession, add_cache_arguments, cache_from_args
+from metrics import add_metrics_arguments, metrics_from_args, record_retry, stage
+from player_crosswalk import DEFAULT_CROSSWALK_PATH, PlayerCrosswalk
+from birthdate_artifact import CONSTANTS_COMPACT_JSON_FILE, CONSTANTS_SHIM_FILE, write_artifacts
 
-BALLDONTLIE_BASE = os.getenv('BALLDONTLIE_BASE', 'https://api.balldontlie.io/v1')
-BALLDONTLIE_KEY = os.getenv('BALLDONTLIE_KEY')
+# nba_api modules; bound by import_nba_api() once a run starts
+players = teams = commonplayerinfo = commonteamroster = NBAStatsHTTP = Season = None
 
-if not BALLDONTLIE_KEY:
-    print("⚠️  Warning: BALLDONTLIE_KEY not set - API requests may fail")
+# BallDontLie settings; filled in from the environment / .env by load_environment()
+BALLDONTLIE_BASE = 'https://api.balldontlie.io/v1'
+BALLDONTLIE_KEY = None
 
 # Headers for requests
 HEADERS = {
     'Accept': 'application/json',
 }
 
-if BALLDONTLIE_KEY:
-    HEADERS['Authorization'] = BALLDONTLIE_KEY
+# BallDontLie listing settings
+PLAYERS_ENDPOINT = '/players/active'
+BALLDONTLIE_PAGE_SIZE = 100
+BALLDONTLIE_RPS = 3.0
+
+# stats.nba.com lookup settings
+NBA_API_TIMEOUT = 30
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+DEFAULT_WORKERS = 4
+DEFAULT_RPS = 2.0
+
+# Output / known-birthdate locations
+OUTPUT_TS_FILE = 'player-birthdates-output.ts'
+OUTPUT_JSON_FILE = 'player-birthdates.json'
+CONSTANTS_FILE = os.path.join('src', 'etl', 'constants', 'player-birthdates.ts')
+# Earlier sources win when both know a player (the constants file holds manual fixes)
+DEFAULT_KNOWN_SOURCES = [CONSTANTS_FILE, OUTPUT_JSON_FILE]
+
+CONSTANTS_ENTRY_RE = re.compile(r"^\s*(\d+)\s*:\s*'([^']+)'", re.MULTILINE)
+CONSTANTS_BLOCK_RE = re.compile(
+    r"export const PLAYER_BIRTHDATES: Record<number, string> = \{\n.*?\n\};\n", re.DOTALL
+)
+
 
+def fetch_players_page(url: str, cursor=None, session=None, limiter: Optional[TokenBucket] = None) -> dict:
+    """Fetch one cursor page of a BallDontLie player listing and return the decoded JSON."""
+    params = {'per_page': BALLDONTLIE_PAGE_SIZE}
+    if cursor:
+        params['cursor'] = cursor
+    if limiter:
+        limiter.acquire()
+    response = (session or requests).get(url, headers=HEADERS, params=params, timeout=10)
+    response.raise_for_status()
+    with stage('decode'):
+        return response.json()
 
-def fetch_players_from_api() -> list:
-    """Fetch all current NBA players from BallDontLie API."""
-    print("📡 Fetching players from BallDontLie API...")
+
+def iter_players_from_api(session=None, endpoint: str = PLAYERS_ENDPOINT):
+    """
+    Yield BallDontLie players page by page as they arrive.
+
+    While the caller processes one page, the next cursor page is already being
+    fetched on a background thread, so downstream matching overlaps pagination and
+    at most two pages are held in memory.
+    """
+    print(f"📡 Streaming players from BallDontLie API ({endpoint})...")
     
-    players_list = []
-    cursor = None
+    url = f"{BALLDONTLIE_BASE}{endpoint}"
+    limiter = TokenBucket(BALLDONTLIE_RPS, name='balldontlie')
+    total = 0
     page = 1
     
-    while True:
-        url = f"{BALLDONTLIE_BASE}/players/active"
-        params = {'per_page': 100}
-        if cursor:
-            params['cursor'] = cursor
-        
-        try:
-            response = requests.get(url, headers=HEADERS, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            page_players = data.get('data', [])
-            players_list.extend(page_players)
-            
-            print(f"  📄 Page {page}: {len(page_players)} players (total: {len(players_list)})")
-            
-            meta = data.get('meta', {})
-            cursor = meta.get('next_cursor')
-            
-            if not cursor:
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(fetch_players_page, url, None, session, limiter)
+        while pending is not None:
+            try:
+                data = pending.result()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"❌ Error fetching players: {e}")
                 break
             
-            page += 1
-            time.sleep(0.3)  # Rate limiting
+            cursor = data.get('meta', {}).get('next_cursor')
+            # Start on the next page before handing this one downstream
+            pending = prefetcher.submit(fetch_players_page, url, cursor, session, limiter) if cursor else None
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching players: {e}")
-            break
+            page_players = data.get('data', [])
+            total += len(page_players)
+            print(f"  📄 Page {page}: {len(page_players)} players (total: {total})")
+            yield from page_players
+            page += 1
     
-    print(f"✅ Fetched {len(players_list)} players from API\n")
-    return players_list
+    print(f"✅ Fetched {total} players from API\n")
 
 
-def normalize_name(name: str) -> str:
-    """Normalize player name for matching (lowercase, remove special chars)."""
-    return name.lower().strip().replace("'", "").replace("-", " ").replace(".", "")
+def fetch_players_from_api(session=None) -> list:
+    """Fetch all current NBA players from BallDontLie API (optionally through a cached session)."""
+    return list(iter_players_from_api(session))
 
 
-def find_nba_api_player_id(balldontlie_player: dict, nba_players: list) -> Optional[int]:
+def find_nba_api_player_id(balldontlie_player: dict, nba_players) -> Optional[int]:
     """
     Find NBA API player ID by matching name with BallDontLie player.
-    Returns NBA player ID if found, None otherwise.
+    Returns NBA player ID if found, None otherwise (including ambiguous matches).
+
+    `nba_players` should be a PlayerNameMatcher built once per run; a raw roster
+    list is also accepted but is re-indexed on every call.
     """
+    matcher = nba_players if isinstance(nba_players, PlayerNameMatcher) else PlayerNameMatcher(nba_players)
     first_name = balldontlie_player.get('first_name', '').strip()
     last_name = balldontlie_player.get('last_name', '').strip()
-    full_name = f"{first_name} {last_name}"
-    
-    # Normalize names for matching
-    normalized_first = normalize_name(first_name)
-    normalized_last = normalize_name(last_name)
-    normalized_full = normalize_name(full_name)
-    
-    # Try exact match first
-    for nba_player in nba_players:
-        nba_first = normalize_name(nba_player.get('first_name', ''))
-        nba_last = normalize_name(nba_player.get('last_name', ''))
-        nba_full = normalize_name(f"{nba_player.get('first_name', '')} {nba_player.get('last_name', '')}")
-        
-        # Exact match
-        if (nba_first == normalized_first and nba_last == normalized_last):
-            return nba_player.get('id')
-        
-        # Try matching full name
-        if nba_full == normalized_full:
-            return nba_player.get('id')
-    
-    # Try partial matches (in case of name variations)
-    for nba_player in nba_players:
-        nba_first = normalize_name(nba_player.get('first_name', ''))
-        nba_last = normalize_name(nba_player.get('last_name', ''))
-        
-        # Match if first name starts match and last name matches
-        if (nba_first.startswith(normalized_first[:3]) and nba_last == normalized_last):
-            return nba_player.get('id')
-        
-        # Match if last name matches and first name starts match
-        if (nba_first == normalized_first and nba_last.startswith(normalized_last[:3])):
-            return nba_player.get('id')
-    
+    return matcher.match(first_name, last_name).player_id
+
+
+class TransientLookupError(Exception):
+    """A lookup failure worth retrying: rate limited, timed out or an upstream 5xx."""
+
+
+# CommonPlayerInfo returns 'YYYY-MM-DDT00:00:00', CommonTeamRoster 'MAR 14, 1988'
+BIRTHDATE_FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d', '%b %d, %Y']
+
+
+def format_birthdate(birthdate) -> Optional[str]:
+    """
+    Convert an NBA API birthdate to YYYY-MM-DD.
+    NBA API returns dates in various formats; unrecognized strings are returned unchanged.
+    """
+    if not birthdate:
+        return None
+    if isinstance(birthdate, str):
+        # Try parsing different date formats
+        for fmt in BIRTHDATE_FORMATS:
+            try:
+                dt = datetime.strptime(birthdate, fmt)
+                return dt.strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+    return birthdate
+
+
+def parse_birthdate(player_dict: dict) -> Optional[str]:
+    """
+    Extract the birthdate from a CommonPlayerInfo response dict.
+    Returns birthdate in YYYY-MM-DD format (or as returned by the API) or None.
+    """
+    # The birthdate is usually in the 'resultSets' -> 'CommonPlayerInfo' -> first row
+    result_sets = player_dict.get('resultSets', [])
+    for result_set in result_sets:
+        if result_set.get('name') == 'CommonPlayerInfo':
+            rows = result_set.get('rowSet', [])
+            if rows and len(rows) > 0:
+                # Get headers to find birthdate column
+                headers = result_set.get('headers', [])
+                try:
+                    birthdate_idx = headers.index('BIRTHDATE')
+                    return format_birthdate(rows[0][birthdate_idx])
+                except (ValueError, IndexError):
+                    # Birthdate column not found or index error
+                    pass
     return None
 
 
-def get_player_birthdate_from_nba_api(nba_player_id: int) -> Optional[str]:
+def parse_roster_birthdates(roster_dict: dict) -> Dict[int, str]:
+    """Extract NBA PersonID -> birthdate for every player in a CommonTeamRoster response dict."""
+    birthdates = {}
+    for result_set in roster_dict.get('resultSets', []):
+        if result_set.get('name') != 'CommonTeamRoster':
+            continue
+        headers = result_set.get('headers', [])
+        try:
+            id_idx = headers.index('PLAYER_ID')
+            birthdate_idx = headers.index('BIRTH_DATE')
+        except ValueError:
+            continue
+        for row in result_set.get('rowSet', []):
+            birthdate = format_birthdate(row[birthdate_idx])
+            if row[id_idx] and birthdate:
+                birthdates[int(row[id_idx])] = birthdate
+    return birthdates
+
+
+def send_endpoint_request(endpoint) -> bool:
     """
-    Get player birthdate from NBA API using player ID.
-    Returns birthdate in YYYY-MM-DD format or None if not found.
+    Issue a prepared (get_request=False) nba_api endpoint request.
+    Returns False for an unusable response; raises TransientLookupError on
+    429/5xx/timeouts so callers can back off and retry.
     """
     try:
-        player_info = commonplayerinfo.CommonPlayerInfo(player_id=nba_player_id)
-        player_dict = player_info.get_dict()
-        
-        # The birthdate is usually in the 'resultSets' -> 'CommonPlayerInfo' -> first row
-        result_sets = player_dict.get('resultSets', [])
-        for result_set in result_sets:
-            if result_set.get('name') == 'CommonPlayerInfo':
-                rows = result_set.get('rowSet', [])
-                if rows and len(rows) > 0:
-                    # Get headers to find birthdate column
-                    headers = result_set.get('headers', [])
-                    try:
-                        birthdate_idx = headers.index('BIRTHDATE')
-                        birthdate = rows[0][birthdate_idx]
-                        
-                        if birthdate:
-                            # Convert to YYYY-MM-DD format
-                            # NBA API returns dates in various formats, try to parse
-                            if isinstance(birthdate, str):
-                                # Try parsing different date formats
-                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d']:
-                                    try:
-                                        dt = datetime.strptime(birthdate, fmt)
-                                        return dt.strftime('%Y-%m-%d')
-                                    except ValueError:
-                                        continue
-                            return birthdate
-                    except (ValueError, IndexError):
-                        # Birthdate column not found or index error
-                        pass
-        
-        time.sleep(0.6)  # Rate limiting
+        endpoint.get_request()
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        raise TransientLookupError(str(e))
+    except (ValueError, KeyError):
+        response = getattr(endpoint, 'nba_response', None)
+        # Valid JSON that just lacks a dataset nba_api expects - our parsers only need one
+        if response is not None and response.valid_json():
+            return True
+        # Non-JSON body - nba_api keeps the raw response, so check why
+        status = getattr(response, '_status_code', None)
+        if status in RETRYABLE_STATUS:
+            raise TransientLookupError(f"HTTP {status}")
+        return False
+    return True
+
+
+def call_with_backoff(fn, limiter: Optional[AdaptiveTokenBucket] = None, max_retries: int = MAX_RETRIES):
+    """
+    Call `fn()` under the shared limiter, retrying TransientLookupError with jittered
+    exponential backoff. Returns fn()'s result, or None once retries are exhausted
+    or on any other error.
+    """
+    for attempt in range(1, max_retries + 2):
+        if limiter:
+            limiter.acquire()
+        try:
+            result = fn()
+        except TransientLookupError:
+            if limiter:
+                limiter.on_throttle()
+            if attempt > max_retries:
+                return None
+            record_retry('stats.nba.com', attempt)
+            time.sleep(backoff_delay(attempt))
+            continue
+        except Exception:
+            # Silently handle errors (player not found, unexpected API errors, etc.)
+            return None
+        if limiter:
+            limiter.on_success()
+        return result
+    return None
+
+
+def lookup_player_birthdate(nba_player_id: int, timeout: int = NBA_API_TIMEOUT) -> Optional[str]:
+    """
+    Single CommonPlayerInfo request for one player.
+    Raises TransientLookupError on 429/5xx/timeouts so callers can back off and retry.
+    """
+    player_info = commonplayerinfo.CommonPlayerInfo(player_id=nba_player_id, timeout=timeout,
+                                                    get_request=False)
+    if not send_endpoint_request(player_info):
         return None
-        
-    except Exception as e:
-        # Silently handle errors (player not found, API errors, etc.)
+    return parse_birthdate(player_info.get_dict())
+
+
+def lookup_team_roster_birthdates(team_id: int, season: str,
+                                  timeout: int = NBA_API_TIMEOUT) -> Optional[Dict[int, str]]:
+    """
+    Single CommonTeamRoster request for one team.
+    Returns None for an unusable response and {} for a team with no rostered players.
+    Raises TransientLookupError on 429/5xx/timeouts so callers can back off and retry.
+    """
+    roster = commonteamroster.CommonTeamRoster(team_id=team_id, season=season, timeout=timeout,
+                                               get_request=False)
+    if not send_endpoint_request(roster):
         return None
+    return parse_roster_birthdates(roster.get_dict())
+
+
+def get_player_birthdate_from_nba_api(nba_player_id: int, limiter: Optional[AdaptiveTokenBucket] = None,
+                                      max_retries: int = MAX_RETRIES) -> Optional[str]:
+    """
+    Get player birthdate from NBA API using player ID.
+    Returns birthdate in YYYY-MM-DD format or None if not found.
+
+    Each attempt waits for a token from `limiter` (if given) and reports throttles
+    and successes back to it; transient failures are retried with jittered
+    exponential backoff instead of a fixed sleep.
+    """
+    with stage('lookup'):
+        return call_with_backoff(lambda: lookup_player_birthdate(nba_player_id), limiter, max_retries)
 
 
-def fetch_birthdates_for_players(ball_dont_lie_players: list) -> Dict[int, str]:
+def fetch_bulk_birthdates(season: str = None, limiter: Optional[AdaptiveTokenBucket] = None,
+                          workers: int = DEFAULT_WORKERS) -> Dict[int, str]:
+    """
+    Fetch birthdates for every rostered player in the league.
+    Returns dict mapping NBA PersonID to birthdate, using one CommonTeamRoster request
+    per team (30 requests, regardless of how many players need a birthdate).
+    """
+    season = season or Season.default
+    team_list = teams.get_teams()
+    print(f"📦 Fetching {season} rosters for {len(team_list)} teams (bulk birthdate source)...")
+    
+    def lookup_team(team_id):
+        with stage('lookup'):
+            return call_with_backoff(lambda: lookup_team_roster_birthdates(team_id, season), limiter)
+    
+    birthdates = {}
+    failed = 0
+    empty = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(lookup_team, team['id']) for team in team_list]
+        for future in as_completed(futures):
+            roster = future.result()
+            if roster is None:
+                # Retries exhausted or an unusable response
+                failed += 1
+            elif not roster:
+                # A valid response with nobody on it (e.g. before the season's rosters are set)
+                empty += 1
+            else:
+                birthdates.update(roster)
+    
+    problems = [f"{failed} teams failed"] if failed else []
+    if empty:
+        problems.append(f"{empty} empty rosters")
+    print(f"  ✅ Loaded {len(birthdates)} birthdates from rosters"
+          + (f" ({', '.join(problems)})" if problems else "") + "\n")
+    return birthdates
+
+
+def fetch_birthdates_for_players(ball_dont_lie_players, workers: int = DEFAULT_WORKERS,
+                                 rps: float = DEFAULT_RPS, source: str = 'bulk',
+                                 season: str = None, crosswalk=None) -> Dict[int, str]:
     """
     Fetch birthdates for all players using NBA API.
     Returns dict mapping BallDontLie API ID to birthdate (YYYY-MM-DD).
+
+    `ball_dont_lie_players` may be any iterable, including the streaming
+    iter_players_from_api() pager; players are matched as they arrive.
+
+    Lookups run on `workers` threads that share one adaptive token bucket targeting
+    `rps` requests per second against stats.nba.com. With source='bulk', team rosters
+    for `season` are fetched in the background while players stream in, and
+    per-player CommonPlayerInfo calls are only made for players the rosters don't
+    cover; with source='per-player' each lookup starts as soon as its player matches.
+    The roster fetch only starts once some player actually needs a birthdate.
+
+    With a PlayerCrosswalk, players it already maps to an NBA PersonID skip name
+    matching, and new name matches are written back to it.
     """
     print("🔍 Loading NBA players from nba_api...")
     
     # Get all NBA players from nba_api static data
     try:
-        nba_players_list = players.get_players()
+        with stage('load_players'):
+            nba_players_list = players.get_players()
+            # Normalize and index the roster once instead of per BallDontLie player
+            matcher = PlayerNameMatcher(nba_players_list)
         print(f"  ✅ Loaded {len(nba_players_list)} players from NBA API\n")
     except Exception as e:
         print(f"  ❌ Error loading NBA players: {e}")
         return {}
     
-    print("🔍 Matching players and fetching birthdates from NBA API...")
-    print("   (This may take a while due to rate limiting)\n")
-    
     birthdates = {}
     found = 0
     not_found = 0
     matched = 0
+    from_crosswalk = 0
+    new_links = []
+    limiter = AdaptiveTokenBucket(rps, name='stats.nba.com')
     
-    for i, bdl_player in enumerate(ball_dont_lie_players, 1):
-        api_id = bdl_player.get('id')
-        first_name = bdl_player.get('first_name', '')
-        last_name = bdl_player.get('last_name', '')
-        full_name = f"{first_name} {last_name}"
-        
-        if not api_id:
-            continue
-        
-        print(f"  [{i}/{len(ball_dont_lie_players)}] {full_name} (ID: {api_id})...", end=' ', flush=True)
-        
-        # Find matching NBA API player ID
-        nba_player_id = find_nba_api_player_id(bdl_player, nba_players_list)
-        
-        if not nba_player_id:
-            not_found += 1
-            print("❌ No match found in NBA API")
-            continue
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor, \
+            ThreadPoolExecutor(max_workers=1) as roster_executor:
+        roster_future = None
+        lookups = {}
+        waiting_on_rosters = []
         
-        matched += 1
-        print(f"Matched (NBA ID: {nba_player_id})...", end=' ', flush=True)
+        print("🔍 Matching players to NBA API IDs...")
+        for bdl_player in ball_dont_lie_players:
+            api_id = bdl_player.get('id')
+            full_name = f"{bdl_player.get('first_name', '')} {bdl_player.get('last_name', '')}"
+            
+            if not api_id:
+                continue
+            
+            # Resolve through the crosswalk first, name matching only for unknown players
+            with stage('match'):
+                nba_player_id = crosswalk.nba_id_for_bdl(api_id) if crosswalk is not None else None
+                if nba_player_id:
+                    from_crosswalk += 1
+                else:
+                    nba_player_id = find_nba_api_player_id(bdl_player, matcher)
+                    if nba_player_id and crosswalk is not None:
+                        new_links.append({'bdl_id': api_id, 'nba_id': nba_player_id, 'name': full_name})
+            
+            if not nba_player_id:
+                not_found += 1
+                print(f"  ❌ {full_name} (ID: {api_id}): No match found in NBA API")
+                continue
+            
+            matched += 1
+            job = (api_id, full_name, nba_player_id)
+            if source != 'bulk':
+                lookups[executor.submit(get_player_birthdate_from_nba_api, nba_player_id, limiter)] = job
+                continue
+            if roster_future is None:
+                # Started on the first match so it overlaps the rest of pagination/matching
+                roster_future = roster_executor.submit(fetch_bulk_birthdates, season, limiter, workers)
+            waiting_on_rosters.append(job)
+        print()
         
-        # Get birthdate from NBA API
-        birthdate = get_player_birthdate_from_nba_api(nba_player_id)
+        if roster_future is not None:
+            roster_birthdates = roster_future.result()
+            for job in waiting_on_rosters:
+                birthdate = roster_birthdates.get(job[2])
+                if birthdate:
+                    birthdates[job[0]] = birthdate
+                    found += 1
+                else:
+                    lookups[executor.submit(get_player_birthdate_from_nba_api, job[2], limiter)] = job
+            print(f"📦 Rosters covered {found} of {matched} matched players")
         
-        if birthdate:
-            birthdates[api_id] = birthdate
-            found += 1
-            print(f"✅ {birthdate}")
-        else:
-            not_found += 1
-            print("❌ Birthdate not found")
+        print(f"🔍 Fetching {len(lookups)} birthdates from NBA API "
+              f"({workers} workers, {rps} req/s)...\n")
         
-        # Rate limiting
-        time.sleep(0.8)
+        for i, future in enumerate(as_completed(lookups), 1):
+            api_id, full_name, nba_player_id = lookups[future]
+            birthdate = future.result()
+            prefix = f"  [{i}/{len(lookups)}] {full_name} (ID: {api_id}, NBA ID: {nba_player_id})..."
+            
+            if birthdate:
+                birthdates[api_id] = birthdate
+                found += 1
+                print(f"{prefix} ✅ {birthdate}")
+            else:
+                not_found += 1
+                print(f"{prefix} ❌ Birthdate not found")
+    
+    if crosswalk is not None:
+        crosswalk.upsert_many(new_links)
+        print(f"\n📇 Crosswalk resolved {from_crosswalk} players; {len(new_links)} new links saved to {crosswalk.path}")
     
     print(f"\n✅ Matched {matched} players")
     print(f"✅ Found {found} birthdates")
     print(f"❌ Not found: {not_found} birthdates\n")
+    matcher.print_ambiguity_report()
     
     return birthdates
 
 
-def output_constants_file(birthdates: Dict[int, str], output_file: str = 'player-birthdates-output.ts'):
+def normalize_birthdate(birthdate: str) -> str:
+    """Trim ISO timestamps ('1993-07-20T00:00:00') down to the YYYY-MM-DD date."""
+    return birthdate.split('T')[0].split(' ')[0]
+
+
+def load_known_birthdates(paths: list) -> Dict[int, str]:
+    """
+    Load already-known birthdates from JSON output files and/or TypeScript constants files.
+    When several sources know a player, the earliest path in `paths` wins.
+    """
+    known = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            contents = f.read()
+        if path.endswith('.json'):
+            entries = json.loads(contents).items()
+        else:
+            entries = CONSTANTS_ENTRY_RE.findall(contents)
+        loaded = 0
+        for api_id, birthdate in entries:
+            api_id = int(api_id)
+            if api_id not in known:
+                known[api_id] = normalize_birthdate(birthdate)
+                loaded += 1
+        print(f"📚 Loaded {loaded} known birthdates from {path}")
+    return known
+
+
+def merge_birthdates(known: Dict[int, str], fetched: Dict[int, str]) -> Dict[int, str]:
+    """Merge fetched birthdates into known ones (known values win), sorted by API ID."""
+    merged = {api_id: normalize_birthdate(birthdate) for api_id, birthdate in fetched.items()}
+    merged.update(known)
+    return dict(sorted(merged.items()))
+
+
+def update_constants_in_place(birthdates: Dict[int, str], constants_file: str = CONSTANTS_FILE):
+    """Rewrite only the PLAYER_BIRTHDATES object in the constants file, keeping its helpers."""
+    with open(constants_file, 'r', encoding='utf-8') as f:
+        contents = f.read()
+    
+    lines = ["export const PLAYER_BIRTHDATES: Record<number, string> = {\n"]
+    lines.extend(f"  {api_id}: '{birthdates[api_id]}',\n" for api_id in sorted(birthdates))
+    lines.append("};\n")
+    
+    updated, replaced = CONSTANTS_BLOCK_RE.subn(lambda _: ''.join(lines), contents, count=1)
+    if not replaced:
+        raise ValueError(f"PLAYER_BIRTHDATES block not found in {constants_file}")
+    
+    with open(constants_file, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    print(f"✅ Updated {len(birthdates)} birthdates in {constants_file}\n")
+
+
+def output_constants_file(birthdates: Dict[int, str], output_file: str = OUTPUT_TS_FILE):
     """Output birthdates in the format needed for the constants file."""
     print(f"📝 Writing output to {output_file}...")
     
@@ -274,39 +540,157 @@ def output_constants_file(birthdates: Dict[int, str], output_file: str = 'player
     print(f"✅ Output written to {output_file}\n")
 
 
-def main():
+def load_environment():
+    """Load .env and the BallDontLie settings. Called after argument parsing so `--help` stays fast."""
+    global BALLDONTLIE_BASE, BALLDONTLIE_KEY
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    BALLDONTLIE_BASE = os.getenv('BALLDONTLIE_BASE', BALLDONTLIE_BASE)
+    BALLDONTLIE_KEY = os.getenv('BALLDONTLIE_KEY')
+    
+    if BALLDONTLIE_KEY:
+        HEADERS['Authorization'] = BALLDONTLIE_KEY
+    else:
+        print("⚠️  Warning: BALLDONTLIE_KEY not set - API requests may fail")
+
+
+def import_nba_api():
+    """
+    Import nba_api into module globals. Deferred until a run actually starts:
+    importing it loads the static player/team tables, which dominates startup.
+    """
+    global players, teams, commonplayerinfo, commonteamroster, NBAStatsHTTP, Season
+    try:
+        from nba_api.stats.static import players, teams
+        from nba_api.stats.endpoints import commonplayerinfo, commonteamroster
+        from nba_api.stats.library.http import NBAStatsHTTP
+        from nba_api.stats.library.parameters import Season
+    except ImportError as e:
+        print(f"❌ Missing required package: {e}")
+        print("Please install with: pip install nba_api requests python-dotenv")
+        sys.exit(1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch NBA player birthdates for the constants file")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent NBA API lookups (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--rps', type=float, default=DEFAULT_RPS,
+                        help=f"Target NBA API requests per second shared by all workers (default: {DEFAULT_RPS})")
+    parser.add_argument('--source', choices=['bulk', 'per-player'], default='bulk',
+                        help="bulk: one CommonTeamRoster call per team, per-player calls only for misses; "
+                             "per-player: one CommonPlayerInfo call per player (default: bulk)")
+    parser.add_argument('--season', default=None,
+                        help="Season whose rosters the bulk source reads, e.g. 2025-26 (default: nba_api current season)")
+    parser.add_argument('--nba-stats-base', default=os.getenv('NBA_STATS_BASE'), metavar='URL',
+                        help="Override the stats.nba.com base URL, e.g. a local fixture server "
+                             "(http://127.0.0.1:8000/stats/{endpoint}); also read from NBA_STATS_BASE")
+    parser.add_argument('--players-endpoint', default=PLAYERS_ENDPOINT,
+                        help=f"BallDontLie listing to page through, e.g. /players for all historical players "
+                             f"(default: {PLAYERS_ENDPOINT})")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only look up players missing from the known birthdate files and merge the results")
+    parser.add_argument('--known', action='append', metavar='PATH',
+                        help="Known birthdates file (.json or constants .ts) for --delta; may be repeated "
+                             f"(default: {', '.join(DEFAULT_KNOWN_SOURCES)})")
+    parser.add_argument('--update-constants', action='store_true',
+                        help=f"Rewrite the PLAYER_BIRTHDATES block in {CONSTANTS_FILE} directly")
+    parser.add_argument('--crosswalk', nargs='?', const=DEFAULT_CROSSWALK_PATH, default=None, metavar='PATH',
+                        help="Resolve BallDontLie -> NBA IDs through the player crosswalk and record new "
+                             f"name matches in it (default path: {DEFAULT_CROSSWALK_PATH})")
+    add_cache_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def write_outputs(birthdates: Dict[int, str], update_constants: bool = False):
+    """Write the TypeScript, JSON and compact outputs (and optionally the constants files themselves)."""
+    output_constants_file(birthdates)
+    
+    # Also output JSON for easy inspection
+    with open(OUTPUT_JSON_FILE, 'w') as f:
+        json.dump(birthdates, f, indent=2, sort_keys=True)
+    print(f"📄 Also saved JSON format to {OUTPUT_JSON_FILE}")
+    
+    # Sorted int32 ID / epoch-day columns (binary + JSON arrays)
+    write_artifacts(birthdates)
+    
+    if update_constants:
+        update_constants_in_place(birthdates)
+        write_artifacts(birthdates, bin_path=None, json_path=CONSTANTS_COMPACT_JSON_FILE,
+                        ts_shim_path=CONSTANTS_SHIM_FILE)
+
+
+def main(argv=None):
     """Main function."""
+    args = parse_args(argv)
+    load_environment()
+    import_nba_api()
+    metrics_from_args(args, job='fetch_player_birthdates')
+    
     print("🏀 NBA Player Birthdate Fetcher (using nba_api)")
     print("=" * 50 + "\n")
     
-    # Fetch players from BallDontLie API
-    ball_dont_lie_players = fetch_players_from_api()
+    if args.nba_stats_base:
+        NBAStatsHTTP.base_url = args.nba_stats_base
     
-    if not ball_dont_lie_players:
-        print("❌ No players fetched. Exiting.")
-        return
+    session = None
+    cache = cache_from_args(args)
+    if cache:
+        # One on-disk cache for BallDontLie and nba_api (CommonPlayerInfo never expires)
+        session = CachedSession(cache)
+        NBAStatsHTTP.set_session(session)
+    
+    known = {}
+    if args.delta:
+        known = load_known_birthdates(args.known or DEFAULT_KNOWN_SOURCES)
+        print()
+    
+    # Stream players from BallDontLie API; matching and lookups start with the first page
+    ball_dont_lie_players = iter_players_from_api(session, endpoint=args.players_endpoint)
+    
+    counts = {'seen': 0, 'missing': 0}
+    if args.delta:
+        def only_missing(stream):
+            for player in stream:
+                counts['seen'] += 1
+                if player.get('id') and player.get('id') not in known:
+                    counts['missing'] += 1
+                    yield player
+        ball_dont_lie_players = only_missing(ball_dont_lie_players)
     
     # Fetch birthdates using NBA API
-    birthdates = fetch_birthdates_for_players(ball_dont_lie_players)
+    crosswalk = PlayerCrosswalk(args.crosswalk) if args.crosswalk else None
+    with stage('fetch'):
+        birthdates = fetch_birthdates_for_players(ball_dont_lie_players, workers=args.workers, rps=args.rps,
+                                                  source=args.source, season=args.season, crosswalk=crosswalk)
+    
+    if args.delta:
+        print(f"🆕 {counts['missing']} of {counts['seen']} players had no known birthdate")
+        if not birthdates:
+            print("✨ Nothing new to add - known birthdates are unchanged.")
+            return
     
     if not birthdates:
         print("❌ No birthdates found. Exiting.")
         return
     
-    # Output results
-    output_constants_file(birthdates)
+    if args.delta:
+        birthdates = merge_birthdates(known, birthdates)
+        print(f"🔀 Merged into {len(birthdates)} total birthdates\n")
     
-    # Also output JSON for easy inspection
-    json_file = 'player-birthdates.json'
-    with open(json_file, 'w') as f:
-        json.dump(birthdates, f, indent=2, sort_keys=True)
-    print(f"📄 Also saved JSON format to {json_file}")
+    # Output results
+    with stage('write'):
+        write_outputs(birthdates, update_constants=args.update_constants)
     
     print("\n✨ Done!")
-    print("\nNext steps:")
-    print("1. Review the output file")
-    print("2. Copy the contents to src/etl/constants/player-birthdates.ts")
-    print("3. Manually add any missing players if needed")
+    if not args.update_constants:
+        print("\nNext steps:")
+        print("1. Review the output file")
+        print("2. Re-run with --update-constants: the ETL reads the compact JSON generated next to")
+        print(f"   {CONSTANTS_FILE}, so copying into the .ts file alone has no effect")
+        print("3. Manually add any missing players to the .ts file, then run: python birthdate_artifact.py sync")
 
 
 if __name__ == '__main__':
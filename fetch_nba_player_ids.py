@@ -1,50 +1,80 @@
 #!/usr/bin/env python3
 """
 Fetch NBA player IDs from NBA.com API and save to CSV file
-This script queries the NBA stats API to get all current players and their IDs
+This script queries the NBA stats API to get all current players and their IDs,
+or backfills a range of seasons into one deduplicated player ID registry
 """
 
 import requests
 import csv
 import time
+import os
 import sys
+import argparse
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-NBA_API_URL = "https://stats.nba.com/stats/commonallplayers"
+from http_cache import CachedSession, add_cache_arguments, cache_from_args
+from rate_limit import TokenBucket, backoff_delay
+from player_crosswalk import DEFAULT_CROSSWALK_PATH, PlayerCrosswalk
+from metrics import add_metrics_arguments, metrics_from_args, record_retry, stage
+from roster_changes import DEFAULT_LOG_PATH as DEFAULT_CHANGES_PATH, RosterChangeFeed, print_changes
+
+# NBA_API_URL points requests at a local stand-in server (benchmarks/)
+NBA_API_URL = os.getenv("NBA_API_URL", "https://stats.nba.com/stats/commonallplayers")
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
     "Referer": "https://www.nba.com/",
     "Origin": "https://www.nba.com"
 }
+HEADSHOT_URL = "https://cdn.nba.com/headshots/nba/latest/1040x760/{person_id}.png"
+
+REGISTRY_PATH = "nba_player_registry.csv"
+REGISTRY_HEADER = ["PersonID", "Name", "FirstSeason", "LastSeason", "Team", "HeadshotURL"]
+BACKFILL_WORKERS = 4
+BACKFILL_RPS = 1.0
+BACKFILL_RETRIES = 3
+
+def season_label(start_year):
+    """Season string for a starting year, e.g. 1996 -> "1996-97"."""
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+def fetch_season_rowset(season, only_current=True, session=None):
+    """
+    Fetch the raw commonallplayers result set for one season
+    
+    Returns:
+        (headers, rowSet) exactly as returned by the API
+    
+    Raises:
+        requests.exceptions.RequestException, KeyError, IndexError, ValueError
+    """
+    params = {
+        "LeagueID": "00",
+        "Season": season,
+        "IsOnlyCurrentSeason": "1" if only_current else "0"
+    }
+    response = (session or requests).get(NBA_API_URL, headers=HEADERS, params=params, timeout=10)
+    response.raise_for_status()
+    result_set = response.json()["resultSets"][0]
+    return result_set["headers"], result_set["rowSet"]
 
-def fetch_player_ids(season="2024-25", only_current=True):
+def fetch_player_ids(season="2024-25", only_current=True, session=None):
     """
     Fetch player data from NBA API
     
     Args:
         season: NBA season (e.g., "2024-25", "2025-26")
         only_current: If True, only fetch players from current season
+        session: Optional requests Session (e.g. a CachedSession); defaults to plain requests
     
     Returns:
         List of player dictionaries with name, personId, and team
     """
-    params = {
-        "LeagueID": "00",
-        "Season": season,
-        "IsOnlyCurrentSeason": "1" if only_current else "0"
-    }
     print(f"📡 Fetching player data for season {season} (current-only: {only_current})...")
     
     try:
-        response = requests.get(NBA_API_URL, headers=HEADERS, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("resultSets") or len(data["resultSets"]) == 0:
-            print("❌ No data returned from API")
-            return []
-        
-        rows = data["resultSets"][0]["rowSet"]
-        headers = data["resultSets"][0]["headers"]
+        headers, rows = fetch_season_rowset(season, only_current, session)
         
         idx_person_id = headers.index("PERSON_ID")
         idx_player_name = headers.index("DISPLAY_FIRST_LAST")
@@ -93,24 +123,208 @@ def write_player_ids_to_csv(players, output_path="nba_player_ids.csv"):
             writer = csv.writer(csvfile)
             writer.writerow(["Name", "PersonID", "Team", "HeadshotURL"])
             for player in players:
-                headshot_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player['personId']}.png"
+                headshot_url = HEADSHOT_URL.format(person_id=player['personId'])
                 writer.writerow([player["name"], player["personId"], player["team"], headshot_url])
         print(f"✅ Successfully wrote {len(players)} players to {output_path}")
     except IOError as e:
         print(f"❌ Error writing to file: {e}")
 
-if __name__ == "__main__":
-    # Allow season to be passed as command line argument
-    season = sys.argv[1] if len(sys.argv) > 1 else "2024-25"
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "nba_player_ids.csv"
+def fetch_season_with_retry(season, session, limiter, retries=BACKFILL_RETRIES):
+    """Fetch one season's rowset under the shared rate limit, retrying with backoff."""
+    for attempt in range(1, retries + 2):
+        limiter.acquire()
+        try:
+            return fetch_season_rowset(season, only_current=True, session=session)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if attempt > retries:
+                raise
+            delay = backoff_delay(attempt, base=2.0)
+            record_retry('stats.nba.com', attempt, reason=type(e).__name__)
+            print(f"⚠️  {season}: {e} - retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def merge_season_rows(registry, season_year, headers, rows):
+    """
+    Fold one season's rowSet into the registry in place
+    
+    Rows are read positionally straight from the API payload (no per-row dicts);
+    registry values are [name, first_season_year, last_season_year, team].
+    """
+    idx_person_id = headers.index("PERSON_ID")
+    idx_player_name = headers.index("DISPLAY_FIRST_LAST")
+    idx_team = headers.index("TEAM_CITY") if "TEAM_CITY" in headers else None
+    idx_team_name = headers.index("TEAM_NAME") if "TEAM_NAME" in headers else None
+    
+    for row in rows:
+        person_id = int(row[idx_person_id])
+        entry = registry.get(person_id)
+        if entry is None:
+            entry = registry[person_id] = [row[idx_player_name], season_year, season_year, ""]
+        elif season_year < entry[1]:
+            entry[1] = season_year
+        if season_year >= entry[2]:
+            # Latest season wins for the display name and team
+            entry[0] = row[idx_player_name]
+            entry[2] = season_year
+            if idx_team is not None and idx_team_name is not None and row[idx_team] and row[idx_team_name]:
+                entry[3] = f"{row[idx_team]} {row[idx_team_name]}"
+
+def backfill_player_registry(start_year, end_year, session=None, workers=BACKFILL_WORKERS, rps=BACKFILL_RPS):
+    """
+    Fetch every season from start_year through end_year concurrently and merge
+    them into one deduplicated registry
+    
+    Args:
+        start_year: First season's starting year (e.g. 1996 for 1996-97)
+        end_year: Last season's starting year (inclusive)
+        session: Optional requests Session shared by all workers
+        workers: Concurrent season requests
+        rps: Requests per second shared by all workers
+    
+    Returns:
+        (registry, failed_seasons) where registry maps PersonID -> [name, first, last, team]
+    """
+    seasons = list(range(start_year, end_year + 1))
+    print(f"📡 Backfilling {len(seasons)} seasons ({season_label(start_year)} to {season_label(end_year)}) "
+          f"with {workers} workers at {rps} req/s...")
+    
+    limiter = TokenBucket(rps, name='stats.nba.com')
+    registry = {}
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(fetch_season_with_retry, season_label(year), session, limiter): year
+            for year in seasons
+        }
+        for future in as_completed(futures):
+            year = futures[future]
+            try:
+                headers, rows = future.result()
+                merge_season_rows(registry, year, headers, rows)
+                print(f"  ✅ {season_label(year)}: {len(rows)} players (registry: {len(registry)})")
+            except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
+                failed.append(year)
+                print(f"  ❌ {season_label(year)}: {e}")
+    
+    print(f"✅ Registry holds {len(registry)} unique players")
+    return registry, sorted(failed)
+
+def write_registry(registry, output_path=REGISTRY_PATH):
+    """
+    Write the registry to CSV sorted by PersonID
+    
+    The Name and PersonID columns keep it readable by download_player_headshots.py.
+    """
+    print(f"📝 Writing {len(registry)} players to {output_path}...")
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(REGISTRY_HEADER)
+        for person_id in sorted(registry):
+            name, first, last, team = registry[person_id]
+            writer.writerow([person_id, name, season_label(first), season_label(last), team,
+                             HEADSHOT_URL.format(person_id=person_id)])
+    os.replace(tmp_path, output_path)
+    print(f"✅ Successfully wrote registry to {output_path}")
+
+def update_crosswalk(pairs, crosswalk_path=DEFAULT_CROSSWALK_PATH):
+    """Upsert (person_id, name) pairs into the player crosswalk."""
+    with PlayerCrosswalk(crosswalk_path) as crosswalk:
+        counts = crosswalk.upsert_many({'nba_id': person_id, 'name': name} for person_id, name in pairs)
+    print(f"📇 Crosswalk {crosswalk_path}: {counts['inserted']} new, {counts['updated']} updated")
+
+class PlayerRegistry:
+    """Read-only view of a registry CSV with binary-search lookups by PersonID."""
+    
+    def __init__(self, path=REGISTRY_PATH):
+        self.ids = []
+        self.rows = []
+        with open(path, "r", newline="", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)
+            for row in reader:
+                self.ids.append(int(row[0]))
+                self.rows.append(row)
+        # Written sorted, but don't trust hand-edited files
+        if any(a > b for a, b in zip(self.ids, self.ids[1:])):
+            order = sorted(range(len(self.ids)), key=self.ids.__getitem__)
+            self.ids = [self.ids[i] for i in order]
+            self.rows = [self.rows[i] for i in order]
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __contains__(self, person_id):
+        return self.get(person_id) is not None
+    
+    def get(self, person_id):
+        """Registry row as a dict keyed by REGISTRY_HEADER, or None."""
+        person_id = int(person_id)
+        i = bisect_left(self.ids, person_id)
+        if i < len(self.ids) and self.ids[i] == person_id:
+            return dict(zip(REGISTRY_HEADER, self.rows[i]))
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch NBA player IDs from NBA.com and save to CSV")
+    # Positional arguments keep the original `script.py [season] [output_file]` usage working
+    parser.add_argument('season', nargs='?', default="2024-25")
+    parser.add_argument('output_file', nargs='?', default="nba_player_ids.csv")
+    parser.add_argument('--backfill', nargs=2, type=int, metavar=('START', 'END'),
+                        help="Fetch every season from START through END (starting years, e.g. 1996 2025) "
+                             "into a deduplicated registry instead of a single-season CSV")
+    parser.add_argument('--registry', default=REGISTRY_PATH,
+                        help=f"Registry output path for --backfill (default: {REGISTRY_PATH})")
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS,
+                        help=f"Concurrent season requests for --backfill (default: {BACKFILL_WORKERS})")
+    parser.add_argument('--rps', type=float, default=BACKFILL_RPS,
+                        help=f"Requests per second shared by --backfill workers (default: {BACKFILL_RPS})")
+    parser.add_argument('--crosswalk', nargs='?', const=DEFAULT_CROSSWALK_PATH, default=None, metavar='PATH',
+                        help=f"Also upsert PersonID/name pairs into the player crosswalk "
+                             f"(default path: {DEFAULT_CROSSWALK_PATH})")
+    parser.add_argument('--changes', nargs='?', const=DEFAULT_CHANGES_PATH, default=None, metavar='PATH',
+                        help=f"Diff the roster against the previous run and append the changes to a feed "
+                             f"(default path: {DEFAULT_CHANGES_PATH})")
+    add_cache_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics_from_args(args, job='fetch_nba_player_ids')
+    season = args.season
+    output_file = args.output_file
+    cache = cache_from_args(args)
+    session = CachedSession(cache) if cache else None
     
     print("🏀 NBA Player ID Fetcher")
     print("=" * 50)
     
-    players = fetch_player_ids(season=season, only_current=True)
+    if args.backfill:
+        start_year, end_year = args.backfill
+        with stage('fetch'):
+            registry, failed = backfill_player_registry(start_year, end_year, session=session or requests.Session(),
+                                                        workers=args.workers, rps=args.rps)
+        if registry:
+            with stage('write'):
+                write_registry(registry, args.registry)
+                if args.crosswalk:
+                    update_crosswalk(((pid, entry[0]) for pid, entry in registry.items()), args.crosswalk)
+        if failed or not registry:
+            print(f"\n❌ Failed seasons: {', '.join(season_label(y) for y in failed) or 'all'}")
+            sys.exit(1)
+        print(f"\n✅ Complete! Registry saved to {args.registry}")
+        sys.exit(0)
+    
+    with stage('fetch'):
+        players = fetch_player_ids(season=season, only_current=True, session=session)
     
     if players:
-        write_player_ids_to_csv(players, output_file)
+        with stage('write'):
+            if args.changes:
+                # Before the CSV is rewritten: the first run seeds its baseline from the old CSV
+                print_changes(RosterChangeFeed(args.changes).record(players, season=season, seed_csv=output_file))
+            write_player_ids_to_csv(players, output_file)
+            if args.crosswalk:
+                update_crosswalk(((p["personId"], p["name"]) for p in players), args.crosswalk)
         print(f"\n✅ Complete! Player IDs saved to {output_file}")
     else:
         print("\n❌ Failed to fetch player data")
@@ -118,3 +332,7 @@ if __name__ == "__main__":
     
     # Be kind to the API
     time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Pack NBA player headshots into a single bundle file with a sorted PersonID offset table
+The reader memory-maps the bundle and hands out zero-copy memoryview slices, so serving
+a headshot needs no per-request file I/O and deploys copy one artifact
+
+Bundle layout (little-endian):
+    header   magic b'HSBUNDLE' | version uint32 | count uint32
+    ids      uint32[count]     PersonIDs, ascending
+    (padding to 8 bytes)
+    offsets  uint64[count]     absolute byte offset of each image
+    lengths  uint32[count]     byte length of each image
+    data     image bytes (identical images are stored once and share an offset)
+"""
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import argparse
+from array import array
+from bisect import bisect_left
+
+MAGIC = b'HSBUNDLE'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+
+def _pad8(n):
+    return (n + 7) & ~7
+
+
+def write_bundle(items, bundle_path):
+    """
+    Write (person_id, image_bytes) pairs into a bundle file
+
+    Args:
+        items: Iterable of (person_id, bytes); later duplicates of a PersonID win
+        bundle_path: Destination path (written atomically)
+
+    Returns:
+        Dict with image count, unique blob count and total file size
+    """
+    images = {}
+    for person_id, data in items:
+        images[int(person_id)] = data
+
+    ids = array('I', sorted(images))
+    count = len(ids)
+
+    ids_start = HEADER.size
+    offsets_start = _pad8(ids_start + 4 * count)
+    lengths_start = offsets_start + 8 * count
+    data_start = _pad8(lengths_start + 4 * count)
+
+    offsets = array('Q')
+    lengths = array('I')
+    blobs = []
+    seen = {}
+    cursor = data_start
+    for person_id in ids:
+        data = images[person_id]
+        digest = hashlib.sha256(data).digest()
+        if digest not in seen:
+            seen[digest] = cursor
+            blobs.append(data)
+            cursor += len(data)
+        offsets.append(seen[digest])
+        lengths.append(len(data))
+
+    if sys.byteorder != 'little':
+        for column in (ids, offsets, lengths):
+            column.byteswap()
+
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count))
+        f.write(ids.tobytes())
+        f.write(b'\0' * (offsets_start - f.tell()))
+        f.write(offsets.tobytes())
+        f.write(lengths.tobytes())
+        f.write(b'\0' * (data_start - f.tell()))
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, bundle_path)
+
+    return {'images': count, 'blobs': len(blobs), 'bytes': cursor}
+
+
+class HeadshotBundle:
+    """Read-only, memory-mapped view over a headshot bundle."""
+
+    def __init__(self, bundle_path):
+        if sys.byteorder != 'little':
+            raise RuntimeError("HeadshotBundle reads its tables in place and requires a little-endian host")
+
+        self._file = open(bundle_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{bundle_path} is not a version {VERSION} headshot bundle")
+
+        ids_start = HEADER.size
+        offsets_start = _pad8(ids_start + 4 * count)
+        lengths_start = offsets_start + 8 * count
+        self._count = count
+        self._ids = self._view[ids_start:ids_start + 4 * count].cast('I')
+        self._offsets = self._view[offsets_start:lengths_start].cast('Q')
+        self._lengths = self._view[lengths_start:lengths_start + 4 * count].cast('I')
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, person_id):
+        return self._find(int(person_id)) is not None
+
+    def _find(self, person_id):
+        i = bisect_left(self._ids, person_id)
+        if i < self._count and self._ids[i] == person_id:
+            return i
+        return None
+
+    def ids(self):
+        """All PersonIDs in the bundle, ascending."""
+        return self._ids.tolist()
+
+    def get(self, person_id):
+        """
+        Zero-copy memoryview of a player's image bytes, or None if not bundled.
+        Slices borrow the mapping, so release them before closing the bundle.
+        """
+        i = self._find(int(person_id))
+        if i is None:
+            return None
+        offset = self._offsets[i]
+        return self._view[offset:offset + self._lengths[i]]
+
+    def close(self):
+        for view in ('_ids', '_offsets', '_lengths', '_view'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_store_images(store_dir):
+    """Yield (person_id, bytes) for every non-placeholder player in a HeadshotStore."""
+    from headshot_store import HeadshotStore
+
+    store = HeadshotStore(store_dir)
+    for person_id in store.index:
+        data = store.read(person_id)
+        if data is not None:
+            yield person_id, data
+
+
+def iter_directory_images(csv_filename, output_dir):
+    """Yield (person_id, bytes) for name-based files written by download_player_headshots."""
+    from download_player_headshots import read_player_rows
+
+    for person_id, player_name in read_player_rows(csv_filename):
+        path = os.path.join(output_dir, f"{player_name.replace(' ', '_')}.jpg")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                yield person_id, f.read()
+
+
+def build_bundle(bundle_path, store_dir=None, csv_filename='nba_player_ids.csv', output_dir='playerHeadshots'):
+    """
+    Build a bundle from a content-addressed store, or from the CSV + name-based directory
+
+    Args:
+        bundle_path: Destination bundle file
+        store_dir: HeadshotStore root (takes precedence when given)
+        csv_filename: Player ID CSV used to map files back to PersonIDs
+        output_dir: Directory of name-based headshot files
+    """
+    print(f"📦 Building headshot bundle {bundle_path}...")
+    if store_dir:
+        items = iter_store_images(store_dir)
+    else:
+        items = iter_directory_images(csv_filename, output_dir)
+
+    result = write_bundle(items, bundle_path)
+    print(f"✅ Bundled {result['images']} headshots ({result['blobs']} unique images, "
+          f"{result['bytes']:,} bytes)")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack player headshots into a memory-mappable bundle")
+    parser.add_argument('bundle', help="Output bundle path")
+    parser.add_argument('--store', metavar='DIR', default=None,
+                        help="Build from a content-addressed headshot store")
+    parser.add_argument('--csv', default='nba_player_ids.csv',
+                        help="Player ID CSV (directory mode)")
+    parser.add_argument('--dir', default='playerHeadshots',
+                        help="Directory of downloaded headshots (directory mode)")
+    args = parser.parse_args()
+
+    build_bundle(args.bundle, store_dir=args.store, csv_filename=args.csv, output_dir=args.dir)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Content-addressed storage for NBA player headshots
+Blobs are named by their SHA-256 and an index maps PersonID -> blob, so identical
+images (e.g. the CDN's generic silhouette) are stored once and lookups go by ID
+
+Layout:
+    <root>/blobs/<aa>/<sha256>.<ext>
+    <root>/index.json          PersonID -> {sha256, size, etag, last_modified, name, placeholder}
+    <root>/placeholders.json   hashes known to be "no headshot" images
+
+Placeholder detection is heuristic only: there is no built-in list of silhouette
+hashes, so a hash becomes a placeholder once detect_placeholders() sees it shared by
+enough players (earlier copies are then re-marked too). To recognise a silhouette
+from the first download, add its sha256 to placeholders.json by hand.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import Counter
+from pathlib import Path
+
+INDEX_FILENAME = 'index.json'
+PLACEHOLDERS_FILENAME = 'placeholders.json'
+
+# A hash shared by at least this many different players is treated as a placeholder;
+# fewer copies than this are stored as real headshots
+DEFAULT_PLACEHOLDER_THRESHOLD = 3
+
+
+def sniff_extension(data):
+    """Pick a file extension from the image's magic bytes."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'jpg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return 'bin'
+
+
+class HeadshotStore:
+    """Content-addressed headshot blobs plus a PersonID index. Safe to share across threads."""
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_path = os.path.join(root, INDEX_FILENAME)
+        self.placeholders_path = os.path.join(root, PLACEHOLDERS_FILENAME)
+        self._lock = threading.Lock()
+
+        Path(self.blob_dir).mkdir(parents=True, exist_ok=True)
+        self.index = self._load_json(self.index_path, {})
+        self.placeholders = set(self._load_json(self.placeholders_path, []))
+
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def blob_path(self, sha256, ext):
+        return os.path.join(self.blob_dir, sha256[:2], f"{sha256}.{ext}")
+
+    def entry(self, person_id):
+        """Index entry for a player, or None if the player has never been stored."""
+        return self.index.get(str(person_id))
+
+    def has(self, person_id):
+        """True if the player is indexed and its blob (if any) is present on disk."""
+        entry = self.entry(person_id)
+        if not entry:
+            return False
+        if entry.get('placeholder'):
+            return True
+        return os.path.exists(self.blob_path(entry['sha256'], entry['ext']))
+
+    def path_for(self, person_id):
+        """Filesystem path of a player's headshot, or None if missing or a placeholder."""
+        entry = self.entry(person_id)
+        if not entry or entry.get('placeholder'):
+            return None
+        return self.blob_path(entry['sha256'], entry['ext'])
+
+    def read(self, person_id):
+        """Image bytes for a player, or None if missing or a placeholder."""
+        path = self.path_for(person_id)
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def put(self, person_id, data, name=None, etag=None, last_modified=None):
+        """
+        Store a player's headshot bytes
+
+        Args:
+            person_id: NBA PersonID
+            data: Raw image bytes
+            name: Player display name (informational only)
+            etag: ETag response header, kept for conditional re-fetches
+            last_modified: Last-Modified response header
+
+        Returns:
+            'stored' (new blob written), 'deduplicated' (blob already existed),
+            'unchanged' (player already points at this blob) or 'placeholder'
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        ext = sniff_extension(data)
+        person_id = str(person_id)
+        placeholder = sha256 in self.placeholders
+
+        with self._lock:
+            previous = self.index.get(person_id)
+            self.index[person_id] = {
+                'sha256': sha256,
+                'ext': ext,
+                'size': len(data),
+                'etag': etag,
+                'last_modified': last_modified,
+                'name': name,
+                'placeholder': placeholder,
+            }
+            # A blob deleted from disk falls through and is written again
+            if (previous and previous.get('sha256') == sha256 and previous.get('placeholder') == placeholder
+                    and (placeholder or os.path.exists(self.blob_path(sha256, ext)))):
+                return 'unchanged'
+
+        if placeholder:
+            return 'placeholder'
+
+        path = self.blob_path(sha256, ext)
+        if os.path.exists(path):
+            return 'deduplicated'
+
+        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+        # Unique temp name so two threads storing the same bytes can't clobber each other
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return 'stored'
+
+    def detect_placeholders(self, threshold=DEFAULT_PLACEHOLDER_THRESHOLD):
+        """
+        Promote any hash shared by `threshold` or more players to a placeholder,
+        mark those players as "no headshot" and delete the shared blob
+
+        Returns:
+            Set of newly detected placeholder hashes
+        """
+        with self._lock:
+            counts = Counter(
+                entry['sha256'] for entry in self.index.values() if not entry.get('placeholder')
+            )
+            detected = {sha for sha, count in counts.items() if count >= threshold}
+            for entry in self.index.values():
+                if entry['sha256'] in detected:
+                    entry['placeholder'] = True
+                    blob = self.blob_path(entry['sha256'], entry['ext'])
+                    if os.path.exists(blob):
+                        os.remove(blob)
+            self.placeholders |= detected
+        return detected
+
+    def save(self):
+        """Persist the index and placeholder list."""
+        with self._lock:
+            self._write_json(self.index_path, self.index)
+            self._write_json(self.placeholders_path, sorted(self.placeholders))
+
+    def stats(self):
+        """Counts of indexed players, placeholder players, unique blobs and blob bytes."""
+        blobs = {}
+        placeholders = 0
+        for entry in self.index.values():
+            if entry.get('placeholder'):
+                placeholders += 1
+            else:
+                blobs[entry['sha256']] = entry['size']
+        return {
+            'players': len(self.index),
+            'placeholders': placeholders,
+            'blobs': len(blobs),
+            'blob_bytes': sum(blobs.values()),
+        }
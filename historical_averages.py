@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Bulk historical season-averages loader
+Python counterpart of `npm run etl:historical` for full-history rebuilds: each season's
+per-game averages for the whole league come from one stats.nba.com
+leaguedashplayerstats request instead of BallDontLie cursor pages. Rows are mapped to
+players.id through the crosswalk and the players table, then every season is COPYed
+into a temp staging table and merged into historical_season_averages with one
+set-based upsert, so there are no per-row round-trips.
+
+Seasons follow run-historical-all-years.sh: START/END are API season years
+(1996 = 1996-97) and rows are stored with season = year + 1.
+
+Usage:
+    python historical_averages.py --write-db                     # 1996-2024 into DATABASE_URL
+    python historical_averages.py 2020 2024 --write-db --season-type playoffs
+    python historical_averages.py 2023 2023 --cache-only --output averages.csv   # recorded responses, no DB
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from fetch_nba_player_ids import HEADERS, season_label
+from http_cache import CachedSession, add_cache_arguments, cache_from_args
+from rate_limit import TokenBucket, backoff_delay
+from metrics import add_metrics_arguments, metrics_from_args, record_retry, stage
+from player_crosswalk import DEFAULT_CROSSWALK_PATH, PlayerCrosswalk
+from player_matcher import normalize_name
+
+# NBA_LEAGUE_DASH_URL points requests at a local stand-in server (benchmarks/)
+LEAGUE_DASH_URL = os.getenv('NBA_LEAGUE_DASH_URL', 'https://stats.nba.com/stats/leaguedashplayerstats')
+DEFAULT_START = 1996
+DEFAULT_END = 2024
+DEFAULT_WORKERS = 2
+DEFAULT_RPS = 0.5
+MAX_RETRIES = 3
+
+SEASON_TYPES = {'regular': 'Regular Season', 'playoffs': 'Playoffs'}
+
+# historical_season_averages column -> (leaguedashplayerstats column, type)
+STAT_COLUMNS = {
+    'games_played': ('GP', int),
+    'minutes': ('MIN', float),
+    'points': ('PTS', float),
+    'assists': ('AST', float),
+    'rebounds': ('REB', float),
+    'steals': ('STL', float),
+    'blocks': ('BLK', float),
+    'turnovers': ('TOV', float),
+    'fgm': ('FGM', float),
+    'fga': ('FGA', float),
+    'fg_pct': ('FG_PCT', float),
+    'tpm': ('FG3M', float),
+    'tpa': ('FG3A', float),
+    'three_pct': ('FG3_PCT', float),
+    'ftm': ('FTM', float),
+    'fta': ('FTA', float),
+    'ft_pct': ('FT_PCT', float),
+    'age': ('AGE', int),
+}
+
+# Staged row layout (also the --output CSV header); player_id is filled from the
+# players table, bdl_id from the crosswalk
+STAGE_COLUMNS = ['player_id', 'bdl_id', 'nba_id', 'player_name', 'season'] + list(STAT_COLUMNS)
+
+STAGE_TABLE = 'historical_season_averages_stage'
+# Session-lifetime temp table, emptied at every commit so each season starts clean
+STAGE_DDL = (f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ("
+             "player_id integer, bdl_id integer, nba_id integer, player_name text, season integer, "
+             + ', '.join(f"{column} {'integer' if cast is int else 'real'}"
+                         for column, (_, cast) in STAT_COLUMNS.items())
+             + ") ON COMMIT DELETE ROWS")
+
+# Players the crosswalk knows but the players table doesn't yet are created first,
+# like the TS job does (no team for historical players)
+CREATE_MISSING_PLAYERS_SQL = f"""
+INSERT INTO players (api_id, full_name, first_name, last_name)
+SELECT DISTINCT ON (bdl_id) bdl_id, player_name, split_part(player_name, ' ', 1),
+       coalesce(nullif(substr(player_name, strpos(player_name, ' ') + 1), player_name), '')
+FROM {STAGE_TABLE}
+WHERE player_id IS NULL AND bdl_id IS NOT NULL
+ON CONFLICT (api_id) DO NOTHING
+"""
+
+RESOLVE_PLAYERS_SQL = f"""
+UPDATE {STAGE_TABLE} s SET player_id = p.id
+FROM players p
+WHERE s.player_id IS NULL AND p.api_id = s.bdl_id
+"""
+
+# Same conflict handling as upsertHistoricalSeasonAverage: a NULL never overwrites a value
+_COALESCE_UPDATES = ',\n    '.join(
+    f"{column} = COALESCE(EXCLUDED.{column}, historical_season_averages.{column})" for column in STAT_COLUMNS)
+UPSERT_SQL = f"""
+INSERT INTO historical_season_averages (player_id, player_name, season, {', '.join(STAT_COLUMNS)})
+SELECT DISTINCT ON (player_id) player_id, player_name, season, {', '.join(STAT_COLUMNS)}
+FROM {STAGE_TABLE}
+WHERE player_id IS NOT NULL
+ORDER BY player_id, games_played DESC NULLS LAST
+ON CONFLICT (player_id, season) DO UPDATE SET
+    player_name = EXCLUDED.player_name,
+    {_COALESCE_UPDATES}
+"""
+
+
+def league_dash_params(season, season_type='regular'):
+    """Query string for one season of per-game base stats (the endpoint wants every filter sent)."""
+    return {
+        'LeagueID': '00', 'Season': season_label(season), 'SeasonType': SEASON_TYPES[season_type],
+        'PerMode': 'PerGame', 'MeasureType': 'Base', 'PlusMinus': 'N', 'PaceAdjust': 'N', 'Rank': 'N',
+        'LastNGames': '0', 'Month': '0', 'OpponentTeamID': '0', 'Period': '0', 'TeamID': '0',
+        'College': '', 'Conference': '', 'Country': '', 'DateFrom': '', 'DateTo': '', 'Division': '',
+        'DraftPick': '', 'DraftYear': '', 'GameScope': '', 'GameSegment': '', 'Height': '',
+        'Location': '', 'Outcome': '', 'PORound': '', 'PlayerExperience': '', 'PlayerPosition': '',
+        'SeasonSegment': '', 'ShotClockRange': '', 'StarterBench': '', 'TwoWay': '', 'VsConference': '',
+        'VsDivision': '', 'Weight': '',
+    }
+
+
+def fetch_season_averages(season, season_type='regular', session=None):
+    """
+    Fetch every player's per-game averages for one season in a single request
+
+    Returns:
+        (headers, rowSet) exactly as returned by the API
+
+    Raises:
+        requests.exceptions.RequestException, KeyError, IndexError, ValueError
+    """
+    response = (session or requests).get(LEAGUE_DASH_URL, headers=HEADERS,
+                                         params=league_dash_params(season, season_type), timeout=30)
+    response.raise_for_status()
+    result_set = response.json()['resultSets'][0]
+    return result_set['headers'], result_set['rowSet']
+
+
+def fetch_season_with_retry(season, season_type, session, limiter, retries=MAX_RETRIES):
+    """Fetch one season under the shared rate limit, retrying with backoff."""
+    for attempt in range(1, retries + 2):
+        limiter.acquire()
+        try:
+            return fetch_season_averages(season, season_type, session)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if attempt > retries:
+                raise
+            delay = backoff_delay(attempt, base=2.0)
+            record_retry('stats.nba.com', attempt, reason=type(e).__name__)
+            print(f"⚠️  {season_label(season)}: {e} - retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class PlayerIdMap:
+    """
+    NBA PersonID -> (players.id, BallDontLie id), resolved in memory once per run
+
+    The crosswalk maps PersonIDs to BallDontLie IDs (players.api_id); players the
+    crosswalk doesn't know fall back to a unique normalized-name match against the
+    players table.
+    """
+
+    def __init__(self, players_rows=(), crosswalk=None):
+        """
+        Args:
+            players_rows: (id, api_id, full_name) rows from the players table
+            crosswalk: Optional PlayerCrosswalk
+        """
+        self.crosswalk = crosswalk
+        self.by_api_id = {}
+        by_name = {}
+        for player_id, api_id, full_name in players_rows:
+            self.by_api_id[api_id] = player_id
+            by_name.setdefault(normalize_name(full_name), []).append((player_id, api_id))
+        self.by_name = {key: matches[0] for key, matches in by_name.items() if len(matches) == 1}
+
+    @classmethod
+    def from_database(cls, conn, crosswalk=None):
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, api_id, full_name FROM players")
+            return cls(cur.fetchall(), crosswalk)
+
+    def resolve(self, nba_id, name):
+        """(players.id or None, BallDontLie id or None) for one PersonID."""
+        bdl_id = self.crosswalk.bdl_id_for_nba(nba_id) if self.crosswalk is not None else None
+        if bdl_id is not None:
+            return self.by_api_id.get(bdl_id), bdl_id
+        match = self.by_name.get(normalize_name(name))
+        return match if match else (None, None)
+
+
+def stage_rows(season, headers, rows, id_map=None):
+    """
+    Convert one season's rowSet into STAGE_COLUMNS tuples (DB season = API season + 1)
+
+    Values are read positionally straight from the payload; blanks become None.
+    """
+    idx_person_id = headers.index('PLAYER_ID')
+    idx_name = headers.index('PLAYER_NAME')
+    stat_idx = [(headers.index(source), cast) if source in headers else (None, cast)
+                for source, cast in STAT_COLUMNS.values()]
+    id_map = id_map or PlayerIdMap()
+    staged = []
+    for row in rows:
+        nba_id = int(row[idx_person_id])
+        player_id, bdl_id = id_map.resolve(nba_id, row[idx_name])
+        stats = tuple(None if i is None or row[i] in (None, '') else cast(row[i]) for i, cast in stat_idx)
+        staged.append((player_id, bdl_id, nba_id, row[idx_name], season + 1) + stats)
+    return staged
+
+
+def write_season(conn, staged):
+    """
+    Load one season in a single transaction: COPY into a temp stage, create players the
+    crosswalk knows but the table lacks, then one upsert into historical_season_averages
+
+    Returns:
+        (rows upserted, rows skipped because no player could be resolved)
+    """
+    from pg_bulk import copy_rows
+    with conn, conn.cursor() as cur:
+        cur.execute(STAGE_DDL)
+        copy_rows(cur, STAGE_TABLE, STAGE_COLUMNS, staged)
+        cur.execute(CREATE_MISSING_PLAYERS_SQL)
+        cur.execute(RESOLVE_PLAYERS_SQL)
+        cur.execute(f"SELECT count(*) FROM {STAGE_TABLE} WHERE player_id IS NULL")
+        skipped = cur.fetchone()[0]
+        cur.execute(UPSERT_SQL)
+        return cur.rowcount, skipped
+
+
+def write_csv(staged_seasons, output):
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(STAGE_COLUMNS)
+        for staged in staged_seasons:
+            writer.writerows(staged)
+    os.replace(tmp_path, output)
+
+
+def load_seasons(start, end, season_type='regular', session=None, workers=DEFAULT_WORKERS, rps=DEFAULT_RPS,
+                 conn=None, crosswalk=None):
+    """
+    Fetch seasons start..end concurrently; each season is staged, and written to `conn`
+    (if given) on the calling thread as soon as it arrives
+
+    Returns:
+        (staged rows per season, failed season years)
+    """
+    seasons = list(range(start, end + 1))
+    print(f"📡 Fetching {len(seasons)} {season_type} seasons ({season_label(start)} to {season_label(end)}) "
+          f"with {workers} workers at {rps} req/s...")
+
+    id_map = PlayerIdMap.from_database(conn, crosswalk) if conn is not None else PlayerIdMap(crosswalk=crosswalk)
+    if conn is not None:
+        print(f"📇 {len(id_map.by_api_id)} players in the players table")
+    limiter = TokenBucket(rps, name='stats.nba.com')
+    staged_seasons = {}
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch_season_with_retry, year, season_type, session, limiter): year
+                   for year in seasons}
+        for future in as_completed(futures):
+            year = futures[future]
+            try:
+                headers, rows = future.result()
+                staged = stage_rows(year, headers, rows, id_map)
+            except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
+                failed.append(year)
+                print(f"  ❌ {season_label(year)}: {e}")
+                continue
+            staged_seasons[year] = staged
+            if conn is None:
+                print(f"  ✅ {season_label(year)}: {len(staged)} players")
+                continue
+            with stage('write'):
+                upserted, skipped = write_season(conn, staged)
+            print(f"  ✅ {season_label(year)}: {upserted} rows upserted"
+                  + (f", {skipped} skipped (no matching player)" if skipped else ""))
+
+    return [staged_seasons[year] for year in sorted(staged_seasons)], sorted(failed)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Bulk-load historical season averages (one request and one COPY per season)")
+    parser.add_argument('start', nargs='?', type=int, default=DEFAULT_START,
+                        help=f"First API season year, e.g. 1996 for 1996-97 (default: {DEFAULT_START})")
+    parser.add_argument('end', nargs='?', type=int, default=DEFAULT_END,
+                        help=f"Last API season year, inclusive (default: {DEFAULT_END})")
+    parser.add_argument('--season-type', choices=sorted(SEASON_TYPES), default='regular')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Concurrent season requests")
+    parser.add_argument('--rps', type=float, default=DEFAULT_RPS,
+                        help=f"Requests per second shared by all workers (default: {DEFAULT_RPS})")
+    parser.add_argument('--database-url', default=None, help="Postgres URL (default: $DATABASE_URL)")
+    parser.add_argument('--write-db', action='store_true', help="Upsert into historical_season_averages")
+    parser.add_argument('--output', default=None, metavar='PATH', help="Write the staged rows as CSV")
+    parser.add_argument('--crosswalk', default=DEFAULT_CROSSWALK_PATH, metavar='PATH',
+                        help=f"Player crosswalk for PersonID -> BallDontLie ID (default: {DEFAULT_CROSSWALK_PATH}, "
+                             f"used if it exists)")
+    add_cache_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics_from_args(args, job='historical_averages')
+
+    if args.start > args.end:
+        parser.error("start must not be after end")
+    if not (args.write_db or args.output):
+        parser.error("nothing to do: pass --write-db and/or --output")
+
+    print("📊 Historical Season Averages (bulk)")
+    print("=" * 50)
+    started = time.perf_counter()
+
+    cache = cache_from_args(args)
+    session = CachedSession(cache) if cache else requests.Session()
+    crosswalk = PlayerCrosswalk(args.crosswalk) if os.path.exists(args.crosswalk) else None
+    conn = None
+    if args.write_db:
+        from pg_bulk import connect
+        conn = connect(args.database_url)
+
+    with stage('fetch'):
+        staged_seasons, failed = load_seasons(args.start, args.end, args.season_type, session=session,
+                                              workers=args.workers, rps=args.rps, conn=conn, crosswalk=crosswalk)
+    if conn is not None:
+        conn.close()
+    if args.output and staged_seasons:
+        with stage('write'):
+            write_csv(staged_seasons, args.output)
+        print(f"\n💾 Wrote {sum(len(s) for s in staged_seasons)} rows to {args.output}")
+
+    if failed or not staged_seasons:
+        print(f"\n❌ Failed seasons: {', '.join(season_label(y) for y in failed) or 'all'}")
+        sys.exit(1)
+    print(f"\n✅ Loaded {len(staged_seasons)} seasons in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk HTTP response cache shared by the data-fetch scripts
+Responses are stored in SQLite keyed by normalized URL + params, with per-endpoint
+TTLs, size-bounded LRU eviction and an offline "cache-only" mode
+
+Usage:
+    session = CachedSession(HttpCache('.http_cache/responses.sqlite'))
+    session.get(url, params=params)          # drop-in for requests.Session
+
+    # nba_api endpoints can share it too:
+    from nba_api.stats.library.http import NBAStatsHTTP
+    NBAStatsHTTP.set_session(session)
+"""
+
+import io
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_PATH = os.path.join('.http_cache', 'responses.sqlite')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL = 60 * 60
+
+FOREVER = None
+HOUR = 60 * 60
+
+# Puts between full recounts of the stored size (other processes may share the file)
+RECOUNT_INTERVAL = 256
+
+# First matching pattern (searched in the normalized URL) wins. FOREVER never expires,
+# 0 disables caching for that endpoint.
+DEFAULT_TTLS = [
+    (r'stats\.nba\.com/stats/commonplayerinfo', FOREVER),  # birthdates never change
+    (r'stats\.nba\.com/stats/commonallplayers', 6 * HOUR),
+    (r'stats\.nba\.com/stats/leaguedashplayerstats', 24 * HOUR),
+    (r'/players/active', 6 * HOUR),
+    (r'cdn\.nba\.com/headshots/', 24 * HOUR),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    status      INTEGER NOT NULL,
+    headers     TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    body        BLOB NOT NULL,
+    fetched_at  REAL NOT NULL,
+    expires_at  REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at_idx ON responses (accessed_at);
+-- Covers SUM(size) and the LRU scan, so neither reads the body overflow pages
+CREATE INDEX IF NOT EXISTS responses_lru_size_idx ON responses (accessed_at, size, key);
+"""
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    """Raised in cache-only mode when a request has no fresh cached response."""
+
+
+def normalize_key(method, url, params=None):
+    """
+    Build the cache key: upper-case method, lower-case scheme/host, and the query string
+    merged with `params` and sorted, so equivalent requests share one entry
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query.extend((str(k), '' if v is None else str(v)) for k, v in items)
+    query.sort()
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/',
+                             urlencode(query), ''))
+    return f"{method.upper()} {normalized}"
+
+
+class HttpCache:
+    """SQLite-backed response store. One connection per thread, so it can be shared by worker pools."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, default_ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        """
+        Args:
+            path: SQLite database file
+            ttls: List of (regex, seconds) rules; FOREVER never expires, 0 = don't cache
+            default_ttl: TTL for URLs no rule matches
+            max_bytes: Total body size kept before least-recently-used entries are evicted
+            offline: Cache-only mode - never touch the network, raise CacheMissError on misses
+        """
+        self.path = path
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._local = threading.local()
+        self._evict_lock = threading.Lock()
+        self._stored_bytes = None
+        self._puts_since_recount = 0
+
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, key):
+        for pattern, ttl in self.rules:
+            if pattern.search(key):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key):
+        """Return (status, headers, body, url) for a fresh entry, or None."""
+        now = time.time()
+        row = self._conn().execute(
+            'SELECT status, headers, body, url, expires_at FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, url, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        self._conn().execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        return status, json.loads(headers), body, url
+
+    def put(self, key, url, status, headers, body):
+        """Store a response if its endpoint is cacheable. Returns True if stored."""
+        ttl = self.ttl_for(key)
+        if ttl == 0:
+            return False
+        now = time.time()
+        expires_at = None if ttl is FOREVER else now + ttl
+        self._conn().execute(
+            'INSERT OR REPLACE INTO responses '
+            '(key, url, status, headers, body, size, fetched_at, expires_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, url, status, json.dumps(dict(headers)), body, len(body), now, expires_at, now),
+        )
+        self.evict(added=len(body))
+        return True
+
+    def _count_bytes(self):
+        return self._conn().execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def evict(self, added=0):
+        """
+        Drop least-recently-used entries until the total body size fits max_bytes
+
+        The total is kept as a running sum of `added` bytes and only recounted every
+        RECOUNT_INTERVAL puts, or when it goes over budget (it overcounts replaced
+        entries, so nothing is deleted on its word alone).
+        """
+        if not self.max_bytes:
+            return
+        with self._evict_lock:
+            self._puts_since_recount += 1
+            if self._stored_bytes is None or self._puts_since_recount >= RECOUNT_INTERVAL:
+                total = self._count_bytes()
+                self._puts_since_recount = 0
+            else:
+                total = self._stored_bytes + added
+            if total > self.max_bytes and self._puts_since_recount:
+                total = self._count_bytes()
+                self._puts_since_recount = 0
+            self._stored_bytes = total
+            if total <= self.max_bytes:
+                return
+            conn = self._conn()
+            for key, size in conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed_at ASC'
+            ).fetchall():
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            self._stored_bytes = total
+
+    def purge_expired(self):
+        """Delete expired entries. Returns the number removed."""
+        cursor = self._conn().execute(
+            'DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),)
+        )
+        with self._evict_lock:
+            self._stored_bytes = None
+        return cursor.rowcount
+
+    def stats(self):
+        entries, size = self._conn().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        return {'entries': entries, 'bytes': size}
+
+
+def build_response(request, status, headers, body, url):
+    """Materialize a cached entry as a requests.Response (raw is a BytesIO for streaming callers)."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.url = url
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.request = request
+    response.reason = 'OK' if status == 200 else ''
+    response.from_cache = True
+    return response
+
+
+class CachedSession(requests.Session):
+    """
+    requests.Session that serves GETs from an HttpCache. Only 200 responses without
+    conditional request headers are cached; everything else passes straight through.
+    """
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        conditional = headers and any(h.lower().startswith('if-') for h in headers)
+        if method.upper() != 'GET' or conditional:
+            if self.cache.offline:
+                raise CacheMissError(f"cache-only mode: refusing {method} {url}")
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        key = normalize_key(method, url, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            request = requests.Request(method, url, params=params, headers=headers).prepare()
+            return build_response(request, *cached)
+
+        self.misses += 1
+        if self.cache.offline:
+            raise CacheMissError(f"cache-only mode: no cached response for {key}")
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+        body = response.content
+        if response.status_code == 200:
+            self.cache.put(key, response.url, response.status_code, response.headers, body)
+        # Callers may stream from r.raw, which reading .content has already drained
+        response.raw = io.BytesIO(body)
+        response.from_cache = False
+        return response
+
+
+def add_cache_arguments(parser):
+    """Add the shared --cache / --cache-only flags to a script's ArgumentParser."""
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, metavar='PATH',
+                        help=f"Cache HTTP responses on disk (default path: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--cache-only', action='store_true',
+                        help="Serve only from the HTTP cache and never touch the network")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Evict least-recently-used cache entries above this size")
+
+
+def cache_from_args(args):
+    """Build the HttpCache selected by add_cache_arguments() flags, or None if caching is off."""
+    if not args.cache and not args.cache_only:
+        return None
+    return HttpCache(args.cache or DEFAULT_CACHE_PATH, max_bytes=args.cache_max_mb * 1024 * 1024,
+                     offline=args.cache_only)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Structured request metrics shared by the Python tools
+When enabled, every HTTP request made through `requests` (including nba_api's own
+session) is timed at the transport adapter, and rate-limiter sleeps, retries and
+named stages are recorded alongside. Records stream to a JSONL file, and a
+Prometheus textfile with latency histograms and per-stage totals is written at exit
+(for node_exporter's textfile collector).
+
+Usage in a script:
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics_from_args(args, job='download_player_headshots')
+    with stage('download'):
+        ...
+
+All module-level helpers are no-ops until a recorder is installed, so library code
+can call them unconditionally.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import contextlib
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import rate_limit
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = 'nba_tools'
+
+_recorder = None
+_original_send = None
+
+# Wraps every stage() block when set; profiling.install() sets it
+stage_profiler = None
+
+
+class MetricsRecorder:
+    """Thread-safe collector for request, sleep, retry and stage records."""
+
+    def __init__(self, job, jsonl_path=None, prom_path=None):
+        """
+        Args:
+            job: Job label written on every record/metric (usually the script name)
+            jsonl_path: Stream records here as JSON lines ('-' = stdout)
+            prom_path: Prometheus textfile written by close()
+        """
+        self.job = job
+        self.prom_path = prom_path
+        self.started = time.time()
+        self._closed = False
+        self._lock = threading.Lock()
+        # stdout is captured now, so --quiet silencing print() later doesn't swallow records
+        self._jsonl = sys.stdout if jsonl_path == '-' else None
+        self._owns_jsonl = bool(jsonl_path) and jsonl_path != '-'
+        if self._owns_jsonl:
+            self._jsonl = open(jsonl_path, 'a', encoding='utf-8')
+
+        # Aggregates keyed by host (requests) or limiter/stage name
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum = defaultdict(float)
+        self.requests = defaultdict(int)            # (host, status) -> count
+        self.bytes = defaultdict(int)               # host -> bytes
+        self.retries = defaultdict(int)             # upstream -> count
+        self.sleep_seconds = defaultdict(float)     # limiter -> seconds
+        self.stage_seconds = defaultdict(float)     # stage -> seconds
+
+    def _emit(self, record):
+        if self._jsonl is None:
+            return
+        record = dict(record, ts=round(time.time(), 3), job=self.job)
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._jsonl.write(line)
+
+    def record_request(self, method, url, status, latency, ttfb=None, size=0, error=None):
+        parts = urlsplit(url)
+        host = parts.netloc
+        with self._lock:
+            counts = self.latency_buckets[host]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.latency_sum[host] += latency
+            self.requests[(host, str(status) if status else 'error')] += 1
+            self.bytes[host] += size
+        self._emit({'type': 'request', 'method': method, 'host': host, 'path': parts.path,
+                    'status': status, 'latency_s': round(latency, 4),
+                    'ttfb_s': round(ttfb, 4) if ttfb is not None else None,
+                    'bytes': size, 'error': error})
+
+    def record_sleep(self, limiter, seconds):
+        with self._lock:
+            self.sleep_seconds[limiter] += seconds
+        self._emit({'type': 'rate_limit_sleep', 'limiter': limiter, 'seconds': round(seconds, 4)})
+
+    def record_retry(self, upstream, attempt, reason=None):
+        with self._lock:
+            self.retries[upstream] += 1
+        self._emit({'type': 'retry', 'upstream': upstream, 'attempt': attempt, 'reason': reason})
+
+    def record_stage(self, name, seconds):
+        # Stages entered from worker threads add up, so a stage can exceed the run's wall time
+        with self._lock:
+            self.stage_seconds[name] += seconds
+        self._emit({'type': 'stage', 'stage': name, 'seconds': round(seconds, 4)})
+
+    def prometheus_text(self):
+        """Render all aggregates in the Prometheus text exposition format."""
+        job = _label_value(self.job)
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        with self._lock:
+            header('http_request_duration_seconds', 'histogram', 'HTTP request latency by upstream host')
+            for host, counts in sorted(self.latency_buckets.items()):
+                labels = f'job="{job}",host="{_label_value(host)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_PREFIX}_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{METRIC_PREFIX}_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f'{METRIC_PREFIX}_http_request_duration_seconds_sum{{{labels}}} {self.latency_sum[host]:.6f}')
+                lines.append(f'{METRIC_PREFIX}_http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+            header('http_requests_total', 'counter', 'HTTP requests by upstream host and status')
+            for (host, status), count in sorted(self.requests.items()):
+                lines.append(f'{METRIC_PREFIX}_http_requests_total{{job="{job}",host="{_label_value(host)}",'
+                             f'status="{status}"}} {count}')
+
+            header('http_response_bytes_total', 'counter', 'Response body bytes by upstream host')
+            for host, size in sorted(self.bytes.items()):
+                lines.append(f'{METRIC_PREFIX}_http_response_bytes_total{{job="{job}",host="{_label_value(host)}"}} {size}')
+
+            header('retries_total', 'counter', 'Retried requests by upstream')
+            for upstream, count in sorted(self.retries.items()):
+                lines.append(f'{METRIC_PREFIX}_retries_total{{job="{job}",upstream="{_label_value(upstream)}"}} {count}')
+
+            header('rate_limit_sleep_seconds_total', 'counter', 'Time spent waiting on rate limiters')
+            for limiter, seconds in sorted(self.sleep_seconds.items()):
+                lines.append(f'{METRIC_PREFIX}_rate_limit_sleep_seconds_total{{job="{job}",'
+                             f'limiter="{_label_value(limiter)}"}} {seconds:.6f}')
+
+            header('stage_duration_seconds', 'gauge', 'Wall time spent in each stage of the last run')
+            for name, seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'{METRIC_PREFIX}_stage_duration_seconds{{job="{job}",stage="{_label_value(name)}"}} {seconds:.6f}')
+
+        header('run_duration_seconds', 'gauge', 'Wall time of the last run')
+        lines.append(f'{METRIC_PREFIX}_run_duration_seconds{{job="{job}"}} {time.time() - self.started:.6f}')
+        header('last_run_timestamp_seconds', 'gauge', 'Unix time the last run finished')
+        lines.append(f'{METRIC_PREFIX}_last_run_timestamp_seconds{{job="{job}"}} {time.time():.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Atomically write the textfile so a collector never reads a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def print_summary(self, out=None):
+        """Human-readable per-host and per-limiter summary."""
+        out = out or sys.stdout
+        with self._lock:
+            hosts = sorted(self.latency_sum)
+            if not hosts and not self.sleep_seconds and not self.stage_seconds:
+                return
+            print("\n📈 Request metrics", file=out)
+            for host in hosts:
+                total = sum(count for (h, _), count in self.requests.items() if h == host)
+                errors = sum(count for (h, status), count in self.requests.items()
+                             if h == host and not status.startswith(('2', '3')))
+                p50 = _bucket_quantile(self.latency_buckets[host], 0.5)
+                p95 = _bucket_quantile(self.latency_buckets[host], 0.95)
+                print(f"   {host}: {total} requests ({errors} non-2xx/3xx), "
+                      f"avg {self.latency_sum[host] / max(total, 1) * 1000:.0f}ms, "
+                      f"p50 <= {p50}, p95 <= {p95}, {self.bytes[host] / 1e6:.2f} MB", file=out)
+            for upstream, count in sorted(self.retries.items()):
+                print(f"   🔁 {upstream}: {count} retries", file=out)
+            for limiter, seconds in sorted(self.sleep_seconds.items()):
+                print(f"   ⏳ {limiter}: {seconds:.1f}s waiting on the rate limiter", file=out)
+            for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1]):
+                print(f"   ⏱️  {name}: {seconds:.1f}s", file=out)
+
+    def close(self, summary=True):
+        if self._closed:
+            return
+        self._closed = True
+        if self.prom_path:
+            self.write_prometheus(self.prom_path)
+        if summary:
+            self.print_summary()
+        if self._owns_jsonl:
+            self._jsonl.close()
+        elif self._jsonl is not None:
+            self._jsonl.flush()
+        self._jsonl = None
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _bucket_quantile(counts, q):
+    total = sum(counts)
+    if not total:
+        return '-'
+    target = q * total
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, counts):
+        cumulative += count
+        if cumulative >= target:
+            return f"{bound * 1000:.0f}ms"
+    return f">{LATENCY_BUCKETS[-1]:.0f}s"
+
+
+def _instrumented_send(adapter, request, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = _original_send(adapter, request, *args, **kwargs)
+    except Exception as e:
+        if _recorder is not None:
+            _recorder.record_request(request.method, request.url, None, time.perf_counter() - started,
+                                     error=type(e).__name__)
+        raise
+    if _recorder is not None:
+        # The adapter returns once headers arrive (connect + server time); the body is read after
+        headers_at = time.perf_counter() - started
+        if kwargs.get('stream'):
+            # Streaming callers read the body themselves, so only Content-Length is known here
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        _recorder.record_request(request.method, request.url, response.status_code,
+                                 time.perf_counter() - started, ttfb=headers_at, size=size)
+    return response
+
+
+def install(recorder):
+    """
+    Make `recorder` the active recorder: hook requests' transport adapter and the
+    rate limiters, and write the Prometheus file / summary when the process exits.
+    """
+    global _recorder, _original_send
+    from requests.adapters import HTTPAdapter
+
+    _recorder = recorder
+    if _original_send is None:
+        _original_send = HTTPAdapter.send
+        HTTPAdapter.send = _instrumented_send
+    rate_limit.sleep_observer = recorder.record_sleep
+    atexit.register(recorder.close)
+    return recorder
+
+
+def active():
+    """The installed MetricsRecorder, or None."""
+    return _recorder
+
+
+def record_retry(upstream, attempt, reason=None):
+    if _recorder is not None:
+        _recorder.record_retry(upstream, attempt, reason)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a block as a named stage (no-op without an active recorder or profiler)."""
+    started = time.perf_counter()
+    try:
+        if stage_profiler is None:
+            yield
+        else:
+            with stage_profiler.profile(name):
+                yield
+    finally:
+        if _recorder is not None:
+            _recorder.record_stage(name, time.perf_counter() - started)
+
+
+def add_metrics_arguments(parser):
+    """Add the shared --metrics-jsonl / --metrics-prom / --quiet / --profile flags to a script's ArgumentParser."""
+    parser.add_argument('--metrics-jsonl', metavar='PATH', default=None,
+                        help="Append per-request/sleep/retry/stage records as JSON lines ('-' = stdout)")
+    parser.add_argument('--metrics-prom', metavar='PATH', default=None,
+                        help="Write a Prometheus textfile with latency histograms and stage totals at exit")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Suppress the human-readable progress output (metrics records are still written)")
+    parser.add_argument('--profile', nargs='?', const='profiles', default=None, metavar='DIR',
+                        help="Write per-stage cProfile stats, flamegraph stacks and allocation sites to DIR "
+                             "(default: profiles/)")
+    parser.add_argument('--profile-interval', type=float, default=5, metavar='MS',
+                        help="Stack sampling interval for --profile in milliseconds (default: 5)")
+
+
+def metrics_from_args(args, job):
+    """
+    Install a recorder if any metrics flag was given, a stage profiler for --profile,
+    and honour --quiet
+
+    Returns:
+        The installed MetricsRecorder, or None
+    """
+    jsonl_path = getattr(args, 'metrics_jsonl', None)
+    prom_path = getattr(args, 'metrics_prom', None)
+    recorder = None
+    if jsonl_path or prom_path:
+        recorder = install(MetricsRecorder(job, jsonl_path, prom_path))
+    if getattr(args, 'profile', None):
+        # Imported lazily: tracemalloc and cProfile are only wanted for profiled runs
+        import profiling
+        profiling.install(profiling.StageProfiler(args.profile, interval_ms=args.profile_interval))
+    if getattr(args, 'quiet', False):
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    return recorder
@@ -0,0 +1,48 @@
+"""
+PostgreSQL bulk helpers shared by the Python loaders
+psycopg2 is imported lazily so scripts that only read/write files don't need it.
+
+Usage:
+    with connect() as conn, conn.cursor() as cur:     # DATABASE_URL from the environment
+        copy_rows(cur, 'player_clusters', ['age', 'cluster_number', ...], rows)
+"""
+
+import io
+import os
+import csv
+
+
+def connect(database_url: str = None):
+    """Open a psycopg2 connection to `database_url` (default: $DATABASE_URL)."""
+    database_url = database_url or os.getenv('DATABASE_URL')
+    if not database_url:
+        raise ValueError("DATABASE_URL is not set (pass --database-url or set it in .env)")
+    try:
+        import psycopg2
+    except ImportError:
+        raise ImportError("psycopg2 is required for database access: pip install psycopg2-binary") from None
+    return psycopg2.connect(database_url)
+
+
+def copy_rows(cursor, table: str, columns, rows) -> int:
+    """
+    Stream rows into `table` with COPY ... FROM STDIN (CSV). None becomes NULL.
+
+    Args:
+        cursor: psycopg2 cursor
+        table: Target table
+        columns: Column names, in row order
+        rows: Iterable of row tuples
+
+    Returns:
+        Number of rows copied
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
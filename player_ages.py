@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Player age-by-season table
+Computes every player's age for every season in one NumPy pass from the birthdate
+data written by fetch-player-birthdates.py, so the clustering and historical jobs
+can join against precomputed ages instead of deriving them row by row.
+
+Seasons use the DB convention (API season + 1, e.g. 2025 is the 2024-25 season).
+The age is taken on a cutoff date within each season: `--cutoff 10-01` (default,
+start of the season) means October 1, 2024 for season 2025; `--cutoff 02-01` (the
+Basketball-Reference convention) means February 1, 2025.
+
+Usage:
+    python player_ages.py 1997 2026
+    python player_ages.py 1997 2026 --birthdates player-birthdates.bin --cutoff 02-01 --output ages.csv
+
+Bulk load:
+    CREATE TABLE player_season_ages (player_api_id integer, season integer, age integer,
+                                     PRIMARY KEY (player_api_id, season));
+    \\copy player_season_ages FROM 'player_season_ages.csv' WITH (FORMAT csv, HEADER)
+"""
+
+import os
+import argparse
+from datetime import date
+
+import numpy as np
+
+from birthdate_artifact import CONSTANTS_COMPACT_JSON_FILE, OUTPUT_BIN_FILE, BirthdateTable
+
+DEFAULT_BIRTHDATE_SOURCES = [OUTPUT_BIN_FILE, CONSTANTS_COMPACT_JSON_FILE, 'player-birthdates.json']
+DEFAULT_OUTPUT = 'player_season_ages.csv'
+DEFAULT_CUTOFF = '10-01'
+DEFAULT_MIN_AGE = 18
+DEFAULT_MAX_AGE = 45
+
+CSV_HEADER = 'player_api_id,season,age'
+
+
+def parse_cutoff(cutoff: str):
+    """Parse 'MM-DD' into (month, day), rejecting dates that don't exist."""
+    month, day = (int(part) for part in cutoff.split('-'))
+    date(2000, month, day)  # leap year, so 02-29 is accepted
+    return month, day
+
+
+def cutoff_dates(seasons: np.ndarray, cutoff: str = DEFAULT_CUTOFF) -> np.ndarray:
+    """
+    Cutoff date for each DB season.
+
+    Args:
+        seasons: DB seasons (API season + 1)
+        cutoff: 'MM-DD'; months July-December fall in the season's first calendar year,
+                January-June in its second (the DB season number)
+
+    Returns:
+        datetime64[D] array, one date per season
+    """
+    month, day = parse_cutoff(cutoff)
+    years = seasons - 1 if month >= 7 else seasons
+    months = (years - 1970) * 12 + (month - 1)
+    first_of_month = months.astype('datetime64[M]').astype('datetime64[D]')
+    # Feb 29 cutoffs roll over to Mar 1 in non-leap years
+    return first_of_month + np.timedelta64(day - 1, 'D')
+
+
+def _year_and_month_day(dates: np.ndarray):
+    """Split datetime64[D] values into calendar year and a sortable month*32+day key."""
+    months = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]').astype(np.int32) + 1970
+    month_of_year = months.astype(np.int32) % 12 + 1
+    day_of_month = (dates - months.astype('datetime64[D]')).astype(np.int32) + 1
+    return years, month_of_year * 32 + day_of_month
+
+
+def age_table(birth_days: np.ndarray, seasons: np.ndarray, cutoff: str = DEFAULT_CUTOFF) -> np.ndarray:
+    """
+    Whole-year ages for every (player, season) pair.
+
+    Args:
+        birth_days: int32 birthdates as days since 1970-01-01, one per player
+        seasons: DB seasons
+        cutoff: 'MM-DD' age cutoff within each season
+
+    Returns:
+        int32 array of shape (players, seasons)
+    """
+    birth_years, birth_md = _year_and_month_day(birth_days.astype('datetime64[D]'))
+    cutoff_years, cutoff_md = _year_and_month_day(cutoff_dates(seasons, cutoff))
+    ages = cutoff_years[np.newaxis, :] - birth_years[:, np.newaxis]
+    # One year younger if the birthday falls after the cutoff in that year
+    ages -= (cutoff_md[np.newaxis, :] < birth_md[:, np.newaxis])
+    return ages.astype(np.int32)
+
+
+def build_rows(table: BirthdateTable, start: int, end: int, cutoff: str = DEFAULT_CUTOFF,
+               min_age: int = DEFAULT_MIN_AGE, max_age: int = DEFAULT_MAX_AGE) -> np.ndarray:
+    """
+    Flatten the player x season table into (player_api_id, season, age) rows.
+
+    Args:
+        table: Birthdates (see birthdate_artifact.BirthdateTable)
+        start, end: Inclusive DB season range
+        cutoff: 'MM-DD' age cutoff within each season
+        min_age, max_age: Inclusive age range to keep; rows outside it can't be playing seasons
+
+    Returns:
+        int32 array of shape (rows, 3), ordered by player then season
+    """
+    ids = np.frombuffer(table.ids, dtype=np.int32)
+    seasons = np.arange(start, end + 1, dtype=np.int32)
+    ages = age_table(np.frombuffer(table.days, dtype=np.int32), seasons, cutoff)
+
+    keep = (ages >= min_age) & (ages <= max_age)
+    player_index, season_index = np.nonzero(keep)
+    return np.column_stack((ids[player_index], seasons[season_index], ages[keep])).astype(np.int32)
+
+
+def write_rows(rows: np.ndarray, output: str):
+    """Write rows as CSV (for COPY), or .npy when `output` ends in .npy."""
+    tmp_path = f"{output}.tmp"
+    if output.endswith('.npy'):
+        with open(tmp_path, 'wb') as f:
+            np.save(f, rows)
+    else:
+        np.savetxt(tmp_path, rows, fmt='%d', delimiter=',', header=CSV_HEADER, comments='')
+    os.replace(tmp_path, output)
+
+
+def find_birthdates(paths) -> str:
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"no birthdate data found (tried {', '.join(paths)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute a player x season age table for bulk loading")
+    parser.add_argument('start', type=int, help="First DB season (API season + 1)")
+    parser.add_argument('end', type=int, help="Last DB season, inclusive")
+    parser.add_argument('--birthdates', default=None, metavar='PATH',
+                        help="Birthdate artifact (.bin, compact JSON or {id: date} JSON; "
+                             f"default: first of {', '.join(DEFAULT_BIRTHDATE_SOURCES)})")
+    parser.add_argument('--cutoff', default=DEFAULT_CUTOFF, metavar='MM-DD',
+                        help=f"Date within each season the age is taken on (default: {DEFAULT_CUTOFF})")
+    parser.add_argument('--min-age', type=int, default=DEFAULT_MIN_AGE)
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"CSV or .npy output (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("end season must not be before start season")
+    try:
+        parse_cutoff(args.cutoff)
+    except ValueError:
+        parser.error(f"invalid --cutoff {args.cutoff!r}, expected MM-DD")
+
+    source = args.birthdates or find_birthdates(DEFAULT_BIRTHDATE_SOURCES)
+    table = BirthdateTable.load(source)
+    print(f"🎂 Loaded {len(table)} birthdates from {source}")
+
+    rows = build_rows(table, args.start, args.end, args.cutoff, args.min_age, args.max_age)
+    write_rows(rows, args.output)
+    print(f"✅ Wrote {len(rows):,} player-season ages ({args.start}-{args.end}, cutoff {args.cutoff}) to {args.output}")
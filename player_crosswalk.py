@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Local player identity crosswalk
+One SQLite file maps the three ID spaces the scripts deal with - BallDontLie IDs,
+NBA.com PersonIDs and Basketball-Reference slugs - plus a normalized name, so
+fetchers resolve IDs with an index lookup instead of re-matching names every run
+
+Usage:
+    crosswalk = PlayerCrosswalk()                    # player_crosswalk.sqlite
+    crosswalk.nba_id_for_bdl(115)                    # -> 201939
+    crosswalk.upsert_many([{'nba_id': 2544, 'name': 'LeBron James'}])
+
+CLI:
+    python player_crosswalk.py stats
+    python player_crosswalk.py lookup --nba 2544
+    python player_crosswalk.py import-csv nba_player_registry.csv
+    python player_crosswalk.py link-bbref jamesle01 --nba 2544
+"""
+
+import os
+import sys
+import csv
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+
+from player_matcher import normalize_name
+
+DEFAULT_CROSSWALK_PATH = 'player_crosswalk.sqlite'
+
+ID_COLUMNS = ('bdl_id', 'nba_id', 'bbref_slug')
+COLUMNS = ('bdl_id', 'nba_id', 'bbref_slug', 'name', 'name_key')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id          INTEGER PRIMARY KEY,
+    bdl_id      INTEGER UNIQUE,
+    nba_id      INTEGER UNIQUE,
+    bbref_slug  TEXT UNIQUE,
+    name        TEXT,
+    name_key    TEXT
+);
+CREATE INDEX IF NOT EXISTS players_name_key_idx ON players (name_key);
+"""
+
+
+class PlayerCrosswalk:
+    """
+    SQLite-backed ID crosswalk with in-memory hash indexes for O(1) lookups
+
+    Each row is one player; any of bdl_id / nba_id / bbref_slug may be unknown (None).
+    The whole table is loaded once on open (a few thousand rows), and upserts keep
+    the dict indexes and the database in step.
+    """
+
+    def __init__(self, path=DEFAULT_CROSSWALK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+        self._rows = {}
+        self._index = {column: {} for column in ID_COLUMNS}
+        self._by_name = {}
+        for row_id, *values in self._conn.execute(f"SELECT id, {', '.join(COLUMNS)} FROM players"):
+            self._remember(row_id, dict(zip(COLUMNS, values)))
+
+    def _remember(self, row_id, record):
+        self._rows[row_id] = record
+        for column in ID_COLUMNS:
+            if record[column] is not None:
+                self._index[column][record[column]] = row_id
+        if record['name_key']:
+            self._by_name.setdefault(record['name_key'], set()).add(row_id)
+
+    def _forget(self, row_id):
+        record = self._rows.pop(row_id)
+        for column in ID_COLUMNS:
+            if record[column] is not None:
+                self._index[column].pop(record[column], None)
+        if record['name_key']:
+            self._by_name.get(record['name_key'], set()).discard(row_id)
+        return record
+
+    def __len__(self):
+        return len(self._rows)
+
+    # Lookups
+
+    def _get(self, column, value):
+        row_id = self._index[column].get(value)
+        return dict(self._rows[row_id]) if row_id is not None else None
+
+    def by_bdl(self, bdl_id):
+        """Crosswalk row for a BallDontLie ID, or None."""
+        return self._get('bdl_id', int(bdl_id))
+
+    def by_nba(self, nba_id):
+        """Crosswalk row for an NBA.com PersonID, or None."""
+        return self._get('nba_id', int(nba_id))
+
+    def by_bbref(self, slug):
+        """Crosswalk row for a Basketball-Reference slug (e.g. 'jamesle01'), or None."""
+        return self._get('bbref_slug', slug)
+
+    def by_name(self, name):
+        """All rows whose normalized name matches `name` (accent/punctuation-insensitive)."""
+        return [dict(self._rows[row_id]) for row_id in sorted(self._by_name.get(normalize_name(name), ()))]
+
+    def nba_id_for_bdl(self, bdl_id):
+        row = self.by_bdl(bdl_id)
+        return row['nba_id'] if row else None
+
+    def bdl_id_for_nba(self, nba_id):
+        row = self.by_nba(nba_id)
+        return row['bdl_id'] if row else None
+
+    def nba_id_for_bbref(self, slug):
+        row = self.by_bbref(slug)
+        return row['nba_id'] if row else None
+
+    def bbref_for_nba(self, nba_id):
+        row = self.by_nba(nba_id)
+        return row['bbref_slug'] if row else None
+
+    def rows(self):
+        """All crosswalk rows, ordered by NBA PersonID (unknown IDs last)."""
+        return sorted((dict(r) for r in self._rows.values()),
+                      key=lambda r: (r['nba_id'] is None, r['nba_id'] or 0, r['name_key'] or ''))
+
+    # Writes
+
+    def upsert_many(self, records):
+        """
+        Insert or merge records in one transaction
+
+        Args:
+            records: Iterable of dicts with any of bdl_id, nba_id, bbref_slug and name.
+                     A record is merged into the row sharing any of its IDs (NBA ID first);
+                     known IDs are never overwritten with None, and if a record links two
+                     existing rows (e.g. a BallDontLie-only and an NBA-only row) they are
+                     collapsed into one.
+
+        Returns:
+            Dict with counts of inserted, updated and merged rows
+        """
+        counts = {'inserted': 0, 'updated': 0, 'merged': 0}
+        with self._lock, self._conn:
+            for record in records:
+                self._upsert_one(record, counts)
+        return counts
+
+    def upsert(self, **fields):
+        return self.upsert_many([fields])
+
+    def _upsert_one(self, record, counts):
+        incoming = {
+            'bdl_id': int(record['bdl_id']) if record.get('bdl_id') not in (None, '') else None,
+            'nba_id': int(record['nba_id']) if record.get('nba_id') not in (None, '') else None,
+            'bbref_slug': record.get('bbref_slug') or None,
+            'name': (record.get('name') or '').strip() or None,
+        }
+        if not any(incoming[column] is not None for column in ID_COLUMNS):
+            return
+
+        matches = []
+        for column in ('nba_id', 'bdl_id', 'bbref_slug'):
+            row_id = self._index[column].get(incoming[column]) if incoming[column] is not None else None
+            if row_id is not None and row_id not in matches:
+                matches.append(row_id)
+
+        if not matches:
+            merged = dict(incoming, name_key=normalize_name(incoming['name']) if incoming['name'] else None)
+            cursor = self._conn.execute(
+                f"INSERT INTO players ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                tuple(merged[c] for c in COLUMNS),
+            )
+            self._remember(cursor.lastrowid, merged)
+            counts['inserted'] += 1
+            return
+
+        keep = matches[0]
+        merged = dict(self._rows[keep])
+        for other in matches[1:]:
+            record_other = self._forget(other)
+            self._conn.execute('DELETE FROM players WHERE id = ?', (other,))
+            for column in ID_COLUMNS + ('name', 'name_key'):
+                if merged[column] is None:
+                    merged[column] = record_other[column]
+            counts['merged'] += 1
+
+        for column in ID_COLUMNS:
+            if incoming[column] is not None:
+                merged[column] = incoming[column]
+        if incoming['name']:
+            merged['name'] = incoming['name']
+            merged['name_key'] = normalize_name(incoming['name'])
+
+        if merged != self._rows[keep]:
+            self._forget(keep)
+            self._conn.execute(
+                f"UPDATE players SET {', '.join(f'{c} = ?' for c in COLUMNS)} WHERE id = ?",
+                tuple(merged[c] for c in COLUMNS) + (keep,),
+            )
+            self._remember(keep, merged)
+            counts['updated'] += 1
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_player_csv(crosswalk, csv_filename):
+    """Upsert (PersonID, Name) rows from nba_player_ids.csv or the backfill registry."""
+    with open(csv_filename, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        records = [{'nba_id': row['PersonID'], 'name': row.get('Name')}
+                   for row in reader if (row.get('PersonID') or '').strip()]
+    return crosswalk.upsert_many(records)
+
+
+def print_row(row):
+    if row is None:
+        print("❌ Not in crosswalk")
+        return
+    print(f"  {row['name'] or '?'}: BallDontLie {row['bdl_id'] or '-'} | "
+          f"NBA {row['nba_id'] or '-'} | bbref {row['bbref_slug'] or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and populate the player ID crosswalk")
+    parser.add_argument('--db', default=DEFAULT_CROSSWALK_PATH,
+                        help=f"Crosswalk database (default: {DEFAULT_CROSSWALK_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('stats', help="Row and per-ID-space counts")
+
+    lookup = commands.add_parser('lookup', help="Resolve a player from any ID space or by name")
+    group = lookup.add_mutually_exclusive_group(required=True)
+    group.add_argument('--bdl', type=int)
+    group.add_argument('--nba', type=int)
+    group.add_argument('--bbref')
+    group.add_argument('--name')
+
+    import_csv = commands.add_parser('import-csv', help="Import PersonID/Name rows from a player CSV")
+    import_csv.add_argument('csv_file', nargs='?', default='nba_player_ids.csv')
+
+    link = commands.add_parser('link-bbref', help="Attach a Basketball-Reference slug to a player")
+    link.add_argument('slug')
+    link_target = link.add_mutually_exclusive_group(required=True)
+    link_target.add_argument('--nba', type=int)
+    link_target.add_argument('--bdl', type=int)
+    link.add_argument('--name', default=None)
+
+    args = parser.parse_args()
+
+    with PlayerCrosswalk(args.db) as crosswalk:
+        if args.command == 'stats':
+            rows = crosswalk.rows()
+            print(f"📇 {len(rows)} players in {args.db}")
+            for column in ID_COLUMNS:
+                print(f"  {column}: {sum(1 for r in rows if r[column] is not None)}")
+        elif args.command == 'lookup':
+            if args.name:
+                matches = crosswalk.by_name(args.name)
+                if not matches:
+                    print_row(None)
+                for row in matches:
+                    print_row(row)
+            elif args.bdl is not None:
+                print_row(crosswalk.by_bdl(args.bdl))
+            elif args.nba is not None:
+                print_row(crosswalk.by_nba(args.nba))
+            else:
+                print_row(crosswalk.by_bbref(args.bbref))
+        elif args.command == 'import-csv':
+            counts = import_player_csv(crosswalk, args.csv_file)
+            print(f"✅ Imported {args.csv_file}: {counts['inserted']} new, {counts['updated']} updated, "
+                  f"{counts['merged']} merged")
+        elif args.command == 'link-bbref':
+            counts = crosswalk.upsert(bbref_slug=args.slug, nba_id=args.nba, bdl_id=args.bdl, name=args.name)
+            print(f"✅ Linked {args.slug} ({counts['inserted']} new, {counts['updated']} updated, "
+                  f"{counts['merged']} merged)")
+            print_row(crosswalk.by_bbref(args.slug))
+        sys.exit(0)
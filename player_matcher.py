@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Indexed player-name matching
+Normalizes a roster (e.g. nba_api's static players list) once and builds hash indexes,
+so each lookup is a few dict probes instead of a scan of every historical player
+"""
+
+import unicodedata
+from collections import defaultdict, namedtuple
+
+# method is 'exact', 'full', 'first_prefix', 'last_prefix', 'ambiguous' or 'none'
+MatchResult = namedtuple('MatchResult', ['player_id', 'method', 'candidates'])
+
+
+def fold_unicode(text: str) -> str:
+    """Strip diacritics so 'Dončić' and 'Doncic' compare equal."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_name(name: str) -> str:
+    """Normalize player name for matching (accent-folded, lowercase, remove special chars)."""
+    name = fold_unicode(name or '').lower().strip()
+    name = name.replace("'", "").replace("-", " ").replace(".", "")
+    return ' '.join(name.split())
+
+
+class PlayerNameMatcher:
+    """
+    Hash-indexed matcher over a roster of {'id', 'first_name', 'last_name', 'is_active'} dicts
+
+    Matching tiers mirror the original linear scan:
+        1. exact (first, last), then exact full name
+        2. same last name and first name sharing its first three characters
+        3. same first name and last name sharing its first three characters
+    When a tier yields several players, active players are preferred; if that still
+    leaves more than one, the lookup is recorded in `ambiguous` and no ID is returned.
+    """
+
+    def __init__(self, roster):
+        self._active = {}
+        self._by_first_last = defaultdict(list)
+        self._by_full = defaultdict(list)
+        self._by_last = defaultdict(list)
+        self._by_first = defaultdict(list)
+        self.ambiguous = []
+
+        for player in roster:
+            player_id = player.get('id')
+            first = normalize_name(player.get('first_name', ''))
+            last = normalize_name(player.get('last_name', ''))
+            full = normalize_name(f"{player.get('first_name', '')} {player.get('last_name', '')}")
+
+            self._active[player_id] = bool(player.get('is_active'))
+            self._by_first_last[(first, last)].append(player_id)
+            self._by_full[full].append(player_id)
+            self._by_last[last].append((first, player_id))
+            self._by_first[first].append((last, player_id))
+
+    def _resolve(self, candidates, method, query):
+        # Preserve roster order but drop duplicates contributed by overlapping indexes
+        candidates = list(dict.fromkeys(candidates))
+        if len(candidates) > 1:
+            active = [c for c in candidates if self._active.get(c)]
+            if len(active) == 1:
+                return MatchResult(active[0], method, candidates)
+            self.ambiguous.append((query, method, candidates))
+            return MatchResult(None, 'ambiguous', candidates)
+        return MatchResult(candidates[0], method, candidates)
+
+    def match(self, first_name: str, last_name: str) -> MatchResult:
+        """Match a first/last name pair against the indexed roster."""
+        first = normalize_name(first_name)
+        last = normalize_name(last_name)
+        full = normalize_name(f"{first_name} {last_name}")
+        query = f"{first_name} {last_name}".strip()
+
+        candidates = self._by_first_last.get((first, last), []) or self._by_full.get(full, [])
+        if candidates:
+            method = 'exact' if (first, last) in self._by_first_last else 'full'
+            return self._resolve(candidates, method, query)
+
+        first_prefix = first[:3]
+        candidates = [pid for f, pid in self._by_last.get(last, ()) if f.startswith(first_prefix)]
+        if candidates:
+            return self._resolve(candidates, 'first_prefix', query)
+
+        last_prefix = last[:3]
+        candidates = [pid for l, pid in self._by_first.get(first, ()) if l.startswith(last_prefix)]
+        if candidates:
+            return self._resolve(candidates, 'last_prefix', query)
+
+        return MatchResult(None, 'none', [])
+
+    def print_ambiguity_report(self):
+        """Print every lookup that matched more than one roster player."""
+        if not self.ambiguous:
+            return
+        print(f"⚠️  {len(self.ambiguous)} ambiguous name match(es) (no ID assigned):")
+        for query, method, candidates in self.ambiguous:
+            print(f"   {query} [{method}] -> {', '.join(str(c) for c in candidates)}")
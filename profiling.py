@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-stage profiling for the Python tools
+With --profile DIR, every metrics.stage() block is profiled three ways:
+
+  <stage>.prof          cProfile stats for the time the stage was the innermost one on
+                        its thread (snakeviz, flameprof, gprof2dot, `python -m pstats`)
+  <stage>.folded        wall-clock stack samples in collapsed-stack format, sleeps and
+                        socket waits included (flamegraph.pl, speedscope, inferno)
+  all.folded            every stage's samples, rooted at the stage name
+  <stage>.alloc.txt     top allocation sites (tracemalloc) for top-level stages
+  <stage>.alloc.folded  allocated bytes per stack, for a memory flamegraph
+
+Stages nest: entering an inner stage pauses the outer stage's profiler on that thread,
+so each .prof holds only its own stage's time. Stages entered on worker threads are
+profiled on those threads. Allocation snapshots are only taken around stages entered
+while no other stage is running, because snapshots are too slow for per-player stages.
+On Python 3.12+ only one cProfile profiler can run at a time, so overlapping stages on
+other threads only show up in the sampled stacks.
+
+Usage:
+    python fetch-player-birthdates.py --profile profiles/
+    flamegraph.pl profiles/all.folded > birthdates.svg
+    python -m pstats profiles/lookup.prof
+"""
+
+import os
+import sys
+import atexit
+import cProfile
+import pstats
+import threading
+import contextlib
+import tracemalloc
+from collections import Counter, defaultdict
+
+DEFAULT_INTERVAL_MS = 5
+ALLOCATION_FRAMES = 16
+TOP_ALLOCATIONS = 25
+
+# Keeps the profiler's own frames out of sampled stacks and allocation reports
+_IGNORED_FILES = (__file__, tracemalloc.__file__, contextlib.__file__)
+
+_profiler = None
+
+
+class StageProfiler:
+    """Per-stage cProfile, stack sampling and tracemalloc snapshots, written out by close()."""
+
+    def __init__(self, output_dir, interval_ms=DEFAULT_INTERVAL_MS, top_allocations=TOP_ALLOCATIONS):
+        """
+        Args:
+            output_dir: Directory for the .prof/.folded/.alloc files (created if missing)
+            interval_ms: Stack sampling interval in milliseconds
+            top_allocations: Allocation sites listed per stage in <stage>.alloc.txt
+        """
+        self.output_dir = output_dir
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.top_allocations = top_allocations
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._sampler = None
+
+        # thread id -> [(stage, cProfile.Profile or None), ...], innermost last
+        self._stacks = defaultdict(list)
+        self._running = 0                           # stage blocks open across all threads
+        self.profiles = defaultdict(list)           # stage -> profiles from each thread
+        self._thread_profiles = {}                  # (stage, thread id) -> cProfile.Profile
+        self.samples = defaultdict(Counter)         # stage -> folded stack -> samples
+        self.allocations = defaultdict(Counter)     # stage -> folded stack -> bytes
+        self.allocation_reports = defaultdict(list)
+        self._snapshot = None
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(ALLOCATION_FRAMES)
+        self._sampler = threading.Thread(target=self._sample_loop, name='stage-profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def _thread_profile(self, name, thread_id):
+        key = (name, thread_id)
+        profile = self._thread_profiles.get(key)
+        if profile is None:
+            profile = self._thread_profiles[key] = cProfile.Profile()
+            self.profiles[name].append(profile)
+        return profile
+
+    @staticmethod
+    def _enable(profile):
+        if profile is None:
+            return None
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: another thread's profiler is already active
+            return None
+        return profile
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """Profile a block as stage `name`; nested blocks pause the enclosing stage's profiler."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            stack = self._stacks[thread_id]
+            outer = stack[-1][1] if stack else None
+            profile = self._thread_profile(name, thread_id)
+            top_level = self._running == 0
+            self._running += 1
+        if outer is not None:
+            outer.disable()
+        if top_level:
+            self._begin_allocations()
+        profile = self._enable(profile)
+        with self._lock:
+            stack.append((name, profile))
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                stack.pop()
+                if not stack:
+                    del self._stacks[thread_id]
+                self._running -= 1
+            if top_level:
+                self._end_allocations(name)
+            if outer is not None:
+                self._enable(outer)
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {thread_id: stack[-1][0] for thread_id, stack in self._stacks.items() if stack}
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, name in active.items():
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == me:
+                    continue
+                folded = _fold_frames(frame)
+                with self._lock:
+                    self.samples[name][folded] += 1
+
+    def _begin_allocations(self):
+        tracemalloc.reset_peak()
+        self._snapshot = _filtered_snapshot()
+
+    def _end_allocations(self, name):
+        before, self._snapshot = self._snapshot, None
+        if before is None:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        diff = _filtered_snapshot().compare_to(before, 'traceback')
+        growth = [stat for stat in diff if stat.size_diff > 0]
+        with self._lock:
+            for stat in growth:
+                frames = reversed([f"{os.path.basename(f.filename)}:{f.lineno}" for f in stat.traceback])
+                self.allocations[name][';'.join(frames)] += stat.size_diff
+            lines = [f"peak traced memory: {peak / 1e6:.2f} MB, "
+                     f"net growth: {sum(stat.size_diff for stat in growth) / 1e6:.2f} MB"]
+            for stat in growth[:self.top_allocations]:
+                where = stat.traceback[-1] if stat.traceback else None
+                location = f"{where.filename}:{where.lineno}" if where else '?'
+                lines.append(f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>+8} blocks  {location}")
+            self.allocation_reports[name].append(lines)
+
+    def _path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    def write(self):
+        """Write every stage's files. Returns the stage names written."""
+        stages = set()
+        with self._lock:
+            for name, profiles in self.profiles.items():
+                stats = None
+                for profile in profiles:
+                    try:
+                        if stats is None:
+                            stats = pstats.Stats(profile)
+                        else:
+                            stats.add(profile)
+                    except TypeError:
+                        # Profile never collected anything (e.g. skipped on 3.12+)
+                        continue
+                if stats is not None:
+                    stats.dump_stats(self._path(f"{_safe_name(name)}.prof"))
+                    stages.add(name)
+
+            everything = Counter()
+            for name, samples in self.samples.items():
+                _write_folded(self._path(f"{_safe_name(name)}.folded"), samples)
+                everything.update({f"{name};{stack}": count for stack, count in samples.items()})
+                stages.add(name)
+            if everything:
+                _write_folded(self._path('all.folded'), everything)
+
+            for name, reports in self.allocation_reports.items():
+                with open(self._path(f"{_safe_name(name)}.alloc.txt"), 'w', encoding='utf-8') as f:
+                    for i, lines in enumerate(reports, 1):
+                        if len(reports) > 1:
+                            f.write(f"# {name} run {i}\n")
+                        f.write('\n'.join(lines) + '\n\n')
+                _write_folded(self._path(f"{_safe_name(name)}.alloc.folded"), self.allocations[name])
+        return sorted(stages)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        stages = self.write()
+        tracemalloc.stop()
+        if stages:
+            # stderr, so --quiet (which silences stdout) still shows where the profiles went
+            print(f"\n🔬 Profiles for {len(stages)} stage(s) written to {self.output_dir}: "
+                  f"{', '.join(stages)}", file=sys.stderr)
+
+
+def _filtered_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, path) for path in _IGNORED_FILES]
+        + [tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')])
+
+
+def _fold_frames(frame):
+    """Collapse a frame chain into 'outer;...;inner' labels, dropping the profiler's own frames."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename not in _IGNORED_FILES:
+            labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def _write_folded(path, counts):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in sorted(counts.items()):
+            if count > 0:
+                f.write(f"{stack} {count}\n")
+
+
+def _safe_name(name):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+
+
+def install(profiler):
+    """Make `profiler` wrap every metrics.stage() block, and write its files at exit."""
+    global _profiler
+    import metrics
+
+    _profiler = profiler.start()
+    metrics.stage_profiler = profiler
+    atexit.register(profiler.close)
+    return profiler
+
+
+def active():
+    """The installed StageProfiler, or None."""
+    return _profiler
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Thread-safe request rate limiting shared by the fetch/download scripts
+Provides a token bucket, a per-host wrapper around it, and an adaptive variant
+that backs off when the upstream starts throttling
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Called as sleep_observer(limiter_name, seconds) after every wait; metrics.install() sets it
+sleep_observer = None
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `capacity`.
+    `acquire()` blocks until a token is available and returns the time spent waiting.
+    """
+
+    def __init__(self, rate, capacity=None, name=None):
+        """
+        Args:
+            rate: Sustained requests per second (<= 0 disables limiting)
+            capacity: Maximum burst size (defaults to max(1, rate))
+            name: Label for the time spent waiting, reported to sleep_observer
+        """
+        self.rate = float(rate)
+        self.name = name or 'unnamed'
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens=1.0):
+        """Block until `tokens` are available. Returns seconds slept."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+        if waited and sleep_observer is not None:
+            sleep_observer(self.name, waited)
+        return waited
+
+
+class HostRateLimiter:
+    """Keeps one TokenBucket per host so each upstream gets its own request-rate cap."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity, name=host)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """Wait for a request slot on the host of `url`. Returns seconds slept."""
+        return self.bucket_for(url).acquire()
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    TokenBucket whose rate adapts to upstream pushback (AIMD): each throttle
+    (429, timeout, 5xx) halves the rate down to `min_rate`, and each success
+    creeps it back towards the configured target rate.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=0.1, decrease=0.5, increase=0.05, name=None):
+        """
+        Args:
+            rate: Target requests per second
+            capacity: Maximum burst size (defaults to max(1, rate))
+            min_rate: Floor the rate never drops below
+            decrease: Multiplier applied to the rate on each throttle
+            increase: Requests-per-second added back on each success
+            name: Label for the time spent waiting, reported to sleep_observer
+        """
+        super().__init__(rate, capacity, name=name)
+        self.target_rate = self.rate
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Drain the burst allowance so the slowdown takes effect immediately
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.target_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.target_rate, self.rate + self.increase)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with full jitter for retry number `attempt` (starting at 1)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
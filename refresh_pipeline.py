@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Pipelined player refresh: IDs -> headshots + birthdates
+Runs the roster fetch (fetch_nba_player_ids.py), headshot download
+(download_player_headshots.py) and birthdate lookup (fetch-player-birthdates.py) as
+one job. Each player record from the single commonallplayers request is put on two
+bounded queues, each filled by its own feeder thread and drained by its own pool
+(headshot workers, birthdate workers). A full queue blocks only its feeder
+(backpressure), so a slow stats.nba.com never holds up headshots; each pool has its
+own size and rate limit, and the whole refresh takes about as long as the slowest
+stage. Birthdates are looked up by NBA PersonID, so no BallDontLie listing is needed.
+
+Outputs:
+    nba_player_ids.csv              same as fetch_nba_player_ids.py
+    playerHeadshots/                same as download_player_headshots.py (--sync supported)
+    nba_player_birthdates.json      PersonID -> YYYY-MM-DD; known players are skipped next run
+    player-birthdates.* artifacts   with --crosswalk, keyed by BallDontLie ID like fetch-player-birthdates.py
+
+Usage:
+    python refresh_pipeline.py 2025-26
+    python refresh_pipeline.py 2025-26 --sync --headshot-workers 16 --birthdate-workers 4 --crosswalk
+    python refresh_pipeline.py 2025-26 --changes        # only players changed since each stage's last clean run
+"""
+
+import os
+import sys
+import json
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch_nba_player_ids as ids
+import download_player_headshots as headshots
+from http_cache import CachedSession, add_cache_arguments, cache_from_args
+from rate_limit import AdaptiveTokenBucket, HostRateLimiter
+from metrics import add_metrics_arguments, metrics_from_args, stage
+from player_crosswalk import DEFAULT_CROSSWALK_PATH, PlayerCrosswalk
+from roster_changes import DEFAULT_LOG_PATH as DEFAULT_CHANGES_PATH, RosterChangeFeed, print_changes
+
+DEFAULT_SEASON = '2024-25'
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_HEADSHOT_WORKERS = headshots.DEFAULT_WORKERS
+DEFAULT_BIRTHDATE_WORKERS = 4
+DEFAULT_BIRTHDATE_RPS = 2.0
+BIRTHDATES_BY_NBA_ID = 'nba_player_birthdates.json'
+
+# Queue sentinel: one per worker tells it the roster stage is done
+DONE = None
+
+# Cursor names in the roster change feed (roster_changes.py), one per stage
+FEED_CONSUMERS = {'headshots': 'refresh_headshots', 'birthdates': 'refresh_birthdates'}
+# Outcomes that leave a stage's cursor where it was, so the players are retried next run
+RETRY_OUTCOMES = ('failed', 'not found')
+
+
+def load_birthdates_module(nba_stats_base=None):
+    """
+    fetch-player-birthdates.py, imported by path (it isn't importable by name)
+
+    `nba_stats_base` overrides the stats.nba.com base URL nba_api requests go to,
+    as fetch-player-birthdates.py --nba-stats-base does.
+    """
+    from tools import load_command
+    module = load_command('birthdates')
+    module.load_environment()
+    module.import_nba_api()
+    if nba_stats_base:
+        module.NBAStatsHTTP.base_url = nba_stats_base
+    return module
+
+
+def load_nba_birthdates(path=BIRTHDATES_BY_NBA_ID):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {int(pid): birthdate for pid, birthdate in json.load(f).items()}
+
+
+def save_nba_birthdates(birthdates, path=BIRTHDATES_BY_NBA_ID):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({str(pid): birthdates[pid] for pid in sorted(birthdates)}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class StageCounter:
+    """Thread-safe per-stage outcome counts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def count(self, *outcomes):
+        with self._lock:
+            return sum(self.counts.get(outcome, 0) for outcome in outcomes)
+
+    def summary(self):
+        with self._lock:
+            return ', '.join(f"{count} {outcome}" for outcome, count in sorted(self.counts.items())) or 'nothing to do'
+
+
+def feed(work_queue, players, worker_count):
+    """Put every player on `work_queue`, then one DONE per worker. put() blocks while the queue is full."""
+    for player in players:
+        work_queue.put(player)
+    for _ in range(worker_count):
+        work_queue.put(DONE)
+
+
+def start_feeder(work_queue, players, worker_count):
+    """Run feed() on its own thread, so a stage that falls behind only blocks its own queue."""
+    thread = threading.Thread(target=feed, args=(work_queue, players, worker_count), daemon=True)
+    thread.start()
+    return thread
+
+
+def run_workers(count, target, work_queue, *args):
+    """Start `count` threads running target(work_queue, *args) until they see DONE."""
+    threads = [threading.Thread(target=target, args=(work_queue,) + args, daemon=True) for _ in range(max(1, count))]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def refresh_headshot(player, session, limiter, output_dir, manifest, manifest_lock, skip_existing, counter):
+    """Download (or with a manifest, conditionally re-sync) one player's headshot."""
+    person_id, name = player['personId'], player['name']
+    image_url = headshots.HEADSHOT_URL.format(person_id=person_id)
+    image_filename = os.path.join(output_dir, f"{name.replace(' ', '_')}.jpg")
+    if skip_existing and os.path.exists(image_filename):
+        counter.add('skipped')
+        return
+    if manifest is not None:
+        state, detail, entry = headshots.sync_headshot(session, image_url, image_filename,
+                                                       manifest.get(person_id), limiter)
+        if entry:
+            with manifest_lock:
+                manifest[person_id] = entry
+    else:
+        ok, detail = headshots.download_headshot(session, image_url, image_filename, limiter)
+        state = 'downloaded' if ok else 'failed'
+    counter.add(state)
+    if state == 'downloaded':
+        print(f"🖼️  {name}")
+    elif state == 'failed':
+        print(f"❌ Headshot failed for {name}: {detail}")
+
+
+def lookup_birthdate(player, birthdates_module, limiter, roster_future, birthdates, birthdates_lock, counter):
+    """Look up one player's birthdate: the bulk team rosters first, then CommonPlayerInfo."""
+    person_id = int(player['personId'])
+    # Every worker waits on the same 30-request roster fetch. Only this stage waits:
+    # the headshot queue has its own feeder thread
+    birthdate = roster_future.result().get(person_id) if roster_future is not None else None
+    source = 'from rosters'
+    if not birthdate:
+        birthdate = birthdates_module.get_player_birthdate_from_nba_api(person_id, limiter)
+        source = 'looked up'
+    if not birthdate:
+        counter.add('not found')
+        print(f"❌ No birthdate for {player['name']} ({person_id})")
+        return
+    with birthdates_lock:
+        birthdates[person_id] = birthdates_module.normalize_birthdate(birthdate)
+    counter.add(source)
+
+
+def drain(work_queue, handle, label, counter, *args):
+    """
+    Call handle(player, *args, counter) for each queued player until DONE
+
+    An error is counted as 'failed' for that player only: a worker that died would
+    leave its feeder blocked on a full queue and the refresh waiting forever.
+    """
+    while True:
+        player = work_queue.get()
+        if player is DONE:
+            return
+        try:
+            handle(player, *args, counter)
+        except Exception as e:
+            counter.add('failed')
+            print(f"❌ {label} failed for {player['name']}: {e}")
+
+
+def headshot_worker(work_queue, session, limiter, output_dir, manifest, manifest_lock, skip_existing, counter):
+    """Refresh headshots from `work_queue` until DONE."""
+    with stage('headshots'):
+        drain(work_queue, refresh_headshot, 'Headshot', counter,
+              session, limiter, output_dir, manifest, manifest_lock, skip_existing)
+
+
+def birthdate_worker(work_queue, birthdates_module, limiter, roster_future, birthdates, birthdates_lock, counter):
+    """Look up birthdates from `work_queue` until DONE."""
+    with stage('birthdates'):
+        drain(work_queue, lookup_birthdate, 'Birthdate lookup', counter,
+              birthdates_module, limiter, roster_future, birthdates, birthdates_lock)
+
+
+def run_pipeline(season=DEFAULT_SEASON, output_file='nba_player_ids.csv', output_dir='playerHeadshots',
+                 headshot_workers=DEFAULT_HEADSHOT_WORKERS, birthdate_workers=DEFAULT_BIRTHDATE_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, max_rps=headshots.DEFAULT_MAX_RPS, birthdate_rps=DEFAULT_BIRTHDATE_RPS,
+                 sync=False, birthdate_source='bulk', refresh_birthdates=False, cache=None,
+                 changes_path=None, skip_headshots=False, birthdates_module=None):
+    """
+    Fetch the roster once and stream every player into the headshot and birthdate pools
+
+    `birthdates_module` is the loaded fetch-player-birthdates.py (load_birthdates_module());
+    without it the birthdate stage is skipped.
+
+    Returns:
+        (players, {PersonID: birthdate}, {stage: StageCounter}), or None if the roster fetch failed
+    """
+    session = CachedSession(cache) if cache else None
+    if birthdates_module is not None and session is not None:
+        birthdates_module.NBAStatsHTTP.set_session(session)
+
+    with stage('roster'):
+        players = ids.fetch_player_ids(season=season, only_current=True, session=session)
+    if not players:
+        return None
+
+    downstream = {'headshots': players, 'birthdates': players}
+    feed = changes = None
+    if changes_path:
+        # Before the CSV is rewritten: the first run seeds its baseline from the old CSV
+        feed = RosterChangeFeed(changes_path)
+        changes = feed.record(players, season=season, seed_csv=output_file)
+        print_changes(changes)
+        # Each stage picks up everything since its own last clean run, so players it
+        # failed on last time are retried even though this run's diff no longer has them
+        for name, consumer in FEED_CONSUMERS.items():
+            changed = feed.changed_ids(feed.cursor(consumer))
+            downstream[name] = [p for p in players if int(p['personId']) in changed]
+    ids.write_player_ids_to_csv(players, output_file)
+
+    known = load_nba_birthdates() if birthdates_module is not None else {}
+    birthdates = dict(known)
+    birthdates_lock = threading.Lock()
+    counters = {'headshots': StageCounter('headshots'), 'birthdates': StageCounter('birthdates')}
+
+    # Stage 2a: headshots
+    headshot_queue = queue.Queue(maxsize=queue_size)
+    headshot_threads = []
+    manifest, manifest_path = None, os.path.join(output_dir, headshots.MANIFEST_FILENAME)
+    pool = None
+    if not skip_headshots:
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = headshots.load_manifest(manifest_path) if sync else None
+        pool = headshots.create_session(headshot_workers, cache)
+        headshot_threads = run_workers(headshot_workers, headshot_worker, headshot_queue, pool,
+                                       HostRateLimiter(max_rps) if max_rps else None, output_dir,
+                                       manifest, threading.Lock(), not sync and not changes_path,
+                                       counters['headshots'])
+
+    # Stage 2b: birthdates (bulk rosters load in the background while players stream in)
+    birthdate_queue = queue.Queue(maxsize=queue_size)
+    birthdate_threads = []
+    pending = []
+    roster_executor = None
+    if birthdates_module is not None:
+        limiter = AdaptiveTokenBucket(birthdate_rps, name='stats.nba.com')
+        roster_future = None
+        pending = [p for p in downstream['birthdates'] if refresh_birthdates or int(p['personId']) not in known]
+        if pending and birthdate_source == 'bulk':
+            roster_executor = ThreadPoolExecutor(max_workers=1)
+            roster_future = roster_executor.submit(birthdates_module.fetch_bulk_birthdates, season, limiter,
+                                                   birthdate_workers)
+        birthdate_threads = run_workers(birthdate_workers, birthdate_worker, birthdate_queue, birthdates_module,
+                                        limiter, roster_future, birthdates, birthdates_lock, counters['birthdates'])
+    print(f"🚰 {len(downstream['headshots']) if headshot_threads else 0} players -> headshots, "
+          f"{len(pending)} -> birthdates ({len(known)} birthdates already known)\n")
+
+    # Stage 1: one feeder per queue; a feeder blocks while its pool is behind, so neither
+    # queue grows past queue_size and neither stage can stall the other
+    feeders = []
+    if headshot_threads:
+        feeders.append(start_feeder(headshot_queue, downstream['headshots'], len(headshot_threads)))
+    if birthdate_threads:
+        feeders.append(start_feeder(birthdate_queue, pending, len(birthdate_threads)))
+
+    for thread in feeders + headshot_threads + birthdate_threads:
+        thread.join()
+    if roster_executor is not None:
+        roster_executor.shutdown()
+    if pool is not None:
+        pool.close()
+    if manifest is not None:
+        headshots.save_manifest(manifest, manifest_path)
+    if birthdates != known:
+        save_nba_birthdates(birthdates)
+
+    if feed is not None:
+        ran = {'headshots': not skip_headshots, 'birthdates': birthdates_module is not None}
+        for name, consumer in FEED_CONSUMERS.items():
+            # Only once the stage has finished with nothing left to retry
+            if ran[name] and not counters[name].count(*RETRY_OUTCOMES):
+                feed.advance(consumer, changes.run)
+    return players, birthdates, counters
+
+
+def write_bdl_birthdates(birthdates, birthdates_module, crosswalk_path, update_constants=False):
+    """Translate PersonID birthdates to BallDontLie IDs and write fetch-player-birthdates.py's artifacts."""
+    with PlayerCrosswalk(crosswalk_path) as crosswalk:
+        by_bdl = {}
+        for person_id, birthdate in birthdates.items():
+            bdl_id = crosswalk.bdl_id_for_nba(person_id)
+            if bdl_id is not None:
+                by_bdl[bdl_id] = birthdate
+    print(f"📇 Crosswalk linked {len(by_bdl)} of {len(birthdates)} birthdates to BallDontLie IDs")
+    known = birthdates_module.load_known_birthdates(birthdates_module.DEFAULT_KNOWN_SOURCES)
+    birthdates_module.write_outputs(birthdates_module.merge_birthdates(known, by_bdl),
+                                    update_constants=update_constants)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh player IDs, headshots and birthdates in one pipelined run")
+    parser.add_argument('season', nargs='?', default=DEFAULT_SEASON)
+    parser.add_argument('output_file', nargs='?', default='nba_player_ids.csv')
+    parser.add_argument('--output-directory', default='playerHeadshots', help="Headshot directory")
+    parser.add_argument('--headshot-workers', type=int, default=DEFAULT_HEADSHOT_WORKERS,
+                        help=f"Concurrent headshot downloads (default: {DEFAULT_HEADSHOT_WORKERS})")
+    parser.add_argument('--birthdate-workers', type=int, default=DEFAULT_BIRTHDATE_WORKERS,
+                        help=f"Concurrent birthdate lookups (default: {DEFAULT_BIRTHDATE_WORKERS})")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Players buffered ahead of each stage (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument('--max-rps', type=float, default=headshots.DEFAULT_MAX_RPS,
+                        help=f"Headshot CDN request-rate cap (default: {headshots.DEFAULT_MAX_RPS}, 0 = unlimited)")
+    parser.add_argument('--birthdate-rps', type=float, default=DEFAULT_BIRTHDATE_RPS,
+                        help=f"stats.nba.com lookup rate (default: {DEFAULT_BIRTHDATE_RPS})")
+    parser.add_argument('--birthdate-source', choices=['bulk', 'per-player'], default='bulk',
+                        help="bulk: 30 team rosters, then CommonPlayerInfo for the rest (default); "
+                             "per-player: CommonPlayerInfo for everyone")
+    parser.add_argument('--nba-stats-base', default=os.getenv('NBA_STATS_BASE'), metavar='URL',
+                        help="Override the stats.nba.com base URL for birthdate lookups, e.g. a local fixture "
+                             "server (http://127.0.0.1:8000/stats/{endpoint}); also read from NBA_STATS_BASE")
+    parser.add_argument('--sync', action='store_true',
+                        help="Re-validate existing headshots via ETag/Last-Modified instead of re-downloading")
+    parser.add_argument('--refresh-birthdates', action='store_true',
+                        help=f"Look up birthdates already in {BIRTHDATES_BY_NBA_ID} again")
+    parser.add_argument('--no-headshots', action='store_true', help="Skip the headshot stage")
+    parser.add_argument('--no-birthdates', action='store_true', help="Skip the birthdate stage")
+    parser.add_argument('--crosswalk', nargs='?', const=DEFAULT_CROSSWALK_PATH, default=None, metavar='PATH',
+                        help="Also write the BallDontLie-keyed birthdate artifacts, mapping IDs through the "
+                             f"crosswalk (default path: {DEFAULT_CROSSWALK_PATH})")
+    parser.add_argument('--update-constants', action='store_true',
+                        help="With --crosswalk, also rewrite the constants file in place")
+    parser.add_argument('--changes', nargs='?', const=DEFAULT_CHANGES_PATH, default=None, metavar='PATH',
+                        help=f"Record the roster change feed and only send players changed since each stage's "
+                             f"last run without failures downstream (default path: {DEFAULT_CHANGES_PATH})")
+    add_cache_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics_from_args(args, job='refresh_pipeline')
+
+    print("🏀 NBA Player Refresh Pipeline")
+    print("=" * 50)
+
+    birthdates_module = None if args.no_birthdates else load_birthdates_module(args.nba_stats_base)
+    result = run_pipeline(args.season, args.output_file, args.output_directory,
+                          headshot_workers=args.headshot_workers, birthdate_workers=args.birthdate_workers,
+                          queue_size=args.queue_size, max_rps=args.max_rps, birthdate_rps=args.birthdate_rps,
+                          sync=args.sync, birthdate_source=args.birthdate_source,
+                          refresh_birthdates=args.refresh_birthdates, cache=cache_from_args(args),
+                          changes_path=args.changes, skip_headshots=args.no_headshots,
+                          birthdates_module=birthdates_module)
+    if result is None:
+        print("\n❌ Failed to fetch player data")
+        sys.exit(1)
+    players, birthdates, counters = result
+
+    if args.crosswalk and birthdates_module is not None and birthdates:
+        with stage('write'):
+            write_bdl_birthdates(birthdates, birthdates_module, args.crosswalk,
+                                 update_constants=args.update_constants)
+
+    print(f"\n📊 Summary ({len(players)} players on the roster):")
+    if not args.no_headshots:
+        print(f"   🖼️  Headshots: {counters['headshots'].summary()}")
+    if not args.no_birthdates:
+        print(f"   🎂 Birthdates: {counters['birthdates'].summary()} ({len(birthdates)} known)")
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
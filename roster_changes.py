@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Roster change feed written by fetch_nba_player_ids.py
+Each run diffs the fresh commonallplayers roster against the previous snapshot and
+appends one compact line to a JSONL change log (added, removed, team and name
+changes keyed by PersonID), then replaces the consolidated snapshot. Consumers keep
+a cursor per name and only reprocess the players that changed since their last run.
+
+Usage:
+    feed = RosterChangeFeed()                        # nba_player_changes.jsonl
+    feed.record(players, season='2025-26')           # -> RosterChanges for this run
+    feed.changed_ids(since_run=41)                   # {1630173, 203500, ...}
+    since = feed.cursor('headshots')
+    ...process feed.changed_ids(since) ...
+    feed.advance('headshots')
+
+CLI:
+    python roster_changes.py status
+    python roster_changes.py show --since 41
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime
+from collections import namedtuple
+
+DEFAULT_LOG_PATH = 'nba_player_changes.jsonl'
+
+# Change kinds, in the order they're reported
+CHANGE_KINDS = ('added', 'removed', 'team', 'name')
+# What a downstream tool has to redo: new players, and anyone whose name or team moved
+REFRESH_KINDS = ('added', 'team', 'name')
+
+RosterChanges = namedtuple('RosterChanges', ['run', 'added', 'removed', 'team', 'name'])
+
+
+def diff_rosters(previous, current):
+    """
+    Diff two {person_id: (name, team)} rosters
+
+    Returns:
+        Dict with 'added' {id: [name, team]}, 'removed' [ids], and 'team' / 'name'
+        {id: [old, new]}, all keyed by int PersonID
+    """
+    added = {pid: list(current[pid]) for pid in current.keys() - previous.keys()}
+    removed = sorted(previous.keys() - current.keys())
+    team, name = {}, {}
+    for pid in current.keys() & previous.keys():
+        old_name, old_team = previous[pid]
+        new_name, new_team = current[pid]
+        if old_team != new_team:
+            team[pid] = [old_team, new_team]
+        if old_name != new_name:
+            name[pid] = [old_name, new_name]
+    return {'added': added, 'removed': removed, 'team': team, 'name': name}
+
+
+def roster_from_players(players):
+    """{person_id: (name, team)} from fetch_player_ids() dicts."""
+    return {int(p['personId']): (p['name'], p['team']) for p in players}
+
+
+def read_roster_csv(csv_filename):
+    """{person_id: (name, team)} from a player ID CSV (Name, PersonID, Team columns)."""
+    roster = {}
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row.get('PersonID'):
+                roster[int(row['PersonID'])] = (row.get('Name', ''), row.get('Team', ''))
+    return roster
+
+
+class RosterChangeFeed:
+    """
+    Append-only roster change log plus the snapshot it was diffed against
+
+    Files, next to each other:
+        <log>                   one JSON line per run: {"run", "ts", "season", "added", ...}
+        <log stem>.snapshot.json  {"run", "ts", "season", "players": {id: [name, team]}}
+        <log stem>.cursors.json   {consumer: last run processed}
+    """
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH):
+        self.log_path = log_path
+        stem = os.path.splitext(log_path)[0]
+        self.snapshot_path = f"{stem}.snapshot.json"
+        self.cursors_path = f"{stem}.cursors.json"
+
+    def snapshot(self):
+        """The consolidated snapshot dict, or None before the first run."""
+        return _read_json(self.snapshot_path)
+
+    def roster(self):
+        """{person_id: (name, team)} as of the latest run (empty before the first run)."""
+        snapshot = self.snapshot() or {'players': {}}
+        return {int(pid): tuple(entry) for pid, entry in snapshot['players'].items()}
+
+    def latest_run(self):
+        """Number of the latest recorded run (0 before the first run)."""
+        snapshot = self.snapshot()
+        return snapshot['run'] if snapshot else 0
+
+    def record(self, players, season=None, seed_csv=None):
+        """
+        Diff `players` (fetch_player_ids() dicts) against the snapshot and record the run
+
+        Args:
+            players: Fresh roster
+            season: Season label stored with the run
+            seed_csv: Previous player CSV to diff against when there is no snapshot yet,
+                      so switching the feed on doesn't report the whole league as added
+
+        Returns:
+            RosterChanges for the new run
+        """
+        current = roster_from_players(players)
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            previous = {int(pid): tuple(entry) for pid, entry in snapshot['players'].items()}
+        elif seed_csv and os.path.exists(seed_csv):
+            previous = read_roster_csv(seed_csv)
+        else:
+            previous = {}
+
+        run = (snapshot['run'] if snapshot else 0) + 1
+        ts = datetime.now().isoformat(timespec='seconds')
+        changes = diff_rosters(previous, current)
+        entry = {'run': run, 'ts': ts, 'season': season}
+        for kind in CHANGE_KINDS:
+            entry[kind] = ({str(pid): value for pid, value in sorted(changes[kind].items())}
+                           if isinstance(changes[kind], dict) else changes[kind])
+
+        # Log first: a crash before the snapshot is replaced only re-reports this run's changes
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + '\n')
+        _write_json(self.snapshot_path, {
+            'run': run, 'ts': ts, 'season': season,
+            'players': {str(pid): list(current[pid]) for pid in sorted(current)},
+        })
+        return RosterChanges(run, changes['added'], changes['removed'], changes['team'], changes['name'])
+
+    def runs(self, since_run=0):
+        """Yield logged runs after `since_run`, oldest first, with int PersonID keys."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry['run'] <= since_run:
+                    continue
+                for kind in ('added', 'team', 'name'):
+                    entry[kind] = {int(pid): value for pid, value in entry[kind].items()}
+                yield entry
+
+    def changed_ids(self, since_run=0, kinds=REFRESH_KINDS):
+        """
+        PersonIDs with a change of one of `kinds` in any run after `since_run`
+
+        Players removed again by a later run are left out unless 'removed' is asked for.
+        """
+        changed = set()
+        removed = set()
+        for entry in self.runs(since_run):
+            for kind in kinds:
+                changed.update(entry[kind])
+            removed.update(entry['removed'])
+            removed.difference_update(entry['added'])
+        if 'removed' not in kinds:
+            changed -= removed
+        return changed
+
+    def cursor(self, consumer):
+        """Last run `consumer` has processed (0 = never, so every logged change is pending)."""
+        return self.cursors().get(consumer, 0)
+
+    def cursors(self):
+        """{consumer: last run processed} for every consumer."""
+        return _read_json(self.cursors_path) or {}
+
+    def advance(self, consumer, run=None):
+        """Mark `consumer` as caught up to `run` (default: the latest run)."""
+        cursors = self.cursors()
+        cursors[consumer] = self.latest_run() if run is None else run
+        _write_json(self.cursors_path, cursors)
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write atomically so a reader never sees a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def print_changes(changes):
+    """One summary line plus a line per change."""
+    print(f"🔄 Run {changes.run}: {len(changes.added)} added, {len(changes.removed)} removed, "
+          f"{len(changes.team)} team changes, {len(changes.name)} name changes")
+    for pid, (name, team) in sorted(changes.added.items()):
+        print(f"  ➕ {name} ({pid}) {team}")
+    for pid in changes.removed:
+        print(f"  ➖ {pid}")
+    for pid, (old, new) in sorted(changes.team.items()):
+        print(f"  🔀 {pid}: {old or '-'} -> {new or '-'}")
+    for pid, (old, new) in sorted(changes.name.items()):
+        print(f"  ✏️  {pid}: {old} -> {new}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the roster change feed")
+    parser.add_argument('--log', default=DEFAULT_LOG_PATH, help=f"Change log (default: {DEFAULT_LOG_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('status', help="Latest run, roster size and consumer cursors")
+
+    show = commands.add_parser('show', help="Print the changes recorded after a run")
+    show.add_argument('--since', type=int, default=0, help="Only runs after this one (default: all)")
+    show.add_argument('--ids', action='store_true', help="Print only the changed PersonIDs, one per line")
+
+    args = parser.parse_args()
+    feed = RosterChangeFeed(args.log)
+
+    if args.command == 'status':
+        snapshot = feed.snapshot()
+        if snapshot is None:
+            print(f"❌ No runs recorded in {args.log}")
+            sys.exit(1)
+        print(f"📋 Run {snapshot['run']} ({snapshot['ts']}, {snapshot['season']}): "
+              f"{len(snapshot['players'])} players")
+        for consumer, run in sorted(feed.cursors().items()):
+            print(f"  {consumer}: at run {run} ({len(feed.changed_ids(run))} players to refresh)")
+    elif args.ids:
+        for pid in sorted(feed.changed_ids(args.since)):
+            print(pid)
+    else:
+        for entry in feed.runs(args.since):
+            print_changes(RosterChanges(entry['run'], entry['added'], entry['removed'],
+                                        entry['team'], entry['name']))
+    sys.exit(0)
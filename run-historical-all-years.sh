@@ -1,40 +1,12 @@
 #!/bin/bash
-# Script to run historical ETL for all years from 2000 to 2024
+# Script to run historical ETL for all years from 1996 to 2024
 # This will fetch and store historical season averages for each year
+#
+# Seasons now run through run_historical.py: a few at a time under one shared
+# BallDontLie request budget, with retries and a resumable checkpoint
+# (logs/historical/checkpoint.json). Extra arguments are passed through, e.g.
+#   ./run-historical-all-years.sh 2010 2024 --jobs 4
+#   ./run-historical-all-years.sh --retry-failed
 
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo "📊 Historical Season Averages ETL - All Years"
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo "Running for years 2000-2024..."
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo ""
-
-# Loop through years from 2000 to 2024
-for year in {1996..2024}; do
-  echo ""
-  echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-  echo "📅 Processing year: $year (will be stored as $((year + 1)))"
-  echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-  echo ""
-  
-  # Run the historical ETL script for this year
-  npm run etl:historical -- --season "$year"
-  
-  # Check if the command succeeded
-  if [ $? -eq 0 ]; then
-    echo ""
-    echo "✅ Successfully completed year $year"
-  else
-    echo ""
-    echo "❌ Error processing year $year - continuing with next year..."
-  fi
-  
-  # Add a small delay between years to avoid rate limiting
-  echo "⏳ Waiting 2 seconds before next year..."
-  sleep 2
-done
-
-echo ""
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo "✅ All years processed (2000-2024)"
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+cd "$(dirname "$0")" || exit 1
+exec python3 run_historical.py "$@"
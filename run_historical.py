@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Run the historical season-averages ETL for a range of seasons
+Replaces the strictly sequential run-historical-all-years.sh loop: seasons run a
+few at a time under one shared BallDontLie request budget, failures are retried
+with backoff, and a checkpoint file records completed/failed/in-progress seasons
+so an interrupted backfill resumes where it stopped.
+
+Usage:
+    python run_historical.py                     # 1996-2024
+    python run_historical.py 2010 2024 --jobs 4 --api-rps 8
+    python run_historical.py --retry-failed      # re-run only seasons that failed last time
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shlex
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limit import TokenBucket, backoff_delay
+
+DEFAULT_START = 1996
+DEFAULT_END = 2024
+DEFAULT_JOBS = 3
+# Total BallDontLie requests per second across every running season job
+DEFAULT_API_RPS = 6.0
+DEFAULT_RETRIES = 2
+DEFAULT_COMMAND = 'npm run etl:historical -- --season {season} --season-type {season_type}'
+CHECKPOINT_PATH = os.path.join('logs', 'historical', 'checkpoint.json')
+LOG_DIR = os.path.join('logs', 'historical')
+
+COMPLETED = 'completed'
+FAILED = 'failed'
+IN_PROGRESS = 'in_progress'
+
+
+class Checkpoint:
+    """
+    JSON record of every season's status, rewritten atomically on each change
+
+    Seasons left 'in_progress' by a crash or Ctrl-C are simply run again.
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.seasons = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.seasons = {int(k): v for k, v in json.load(f).get('seasons', {}).items()}
+
+    def status(self, season):
+        return self.seasons.get(season, {}).get('status')
+
+    def update(self, season, **fields):
+        with self._lock:
+            entry = self.seasons.setdefault(season, {})
+            entry.update(fields, updated_at=datetime.now().isoformat(timespec='seconds'))
+            self._save()
+
+    def _save(self):
+        Path(os.path.dirname(self.path) or '.').mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seasons': {str(k): v for k, v in sorted(self.seasons.items())}}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def select_seasons(checkpoint, start, end, retry_failed=False, force=False):
+    """Seasons in [start, end] that still need a run, per the checkpoint."""
+    seasons = []
+    for season in range(start, end + 1):
+        status = checkpoint.status(season)
+        if force:
+            seasons.append(season)
+        elif retry_failed:
+            if status == FAILED:
+                seasons.append(season)
+        elif status != COMPLETED:
+            seasons.append(season)
+    return seasons
+
+
+class HistoricalRunner:
+    """Runs one child ETL process per season with retries, tracking live processes for Ctrl-C."""
+
+    def __init__(self, checkpoint, command=DEFAULT_COMMAND, season_type='regular', jobs=DEFAULT_JOBS,
+                 api_rps=DEFAULT_API_RPS, retries=DEFAULT_RETRIES, log_dir=LOG_DIR):
+        self.checkpoint = checkpoint
+        self.command = command
+        self.season_type = season_type
+        self.jobs = max(1, jobs)
+        self.retries = retries
+        self.log_dir = log_dir
+        # Each child paces its own pages; splitting the budget evenly keeps the total under api_rps
+        self.min_interval_ms = math.ceil(1000 * self.jobs / api_rps) if api_rps > 0 else 0
+        # Staggers process starts so children don't all open with a burst of first pages
+        self.launches = TokenBucket(api_rps / self.jobs if api_rps > 0 else 0, capacity=1)
+        self.stopping = threading.Event()
+        self._procs = set()
+        self._procs_lock = threading.Lock()
+
+    def _run_once(self, season, attempt):
+        argv = shlex.split(self.command.format(season=season, season_type=self.season_type))
+        env = dict(os.environ, BALLDONTLIE_MIN_INTERVAL_MS=str(self.min_interval_ms))
+        log_path = os.path.join(self.log_dir, f"{season}.log")
+        self.launches.acquire()
+        with open(log_path, 'a', encoding='utf-8') as log:
+            log.write(f"\n===== attempt {attempt} at {datetime.now().isoformat(timespec='seconds')} =====\n")
+            log.flush()
+            with self._procs_lock:
+                # Checked under the lock so stop() can't miss a child started concurrently
+                if self.stopping.is_set():
+                    return None
+                proc = subprocess.Popen(argv, stdout=log, stderr=subprocess.STDOUT, env=env)
+                self._procs.add(proc)
+            try:
+                return proc.wait()
+            finally:
+                with self._procs_lock:
+                    self._procs.discard(proc)
+
+    def run_season(self, season):
+        """Run one season until it succeeds or retries run out. Returns (ok, attempts, seconds)."""
+        started = time.monotonic()
+        attempt = 0
+        self.checkpoint.update(season, status=IN_PROGRESS)
+        while not self.stopping.is_set():
+            attempt += 1
+            code = self._run_once(season, attempt)
+            if code == 0:
+                elapsed = time.monotonic() - started
+                self.checkpoint.update(season, status=COMPLETED, attempts=attempt, seconds=round(elapsed, 1))
+                return True, attempt, elapsed
+            if self.stopping.is_set() or attempt > self.retries:
+                break
+            delay = backoff_delay(attempt, base=15.0, cap=120.0)
+            print(f"  ⚠️  {season}: exit code {code} - retry {attempt}/{self.retries} in {delay:.0f}s")
+            self.stopping.wait(delay)
+
+        elapsed = time.monotonic() - started
+        if not self.stopping.is_set():
+            self.checkpoint.update(season, status=FAILED, attempts=attempt, seconds=round(elapsed, 1))
+        return False, attempt, elapsed
+
+    def stop(self):
+        """Signal workers to stop and terminate running children (their seasons stay in_progress)."""
+        self.stopping.set()
+        with self._procs_lock:
+            for proc in self._procs:
+                proc.terminate()
+
+    def run(self, seasons):
+        """
+        Run seasons with at most `jobs` concurrent children
+
+        Returns:
+            List of (season, ok, attempts, seconds) in completion order
+        """
+        Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+        results = []
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        futures = {executor.submit(self.run_season, season): season for season in seasons}
+        try:
+            for future in as_completed(futures):
+                season = futures[future]
+                ok, attempts, elapsed = future.result()
+                results.append((season, ok, attempts, elapsed))
+                if ok:
+                    print(f"  ✅ {season} (stored as {season + 1}) in {elapsed:.0f}s"
+                          + (f" after {attempts} attempts" if attempts > 1 else ""))
+                elif not self.stopping.is_set():
+                    print(f"  ❌ {season} failed after {attempts} attempts - see {self.log_dir}/{season}.log")
+        except KeyboardInterrupt:
+            print("\n🛑 Interrupted - stopping running seasons (re-run to resume)...")
+            self.stop()
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+        return results
+
+
+def print_timing_table(results):
+    """Per-season timing summary, slowest first."""
+    if not results:
+        return
+    print("\n  Season  Stored  Status     Attempts   Seconds")
+    print("  " + "-" * 45)
+    for season, ok, attempts, elapsed in sorted(results, key=lambda r: -r[3]):
+        print(f"  {season:<7} {season + 1:<7} {'ok' if ok else 'FAILED':<10} {attempts:<10} {elapsed:>7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the historical season-averages ETL for a range of seasons")
+    parser.add_argument('start', nargs='?', type=int, default=DEFAULT_START,
+                        help=f"First API season year (default: {DEFAULT_START})")
+    parser.add_argument('end', nargs='?', type=int, default=DEFAULT_END,
+                        help=f"Last API season year (default: {DEFAULT_END})")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                        help=f"Seasons running at once (default: {DEFAULT_JOBS})")
+    parser.add_argument('--api-rps', type=float, default=DEFAULT_API_RPS,
+                        help=f"BallDontLie requests per second shared by all jobs (default: {DEFAULT_API_RPS})")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries per failed season, with backoff (default: {DEFAULT_RETRIES})")
+    parser.add_argument('--season-type', default='regular', help="regular or playoffs (default: regular)")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH,
+                        help=f"Checkpoint file (default: {CHECKPOINT_PATH})")
+    parser.add_argument('--retry-failed', action='store_true', help="Only run seasons the checkpoint marks failed")
+    parser.add_argument('--force', action='store_true', help="Ignore the checkpoint and run every season")
+    parser.add_argument('--command', default=DEFAULT_COMMAND,
+                        help="Per-season command; {season} and {season_type} are substituted "
+                             f"(default: '{DEFAULT_COMMAND}')")
+    args = parser.parse_args()
+
+    checkpoint = Checkpoint(args.checkpoint)
+    seasons = select_seasons(checkpoint, args.start, args.end, retry_failed=args.retry_failed, force=args.force)
+
+    print("━" * 40)
+    print("📊 Historical Season Averages ETL - All Years")
+    print("━" * 40)
+    skipped = (args.end - args.start + 1) - len(seasons)
+    print(f"📅 Seasons {args.start}-{args.end}: {len(seasons)} to run"
+          + (f", {skipped} already done per {args.checkpoint}" if skipped else ""))
+    print(f"⚙️  {args.jobs} jobs sharing {args.api_rps} req/s, {args.retries} retries per season\n")
+
+    if not seasons:
+        print("✨ Nothing to do.")
+        sys.exit(0)
+
+    runner = HistoricalRunner(checkpoint, command=args.command, season_type=args.season_type, jobs=args.jobs,
+                              api_rps=args.api_rps, retries=args.retries,
+                              log_dir=os.path.dirname(args.checkpoint) or LOG_DIR)
+    started = time.monotonic()
+    try:
+        results = runner.run(seasons)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    print_timing_table(results)
+    failed = [season for season, ok, _, _ in results if not ok]
+    print(f"\n⏱️  Wall time: {time.monotonic() - started:.0f}s "
+          f"(sum of season times: {sum(r[3] for r in results):.0f}s)")
+    if failed:
+        print(f"❌ Failed seasons: {', '.join(map(str, sorted(failed)))} (re-run with --retry-failed)")
+        sys.exit(1)
+    print("✅ All seasons processed")
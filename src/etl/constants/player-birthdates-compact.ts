@@ -0,0 +1,67 @@
+/**
+ * Player Birthdates (compact)
+ *
+ * Generated by birthdate_artifact.py - do not edit by hand.
+ * Birthdates are stored as two parallel columns in player-birthdates.compact.json:
+ * sorted player API IDs and birthdates as days since 1970-01-01 (UTC).
+ * Lookups are a binary search over typed arrays and allocate nothing.
+ */
+
+import data from './player-birthdates.compact.json' with { type: 'json' };
+
+const IDS = Int32Array.from(data.ids);
+const DAYS = Int32Array.from(data.days);
+const MS_PER_DAY = 86_400_000;
+
+/**
+ * Birthdate of a player as days since 1970-01-01, or undefined if unknown
+ */
+export function getPlayerBirthdateDay(apiId: number): number | undefined {
+  let lo = 0;
+  let hi = IDS.length - 1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >>> 1;
+    const id = IDS[mid]!;
+    if (id < apiId) {
+      lo = mid + 1;
+    } else if (id > apiId) {
+      hi = mid - 1;
+    } else {
+      return DAYS[mid];
+    }
+  }
+  return undefined;
+}
+
+/**
+ * Format an epoch day as YYYY-MM-DD
+ */
+export function formatBirthdateDay(day: number): string {
+  return new Date(day * MS_PER_DAY).toISOString().slice(0, 10);
+}
+
+/**
+ * Get birthdate (YYYY-MM-DD) for a player by their API ID
+ */
+export function getPlayerBirthdate(apiId: number): string | undefined {
+  const day = getPlayerBirthdateDay(apiId);
+  return day === undefined ? undefined : formatBirthdateDay(day);
+}
+
+/**
+ * Age in whole years on `onDate` (default: today) for a birthdate given as an epoch day
+ */
+export function ageOnDay(birthDay: number, onDate: Date = new Date()): number {
+  const birth = new Date(birthDay * MS_PER_DAY);
+  let age = onDate.getFullYear() - birth.getUTCFullYear();
+  const monthDiff = onDate.getMonth() - birth.getUTCMonth();
+
+  // Adjust age if birthday hasn't occurred this year
+  if (monthDiff < 0 || (monthDiff === 0 && onDate.getDate() < birth.getUTCDate())) {
+    age--;
+  }
+
+  return age;
+}
+
+export const PLAYER_BIRTHDATE_COUNT = IDS.length;
@@ -1,7 +1,7 @@
 import type { ApiTeam, ApiPlayer, ApiGame, ApiBoxScore, ApiLeader, ApiStanding, ApiSeasonAverage, ApiAdvancedSeasonAverage, ApiTeamSeasonAverage } from './providers/balldontlie.js';
 import type { NewTeam, NewPlayer, NewGame, NewBoxScore, NewLeader, NewStanding, NewSeasonAverage, NewHistoricalSeasonAverage, NewTeamSeasonAverage } from '../db/schema.js';
 import { parseMinutes } from './providers/balldontlie.js';
-import { getPlayerBirthdate, calculateAge } from './constants/player-birthdates.js';
+import { getPlayerBirthdateDay, formatBirthdateDay, ageOnDay } from './constants/player-birthdates-compact.js';
 
 /**
  * Map API team to DB team shape
@@ -23,12 +23,11 @@ export function mapTeamToDb(apiTeam: ApiTeam): NewTeam {
  * Age is calculated from birthdate constants
  */
 export function mapPlayerToDb(apiPlayer: ApiPlayer, teamId: number | null): NewPlayer {
-  // Get birthdate from constants
-  const birthdateRaw = getPlayerBirthdate(apiPlayer.id);
-  // Extract just the date part (YYYY-MM-DD) if it includes timestamp
-  const birthdate = birthdateRaw ? (birthdateRaw.split('T')[0] || birthdateRaw.split(' ')[0] || birthdateRaw) : null;
+  // Get birthdate (days since 1970-01-01) from the compact constants
+  const birthDay = getPlayerBirthdateDay(apiPlayer.id);
+  const birthdate = birthDay === undefined ? null : formatBirthdateDay(birthDay);
   // Calculate age from birthdate
-  const age = calculateAge(birthdateRaw);
+  const age = birthDay === undefined ? null : ageOnDay(birthDay);
   
   return {
     apiId: apiPlayer.id,
@@ -322,10 +322,16 @@ async function sleep(ms: number): Promise<void> {
 }
 
 /**
- * Throttle between pages (200-300ms)
+ * Minimum gap between pages, set by run_historical.py so parallel season jobs
+ * share one request budget (0 = only the default jitter)
+ */
+const MIN_REQUEST_INTERVAL_MS = Number(process.env.BALLDONTLIE_MIN_INTERVAL_MS) || 0;
+
+/**
+ * Throttle between pages (200-300ms, or BALLDONTLIE_MIN_INTERVAL_MS if larger)
  */
 async function throttle(): Promise<void> {
-  const delay = Math.floor(Math.random() * 100) + 200; // 200-300ms
+  const delay = Math.max(Math.floor(Math.random() * 100) + 200, MIN_REQUEST_INTERVAL_MS); // 200-300ms
   await sleep(delay);
 }
 
@@ -0,0 +1,83 @@
+"""
+Shared pytest fixtures for the Python data tools
+Tests run offline: stats.nba.com responses are served from tests/fixtures/nba_stats/
+by a local HTTP server instead of the network.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(REPO_ROOT, 'tests', 'fixtures')
+
+# The scripts import their siblings (metrics, rate_limit, ...) by plain module name
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def fixture_path(*parts):
+    return os.path.join(FIXTURES_DIR, *parts)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serve /stats/<endpoint>?TeamID=..|PlayerID=.. from nba_stats/<endpoint>_<id>.json,
+    falling back to <endpoint>_empty.json; IDs in `server.failing` get a non-JSON 404.
+    League-wide requests (TeamID=0) are keyed by Season instead.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+        endpoint = parts.path.rstrip('/').rsplit('/', 1)[-1].lower()
+        key = next((query[name] for name in ('TeamID', 'PlayerID') if query.get(name, '0') != '0'),
+                   query.get('Season', ''))
+        self.server.requests.append((endpoint, key))
+
+        candidates = [] if key in self.server.failing else [f"{endpoint}_{key}.json", f"{endpoint}_empty.json"]
+        for name in candidates:
+            path = fixture_path('nba_stats', name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return self.send_body(200, f.read(), 'application/json')
+        return self.send_body(404, b'Not Found', 'text/plain')
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def nba_stats_server():
+    """A local stats.nba.com stand-in; `.base_url` is an nba_api base URL template."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    server.requests = []
+    server.failing = set()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/stats/{{endpoint}}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def birthdates_module(monkeypatch, nba_stats_server):
+    """fetch-player-birthdates.py with nba_api imported and pointed at the fixture server."""
+    pytest.importorskip('nba_api')
+    from tools import load_command
+    module = load_command('birthdates')
+    module.import_nba_api()
+    monkeypatch.setattr(module.NBAStatsHTTP, 'base_url', nba_stats_server.base_url)
+    return module
@@ -0,0 +1,74 @@
+"""bbref_scraper.py parsing, against a saved Basketball-Reference season page."""
+
+import math
+
+import pytest
+
+from conftest import fixture_path
+
+np = pytest.importorskip('numpy')
+bbref_scraper = pytest.importorskip('bbref_scraper')
+
+PAGE = fixture_path('bbref', 'NBA_2024_per_game.html')
+
+
+@pytest.fixture(scope='module')
+def page():
+    with open(PAGE, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_per_game_columns_are_typed(page):
+    table = bbref_scraper.SeasonTable.from_html(page, 2024, 'per_game')
+    columns = table.columns
+
+    # Repeated header and League Average footer rows are not players
+    assert len(table) == 6
+    assert columns['player'].tolist() == ['Joel Embiid', 'Luka Dončić', 'OG Anunoby', 'OG Anunoby',
+                                          'OG Anunoby', 'Rudy Gobert']
+    assert columns['player_slug'][0] == 'embiijo01'
+    assert 'ranker' not in columns
+
+    assert columns['season'].dtype == np.int32 and set(columns['season']) == {2024}
+    assert columns['games'].dtype == np.int32
+    assert columns['age'].dtype == np.int32
+    assert columns['pts_per_g'].dtype == np.float64
+    assert columns['pts_per_g'][0] == pytest.approx(34.7)
+    # Gobert's blank 3P% forces float with NaN
+    assert columns['fg3_pct'].dtype == np.float64
+    assert math.isnan(columns['fg3_pct'][-1])
+    for name in ('player', 'player_slug', 'team', 'pos', 'awards'):
+        assert columns[name].dtype == object
+    assert columns['team'].tolist()[2:5] == ['2TM', 'TOR', 'NYK']
+    assert columns['awards'][1] == 'MVP-3,AS,NBA1'
+
+
+def test_one_row_per_player_keeps_traded_players_season_total(page):
+    table = bbref_scraper.SeasonTable.from_html(page, 2024, 'per_game').one_row_per_player()
+
+    assert table.columns['player_slug'].tolist() == ['embiijo01', 'doncilu01', 'anunoog01', 'goberru01']
+    assert table.columns['team'][2] == '2TM'
+    assert table.columns['games'][2] == 50
+    assert table.columns['games'].dtype == np.int32
+
+
+def test_table_inside_html_comment_is_parsed(page):
+    table = bbref_scraper.SeasonTable.from_html(page, 2024, 'advanced')
+
+    assert table.columns['player_slug'].tolist() == ['embiijo01', 'doncilu01', 'goberru01']
+    assert table.columns['per'].dtype == np.float64
+    assert table.columns['ws'].tolist() == pytest.approx([8.5, 12.0, 10.9])
+
+
+def test_missing_table_raises(page):
+    with pytest.raises(ValueError):
+        bbref_scraper.SeasonTable.from_html(page, 2024, 'totals')
+
+
+def test_offline_scrape_reads_the_fixture_directory():
+    results, failed = bbref_scraper.scrape_seasons(2023, 2023, tables=('per_game', 'totals'), workers=1,
+                                                   cache_dir=fixture_path('bbref'), offline=True)
+
+    assert [(t.season, len(t)) for t in results['per_game']] == [(2024, 6)]
+    # No saved totals page: offline runs report it instead of fetching
+    assert [(season, table) for season, table, _ in failed] == [(2023, 'totals')]
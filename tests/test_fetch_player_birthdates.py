@@ -0,0 +1,39 @@
+"""Bulk roster -> per-player fallback path of fetch-player-birthdates.py, against fixture responses."""
+
+import re
+
+LAKERS = '1610612747'
+CELTICS = '1610612738'
+
+# BallDontLie listing entries (IDs are BallDontLie's, names match nba_api's static players)
+BDL_PLAYERS = [
+    {'id': 237, 'first_name': 'LeBron', 'last_name': 'James'},      # Lakers roster fixture
+    {'id': 115, 'first_name': 'Stephen', 'last_name': 'Curry'},     # Warriors roster fixture
+    {'id': 140, 'first_name': 'Kevin', 'last_name': 'Durant'},      # no roster: CommonPlayerInfo fixture
+]
+
+
+def test_format_birthdate_normalizes_every_source_format(birthdates_module):
+    assert birthdates_module.format_birthdate('1988-09-29T00:00:00') == '1988-09-29'
+    assert birthdates_module.format_birthdate('MAR 14, 1988') == '1988-03-14'
+    assert birthdates_module.format_birthdate('1984-12-30') == '1984-12-30'
+
+
+def test_bulk_rosters_separate_empty_from_failed(birthdates_module, nba_stats_server, capsys):
+    nba_stats_server.failing.add(CELTICS)
+
+    birthdates = birthdates_module.fetch_bulk_birthdates('2024-25', workers=4)
+
+    assert birthdates == {2544: '1984-12-30', 203076: '1993-03-11', 201939: '1988-03-14'}
+    assert '(1 teams failed, 27 empty rosters)' in capsys.readouterr().out
+
+
+def test_roster_birthdates_merge_with_per_player_fallback(birthdates_module, nba_stats_server):
+    birthdates = birthdates_module.fetch_birthdates_for_players(BDL_PLAYERS, workers=2, rps=100,
+                                                               source='bulk', season='2024-25')
+
+    assert birthdates == {237: '1984-12-30', 115: '1988-03-14', 140: '1988-09-29'}
+    assert all(re.fullmatch(r'\d{4}-\d{2}-\d{2}', value) for value in birthdates.values())
+    # Only the player the rosters missed gets a CommonPlayerInfo request
+    assert [key for endpoint, key in nba_stats_server.requests if endpoint == 'commonplayerinfo'] == ['201142']
+    assert sum(endpoint == 'commonteamroster' for endpoint, _ in nba_stats_server.requests) == 30
@@ -0,0 +1,152 @@
+"""historical_averages.py staging and loading, against a recorded leaguedashplayerstats payload."""
+
+import json
+import os
+import uuid
+
+import pytest
+
+from conftest import fixture_path
+from player_crosswalk import PlayerCrosswalk
+
+historical_averages = pytest.importorskip('historical_averages')
+
+PAYLOAD = fixture_path('nba_stats', 'leaguedashplayerstats_2023-24.json')
+
+# players table rows: (id, api_id, full_name). Durant is missing, and so is the
+# BallDontLie ID the crosswalk gives Wembanyama
+PLAYERS_ROWS = [(1, 237, 'LeBron James'), (2, 115, 'Stephen Curry')]
+WEMBANYAMA_BDL_ID = 56677822
+
+
+def load_payload():
+    with open(PAYLOAD, encoding='utf-8') as f:
+        result_set = json.load(f)['resultSets'][0]
+    return result_set['headers'], result_set['rowSet']
+
+
+@pytest.fixture
+def crosswalk(tmp_path):
+    with PlayerCrosswalk(str(tmp_path / 'crosswalk.sqlite')) as crosswalk:
+        crosswalk.upsert_many([
+            {'nba_id': 2544, 'bdl_id': 237, 'name': 'LeBron James'},
+            {'nba_id': 1641705, 'bdl_id': WEMBANYAMA_BDL_ID, 'name': 'Victor Wembanyama'},
+        ])
+        yield crosswalk
+
+
+def test_stage_rows_maps_ids_and_types_columns(crosswalk):
+    headers, rows = load_payload()
+    id_map = historical_averages.PlayerIdMap(PLAYERS_ROWS, crosswalk)
+
+    staged = historical_averages.stage_rows(2023, headers, rows, id_map)
+    by_nba_id = {row[2]: dict(zip(historical_averages.STAGE_COLUMNS, row)) for row in staged}
+
+    assert len(staged) == 4
+    assert all(len(row) == len(historical_averages.STAGE_COLUMNS) for row in staged)
+    # Crosswalk hit, name fallback, unresolved, and crosswalk-only (created on write)
+    assert (by_nba_id[2544]['player_id'], by_nba_id[2544]['bdl_id']) == (1, 237)
+    assert (by_nba_id[201939]['player_id'], by_nba_id[201939]['bdl_id']) == (2, 115)
+    assert (by_nba_id[201142]['player_id'], by_nba_id[201142]['bdl_id']) == (None, None)
+    assert (by_nba_id[1641705]['player_id'], by_nba_id[1641705]['bdl_id']) == (None, WEMBANYAMA_BDL_ID)
+
+    lebron = by_nba_id[2544]
+    assert lebron['season'] == 2024
+    assert lebron['player_name'] == 'LeBron James'
+    assert lebron['games_played'] == 71 and isinstance(lebron['games_played'], int)
+    assert lebron['age'] == 39 and isinstance(lebron['age'], int)
+    assert lebron['points'] == pytest.approx(25.7)
+    assert lebron['rebounds'] == pytest.approx(7.3)
+    assert lebron['three_pct'] == pytest.approx(0.41)
+
+
+def test_stage_rows_blank_values_become_none():
+    headers, rows = load_payload()
+    row = list(rows[0])
+    row[headers.index('FT_PCT')] = None
+    row[headers.index('FG3_PCT')] = ''
+    # A payload without a mapped column (older seasons) stages it as None too
+    trimmed = [h for h in headers if h != 'TOV']
+    row = [v for h, v in zip(headers, row) if h != 'TOV']
+
+    staged = dict(zip(historical_averages.STAGE_COLUMNS, historical_averages.stage_rows(2023, trimmed, [row])[0]))
+
+    assert staged['ft_pct'] is None and staged['three_pct'] is None and staged['turnovers'] is None
+    assert (staged['player_id'], staged['bdl_id']) == (None, None)
+
+
+def test_load_seasons_fetches_through_the_league_dash_endpoint(monkeypatch, nba_stats_server, crosswalk):
+    monkeypatch.setattr(historical_averages, 'LEAGUE_DASH_URL',
+                        nba_stats_server.base_url.format(endpoint='leaguedashplayerstats'))
+
+    staged_seasons, failed = historical_averages.load_seasons(2023, 2023, rps=100, crosswalk=crosswalk)
+
+    assert failed == []
+    assert [[row[:3] for row in staged] for staged in staged_seasons] == [
+        [(None, 237, 2544), (None, None, 201939), (None, None, 201142), (None, WEMBANYAMA_BDL_ID, 1641705)]]
+    assert nba_stats_server.requests.count(('leaguedashplayerstats', '2023-24')) == 1
+
+
+@pytest.fixture
+def scratch_db():
+    """
+    A connection to $DATABASE_URL whose search_path points at a throwaway schema with
+    just the columns write_season touches; the schema is dropped afterwards
+    """
+    if not os.getenv('DATABASE_URL'):
+        pytest.skip("DATABASE_URL is not set")
+    pytest.importorskip('psycopg2')
+    from pg_bulk import connect
+
+    conn = connect()
+    schema = f"historical_averages_test_{uuid.uuid4().hex[:8]}"
+    stats = ', '.join(f"{column} {'integer' if cast is int else 'real'}"
+                      for column, (_, cast) in historical_averages.STAT_COLUMNS.items())
+    with conn, conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path TO {schema}")
+        cur.execute("CREATE TABLE players (id serial PRIMARY KEY, api_id integer NOT NULL UNIQUE, "
+                    "full_name text NOT NULL, first_name text NOT NULL, last_name text NOT NULL)")
+        cur.execute("CREATE TABLE historical_season_averages (id serial PRIMARY KEY, "
+                    "player_id integer NOT NULL REFERENCES players (id), player_name text NOT NULL, "
+                    f"season integer NOT NULL, {stats}, UNIQUE (player_id, season))")
+        cur.executemany("INSERT INTO players (api_id, full_name, first_name, last_name) "
+                        "VALUES (%s, %s, split_part(%s, ' ', 1), split_part(%s, ' ', 2))",
+                        [(api_id, name, name, name) for _, api_id, name in PLAYERS_ROWS])
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        with conn, conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.close()
+
+
+def test_write_season_upserts_into_postgres(scratch_db, crosswalk):
+    headers, rows = load_payload()
+    id_map = historical_averages.PlayerIdMap.from_database(scratch_db, crosswalk)
+    staged = historical_averages.stage_rows(2023, headers, rows, id_map)
+
+    assert historical_averages.write_season(scratch_db, staged) == (3, 1)
+
+    with scratch_db, scratch_db.cursor() as cur:
+        cur.execute("SELECT full_name, last_name FROM players WHERE api_id = %s", (WEMBANYAMA_BDL_ID,))
+        assert cur.fetchone() == ('Victor Wembanyama', 'Wembanyama')
+        cur.execute("SELECT p.api_id, h.season, h.games_played, h.points FROM historical_season_averages h "
+                    "JOIN players p ON p.id = h.player_id ORDER BY p.api_id")
+        assert [(api_id, season, games) for api_id, season, games, _ in cur.fetchall()] == [
+            (115, 2024, 74), (237, 2024, 71), (WEMBANYAMA_BDL_ID, 2024, 71)]
+
+    # Re-running a season updates in place, and a NULL never overwrites a stored value
+    lebron = next(dict(zip(historical_averages.STAGE_COLUMNS, row)) for row in staged if row[2] == 2544)
+    lebron.update(points=26.0, assists=None)
+    rerun = [tuple(lebron[column] for column in historical_averages.STAGE_COLUMNS)]
+    assert historical_averages.write_season(scratch_db, rerun) == (1, 0)
+
+    with scratch_db, scratch_db.cursor() as cur:
+        cur.execute("SELECT count(*), max(h.points), max(h.assists) FROM historical_season_averages h "
+                    "JOIN players p ON p.id = h.player_id WHERE p.api_id = 237")
+        count, points, assists = cur.fetchone()
+    assert count == 1
+    assert points == pytest.approx(26.0)
+    assert assists == pytest.approx(8.3)
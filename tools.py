@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Python data tools
+Each subcommand hands its remaining arguments to the matching script's main(), and
+that script is only imported once its subcommand is chosen, so `tools.py --help`
+and an unknown command never pay for requests, nba_api or NumPy.
+
+Usage:
+    python tools.py --help
+    python tools.py ids 2024-25 nba_player_ids.csv
+    python tools.py headshots --workers 16 --sync
+    python tools.py birthdates --delta
+    python tools.py scrape 2020 2024 --tables per_game
+    python tools.py refresh 2025-26 --sync
+    python tools.py birthdates --help               # the tool's own options
+"""
+
+import os
+import sys
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# subcommand -> (script file, one-line description); nothing here is imported up front
+COMMANDS = {
+    'ids': ('fetch_nba_player_ids.py', "Fetch NBA player IDs from NBA.com into a CSV"),
+    'headshots': ('download_player_headshots.py', "Download player headshots from the NBA.com CDN"),
+    'birthdates': ('fetch-player-birthdates.py', "Fetch player birthdates for the constants file"),
+    'scrape': ('bbref_scraper.py', "Scrape Basketball-Reference season stat tables"),
+    'refresh': ('refresh_pipeline.py', "Refresh player IDs, headshots and birthdates in one pipelined run"),
+}
+
+
+def load_command(name):
+    """Import a subcommand's script as a module and return it."""
+    import importlib.util
+    filename = COMMANDS[name][0]
+    module_name = os.path.splitext(filename)[0].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    # fetch-player-birthdates.py isn't importable by name, so every script is loaded from its path
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='tools.py', description="Livingston data tools",
+        epilog="Run `tools.py COMMAND --help` for a command's own options.")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+    for name, (_, description) in COMMANDS.items():
+        commands.add_parser(name, help=description, description=description)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS:
+        # Help, or a mistake: argparse prints the command list and exits
+        build_parser().parse_args(argv)
+    # Everything after the command, --help included, goes to the tool's own parser untouched
+    command, args = argv[0], argv[1:]
+    # Scripts import their siblings (rate_limit, metrics, ...) by plain module name
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    sys.argv = [COMMANDS[command][0]] + args
+    return load_command(command).main(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Transcode downloaded NBA player headshots into smaller derivatives
+Produces a configurable set of sizes and formats (WebP, real JPEG) with a process pool
+and only regenerates derivatives whose source image or encode settings changed
+
+Requirements:
+    pip install Pillow
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError as e:
+    print(f"❌ Missing required package: {e}")
+    print("Please install with: pip install Pillow")
+    sys.exit(1)
+
+DEFAULT_SIZES = [(260, 190), (520, 380)]
+DEFAULT_FORMATS = ['webp', 'jpeg']
+DEFAULT_QUALITY = 80
+DERIVED_DIRNAME = 'derived'
+DERIVED_MANIFEST_FILENAME = 'derived.json'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Pillow format name and file extension for each supported output format
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+# JPEG has no alpha channel, so transparent CDN PNGs are flattened onto this colour
+JPEG_BACKGROUND = (255, 255, 255)
+
+
+def parse_sizes(value):
+    """Parse a size list like '260x190,520x380' into [(260, 190), (520, 380)]."""
+    sizes = []
+    for part in value.split(','):
+        width, height = part.lower().strip().split('x')
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def parse_formats(value):
+    """Parse a format list like 'webp,jpeg' and validate each entry."""
+    formats = [f.strip().lower() for f in value.split(',') if f.strip()]
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}' (choose from {', '.join(FORMATS)})")
+    return formats
+
+
+def derivative_name(stem, size, fmt):
+    """File name of one derivative, e.g. LeBron_James_260x190.webp"""
+    return f"{stem}_{size[0]}x{size[1]}.{FORMATS[fmt][1]}"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_settings(sizes, formats, quality):
+    """The settings recorded with each manifest entry; derivatives are re-encoded when they change."""
+    return {
+        'sizes': [f"{width}x{height}" for width, height in sizes],
+        'formats': list(formats),
+        'quality': quality,
+    }
+
+
+def transcode_one(source_path, derived_dir, sizes, formats, quality, previous=None):
+    """
+    Transcode one source image into every requested size/format
+
+    Runs inside a worker process, so it only takes and returns plain picklable values.
+
+    Args:
+        source_path: Path of the downloaded headshot
+        derived_dir: Directory for derivatives
+        sizes: List of (width, height) tuples
+        formats: List of format keys from FORMATS
+        quality: Encoder quality (1-100)
+        previous: Previous derived-manifest entry for this source (or None)
+
+    Returns:
+        (source_name, entry, written) where entry records the source hash/size, the encode
+        settings and each derivative's byte size, and written is the number of derivatives
+        regenerated
+    """
+    source_name = os.path.basename(source_path)
+    stem = os.path.splitext(source_name)[0]
+    source_hash = file_sha256(source_path)
+    settings = encode_settings(sizes, formats, quality)
+    # Entries written before settings were recorded count as changed, so they're re-encoded once
+    source_changed = (not previous or previous.get('sha256') != source_hash
+                      or previous.get('settings') != settings)
+
+    variants = {}
+    todo = []
+    for size in sizes:
+        for fmt in formats:
+            name = derivative_name(stem, size, fmt)
+            path = os.path.join(derived_dir, name)
+            if not source_changed and os.path.exists(path):
+                variants[name] = os.path.getsize(path)
+            else:
+                todo.append((size, fmt, name, path))
+
+    if todo:
+        with Image.open(source_path) as img:
+            img.load()
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            rgba = img.convert('RGBA') if has_alpha else img.convert('RGB')
+
+        for size, fmt, name, path in todo:
+            # Fit to the exact box; the CDN source already has the same 26:19 aspect ratio
+            resized = ImageOps.fit(rgba, size, method=Image.LANCZOS)
+            if fmt == 'jpeg' and resized.mode == 'RGBA':
+                flattened = Image.new('RGB', resized.size, JPEG_BACKGROUND)
+                flattened.paste(resized, mask=resized.split()[-1])
+                resized = flattened
+
+            save_kwargs = {'quality': quality}
+            if fmt == 'jpeg':
+                save_kwargs.update(optimize=True, progressive=True)
+            else:
+                save_kwargs.update(method=6)
+
+            tmp_path = f"{path}.tmp"
+            resized.save(tmp_path, format=FORMATS[fmt][0], **save_kwargs)
+            os.replace(tmp_path, path)
+            variants[name] = os.path.getsize(path)
+
+    # Derivatives for sizes/formats that are no longer requested
+    for name in (previous or {}).get('variants', {}):
+        if name not in variants:
+            stale_path = os.path.join(derived_dir, name)
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+    entry = {
+        'sha256': source_hash,
+        'size': os.path.getsize(source_path),
+        'settings': settings,
+        'variants': variants,
+    }
+    return source_name, entry, len(todo)
+
+
+def find_sources(input_dir):
+    """List headshot source files in input_dir (derivatives and manifests are excluded)."""
+    return sorted(
+        str(p) for p in Path(input_dir).iterdir()
+        if p.is_file() and p.suffix.lower() in SOURCE_EXTENSIONS
+    )
+
+
+def transcode_headshots(input_dir='playerHeadshots', derived_dir=None, sizes=None,
+                        formats=None, quality=DEFAULT_QUALITY, workers=None):
+    """
+    Transcode every headshot in input_dir into smaller derivatives
+
+    Args:
+        input_dir: Directory containing downloaded headshots
+        derived_dir: Output directory (default: <input_dir>/derived)
+        sizes: List of (width, height) tuples (default: 260x190 and 520x380)
+        formats: List of output formats (default: webp and jpeg)
+        quality: Encoder quality (1-100)
+        workers: Process pool size (default: CPU count)
+
+    Returns:
+        Dict with transcoded, unchanged and failed counts plus source/derivative byte totals
+    """
+    sizes = sizes or DEFAULT_SIZES
+    formats = formats or DEFAULT_FORMATS
+    derived_dir = derived_dir or os.path.join(input_dir, DERIVED_DIRNAME)
+
+    if not os.path.isdir(input_dir):
+        print(f"❌ Error: input directory '{input_dir}' not found")
+        return
+
+    Path(derived_dir).mkdir(parents=True, exist_ok=True)
+    manifest_path = os.path.join(derived_dir, DERIVED_MANIFEST_FILENAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    sources = find_sources(input_dir)
+    print(f"🖼️  Transcoding {len(sources)} headshots into "
+          f"{', '.join(f'{w}x{h}' for w, h in sizes)} ({', '.join(formats)})...")
+
+    stats = {'transcoded': 0, 'unchanged': 0, 'failed': 0}
+    new_manifest = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(transcode_one, path, derived_dir, sizes, formats, quality,
+                            manifest.get(os.path.basename(path))): path
+            for path in sources
+        }
+        for future, path in futures.items():
+            try:
+                source_name, entry, written = future.result()
+            except Exception as e:
+                print(f"❌ Error transcoding {os.path.basename(path)}: {e}")
+                stats['failed'] += 1
+                continue
+            new_manifest[source_name] = entry
+            if written:
+                stats['transcoded'] += 1
+            else:
+                stats['unchanged'] += 1
+
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(new_manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    # Bytes saved is reported per size/format against the original CDN source
+    source_bytes = sum(entry['size'] for entry in new_manifest.values())
+    variant_bytes = {}
+    for entry in new_manifest.values():
+        for name, size in entry['variants'].items():
+            key = name.rsplit('_', 1)[-1]  # e.g. "260x190.webp"
+            variant_bytes[key] = variant_bytes.get(key, 0) + size
+
+    print("\n📊 Transcode Summary:")
+    print(f"   ✅ Transcoded: {stats['transcoded']}")
+    print(f"   💤 Unchanged: {stats['unchanged']}")
+    print(f"   ❌ Failed: {stats['failed']}")
+    print(f"   📦 Source bytes: {source_bytes:,}")
+    for key in sorted(variant_bytes):
+        total = variant_bytes[key]
+        saved = source_bytes - total
+        pct = (saved / source_bytes * 100) if source_bytes else 0.0
+        print(f"   💾 {key}: {total:,} bytes ({saved:,} saved, {pct:.1f}%)")
+    print(f"   📁 Output directory: {derived_dir}")
+
+    stats['source_bytes'] = source_bytes
+    stats['variant_bytes'] = variant_bytes
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcode player headshots into smaller derivatives")
+    parser.add_argument('input_directory', nargs='?', default='playerHeadshots')
+    parser.add_argument('--output-dir', default=None,
+                        help=f"Derivative directory (default: <input>/{DERIVED_DIRNAME})")
+    parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+                        help="Comma-separated WIDTHxHEIGHT list (default: 260x190,520x380)")
+    parser.add_argument('--formats', type=parse_formats, default=DEFAULT_FORMATS,
+                        help="Comma-separated formats: webp, jpeg (default: webp,jpeg)")
+    parser.add_argument('--quality', type=int, default=DEFAULT_QUALITY)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    transcode_headshots(args.input_directory, args.output_dir, args.sizes, args.formats,
+                        args.quality, args.workers)